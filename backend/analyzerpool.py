@@ -0,0 +1,309 @@
+"""
+Pool of long-lived Node video analyzer processes.
+
+Each worker runs video/analyzer-worker.cjs and exchanges one JSON line per
+message over stdin/stdout, so Node startup, module loading and Gemini client
+construction are paid once per worker instead of once per upload. Workers are
+pinged before use when they have been idle, and restarted when they crash,
+hang past a request's timeout, or the API key changes.
+
+Latency is recorded per stage (spawn, queue wait, file read, model call,
+parse, round trip) and reported by stats().
+"""
+import itertools
+import json
+import os
+import queue
+import subprocess
+import threading
+import time
+from pathlib import Path
+
+WORKER_SCRIPT = Path(__file__).parent / 'video' / 'analyzer-worker.cjs'
+NODE_BINARY = os.getenv('NODE_BINARY', 'node')
+START_TIMEOUT = float(os.getenv('ANALYZER_START_TIMEOUT', '30'))
+PING_TIMEOUT = float(os.getenv('ANALYZER_PING_TIMEOUT', '5'))
+# Workers idle longer than this are pinged before being handed a request
+HEALTH_INTERVAL = float(os.getenv('ANALYZER_HEALTH_INTERVAL', '30'))
+
+
+class WorkerError(Exception):
+    """The worker process died, hung or broke the protocol"""
+
+
+class AnalyzerWorker:
+    """One Node analyzer process; used by one request at a time"""
+
+    _ids = itertools.count(1)
+
+    def __init__(self, script=WORKER_SCRIPT):
+        self.script = script
+        self.process = None
+        self.generation = 0
+        self.last_used = 0.0
+        self._lines = None
+
+    def start(self):
+        """
+        Spawn the process and wait for its ready message.
+
+        Returns:
+            float: Spawn-to-ready time in ms
+        """
+        started = time.perf_counter()
+        self.process = subprocess.Popen(
+            [NODE_BINARY, str(self.script)],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=None,  # worker logs go to our stderr
+            text=True,
+            encoding='utf-8',
+            bufsize=1,
+            cwd=str(self.script.parent),
+        )
+        # A reader thread lets requests wait on stdout with a timeout
+        self._lines = queue.Queue()
+        threading.Thread(target=self._read, args=(self.process, self._lines),
+                         name=f'analyzer-reader-{self.process.pid}', daemon=True).start()
+        ready = self._receive(START_TIMEOUT)
+        if not ready.get('ready'):
+            self.stop()
+            raise WorkerError(f"Unexpected first message from analyzer worker: {ready}")
+        self.last_used = time.monotonic()
+        return (time.perf_counter() - started) * 1000
+
+    @staticmethod
+    def _read(process, lines):
+        for line in process.stdout:
+            lines.put(line)
+        lines.put(None)
+
+    def _receive(self, timeout):
+        try:
+            line = self._lines.get(timeout=timeout)
+        except queue.Empty:
+            self.stop()
+            raise WorkerError(f"Analyzer worker did not answer within {timeout}s") from None
+        if line is None:
+            self.stop()
+            raise WorkerError("Analyzer worker exited")
+        try:
+            return json.loads(line)
+        except ValueError:
+            self.stop()
+            raise WorkerError(f"Invalid message from analyzer worker: {line[:200]!r}") from None
+
+    def alive(self):
+        return self.process is not None and self.process.poll() is None
+
+    def request(self, message, timeout):
+        """
+        Send one request and wait for its response.
+
+        Raises:
+            WorkerError: If the worker dies or times out (it is stopped)
+        """
+        if not self.alive():
+            raise WorkerError("Analyzer worker is not running")
+        message = dict(message, id=str(next(self._ids)))
+        try:
+            self.process.stdin.write(json.dumps(message) + '\n')
+            self.process.stdin.flush()
+        except OSError as e:
+            self.stop()
+            raise WorkerError(f"Analyzer worker pipe closed: {e}") from None
+        response = self._receive(timeout)
+        if response.get('id') != message['id']:
+            self.stop()
+            raise WorkerError("Analyzer worker answered out of order")
+        self.last_used = time.monotonic()
+        return response
+
+    def ping(self):
+        """True if the worker answers a ping within PING_TIMEOUT"""
+        try:
+            return self.request({"op": "ping"}, PING_TIMEOUT).get('ok', False)
+        except WorkerError:
+            return False
+
+    def stop(self):
+        process, self.process = self.process, None
+        if process is None or process.poll() is not None:
+            return
+        try:
+            process.stdin.close()
+        except OSError:
+            pass
+        try:
+            process.wait(timeout=2)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.wait()
+
+
+class AnalyzerPool:
+    """
+    Fixed-size pool of AnalyzerWorker processes, started lazily.
+
+    Args:
+        size (int): Number of worker processes
+    """
+
+    STAGES = ('spawn_ms', 'queue_ms', 'read_ms', 'model_ms', 'parse_ms', 'worker_total_ms', 'roundtrip_ms')
+
+    def __init__(self, size=2, script=WORKER_SCRIPT):
+        self.size = size
+        self.script = script
+        self._idle = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._created = 0
+        self._generation = 0
+        self.restarts = 0
+        self.failures = 0
+        self._latency = {stage: {"count": 0, "total_ms": 0.0, "max_ms": 0.0} for stage in self.STAGES}
+
+    def _record(self, stage, ms):
+        with self._lock:
+            entry = self._latency[stage]
+            entry["count"] += 1
+            entry["total_ms"] += ms
+            entry["max_ms"] = max(entry["max_ms"], ms)
+
+    def _spawn(self):
+        worker = AnalyzerWorker(self.script)
+        worker.generation = self._generation
+        self._record('spawn_ms', worker.start())
+        return worker
+
+    def _checkout(self, timeout):
+        """Take an idle worker (or start one while below size), waiting up to timeout"""
+        with self._lock:
+            may_create = self._idle.empty() and self._created < self.size
+            if may_create:
+                self._created += 1
+        if may_create:
+            try:
+                return self._spawn()
+            except Exception:
+                with self._lock:
+                    self._created -= 1
+                raise
+        try:
+            return self._idle.get(timeout=timeout)
+        except queue.Empty:
+            raise WorkerError(f"No analyzer worker free within {timeout}s") from None
+
+    def _checkin(self, worker):
+        """Return a worker to the pool, replacing it if it died or is outdated"""
+        if not worker.alive() or worker.generation != self._generation:
+            worker.stop()
+            with self._lock:
+                self.restarts += 1
+            try:
+                worker = self._spawn()
+            except Exception as e:
+                print(f"⚠️ Could not restart analyzer worker: {e}")
+                with self._lock:
+                    self._created -= 1
+                return
+        self._idle.put(worker)
+
+    def analyze(self, video_path, context="", timeout=300):
+        """
+        Analyze a video on a pooled worker. context is accepted for parity
+        with the spawn path; the analyzer does not use it.
+
+        Returns:
+            dict: Analysis, or {"error": ...} (same shape as the spawn path)
+        """
+        started = time.perf_counter()
+        deadline = time.monotonic() + timeout
+        try:
+            worker = self._checkout(timeout)
+        except Exception as e:
+            with self._lock:
+                self.failures += 1
+            return {"error": f"Analyzer unavailable: {e}"}
+        try:
+            idle_for = time.monotonic() - worker.last_used
+            if not worker.alive() or (idle_for > HEALTH_INTERVAL and not worker.ping()):
+                worker.stop()
+                with self._lock:
+                    self.restarts += 1
+                worker = self._spawn()
+            self._record('queue_ms', (time.perf_counter() - started) * 1000)
+
+            sent = time.perf_counter()
+            response = worker.request(
+                {"op": "analyze", "video_path": str(video_path)},
+                max(deadline - time.monotonic(), 1)
+            )
+            self._record('roundtrip_ms', (time.perf_counter() - sent) * 1000)
+            timings = response.get('timings') or {}
+            for stage in ('read_ms', 'model_ms', 'parse_ms'):
+                if stage in timings:
+                    self._record(stage, timings[stage])
+            if 'total_ms' in timings:
+                self._record('worker_total_ms', timings['total_ms'])
+
+            if not response.get('ok'):
+                return {"error": response.get('error') or "Video analysis failed"}
+            return response.get('result')
+        except (WorkerError, OSError) as e:
+            with self._lock:
+                self.failures += 1
+            return {"error": f"Video analysis failed: {e}"}
+        finally:
+            self._checkin(worker)
+
+    def restart(self):
+        """Replace every worker as it is next returned (e.g. after an API key change)"""
+        with self._lock:
+            self._generation += 1
+        while True:
+            try:
+                worker = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            worker.stop()
+            with self._lock:
+                self._created -= 1
+
+    def health(self):
+        """Ping idle workers; True if all answered (or none are started yet)"""
+        workers = []
+        while True:
+            try:
+                workers.append(self._idle.get_nowait())
+            except queue.Empty:
+                break
+        healthy = True
+        for worker in workers:
+            if not worker.ping():
+                healthy = False
+            self._checkin(worker)
+        return healthy
+
+    def stats(self):
+        """Worker counts, restarts and per-stage latency (count, mean, max in ms)"""
+        with self._lock:
+            latency = {
+                stage: {
+                    "count": entry["count"],
+                    "mean_ms": round(entry["total_ms"] / entry["count"], 1) if entry["count"] else None,
+                    "max_ms": round(entry["max_ms"], 1),
+                }
+                for stage, entry in self._latency.items()
+            }
+            return {
+                "size": self.size,
+                "started": self._created,
+                "idle": self._idle.qsize(),
+                "restarts": self.restarts,
+                "failures": self.failures,
+                "latency": latency,
+            }
+
+    def close(self):
+        """Stop all idle workers"""
+        self.restart()
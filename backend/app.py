@@ -1,11 +1,25 @@
-from flask import Flask, request, jsonify, send_from_directory
+from flask import Flask, Response, abort, request, jsonify, send_from_directory
 from flask_cors import CORS
-from werkzeug.utils import secure_filename
+from werkzeug.security import safe_join
 import os
 import json
+import mimetypes
+import signal
 import subprocess
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from dotenv import load_dotenv
+from extractpatterns import extract_patterns_from_file
+from proclock import file_lock
+import analyzerpool
+import jobs
+import llm
+import metrics
+import patterncache
+import videoprep
+import videostore
 
 # Load environment variables
 load_dotenv()
@@ -27,6 +41,57 @@ DATA_FOLDER.mkdir(exist_ok=True)
 
 app.config['UPLOAD_FOLDER'] = str(UPLOAD_FOLDER)
 app.config['MAX_CONTENT_LENGTH'] = MAX_FILE_SIZE
+# X-Sendfile header for Apache/lighttpd; X-Accel-Redirect prefix of an nginx internal location
+app.config['USE_X_SENDFILE'] = os.getenv('USE_X_SENDFILE', '').lower() in ('1', 'true', 'yes')
+UPLOADS_ACCEL_REDIRECT = os.getenv('UPLOADS_ACCEL_REDIRECT', '')
+IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+
+# Batch generation limits
+BATCH_CONCURRENCY = int(os.getenv('BATCH_CONCURRENCY', '4'))
+MAX_BATCH_CONCURRENCY = int(os.getenv('MAX_BATCH_CONCURRENCY', '16'))
+MAX_BATCH_SIZE = int(os.getenv('MAX_BATCH_SIZE', '200'))
+
+# Video analysis runs as background jobs; records are kept under uploads/jobs/
+ANALYSIS_WORKERS = int(os.getenv('ANALYSIS_WORKERS', '2'))
+ANALYSIS_MAX_PENDING = int(os.getenv('ANALYSIS_MAX_PENDING', '20'))
+ANALYSIS_TIMEOUT = float(os.getenv('ANALYSIS_TIMEOUT', '300'))
+analysis_jobs = jobs.JobQueue(
+    UPLOAD_FOLDER / 'jobs',
+    workers=ANALYSIS_WORKERS,
+    max_pending=ANALYSIS_MAX_PENDING,
+    timeout=ANALYSIS_TIMEOUT
+)
+
+# 'pool' keeps long-lived Node analyzer workers; 'spawn' starts node per analysis
+ANALYZER_MODE = os.getenv('ANALYZER_MODE', 'pool').lower()
+analyzer_pool = analyzerpool.AnalyzerPool(size=ANALYSIS_WORKERS)
+
+# MODEL_BACKEND=stub: give the Node analyzer a local stand-in server too (run
+# modelstub.py separately and set GEMINI_BASE_URL to keep it out of this process)
+if llm.MODEL_BACKEND == 'stub' and not os.getenv('GEMINI_BASE_URL'):
+    import modelstub
+
+    os.environ['GEMINI_BASE_URL'] = modelstub.start_server(llm.get_model())
+    print(f"🧪 Stub model backend; video analyzer uses {os.environ['GEMINI_BASE_URL']}")
+
+# Resumable (chunked) uploads keep partial files under uploads/partial/
+resumable_uploads = videostore.ResumableUploads(UPLOAD_FOLDER, max_size=MAX_FILE_SIZE)
+
+# Pattern extraction runs in a small pool of long-lived worker processes
+EXTRACTION_WORKERS = int(os.getenv('EXTRACTION_WORKERS', '1'))
+_extraction_pool = None
+_extraction_locks = {}
+_extraction_locks_guard = threading.Lock()
+
+# Each worker warms its caches at boot (see warm_up); /health answers 503
+# until that has finished. WARM_UP=0 skips it and reports ready at once.
+WARM_UP = os.getenv('WARM_UP', '1').lower() not in ('0', 'false', 'no')
+_ready = threading.Event()
+_warm_up_thread = None
+_warm_up_guard = threading.Lock()
+_warm_up_report = {"state": "pending" if WARM_UP else "disabled"}
+if not WARM_UP:
+    _ready.set()
 
 
 def allowed_file(filename):
@@ -34,17 +99,47 @@ def allowed_file(filename):
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
 
+@app.before_request
+def start_request_timer():
+    request.environ['app.started'] = time.perf_counter()
+    # Servers without the gunicorn boot hook (flask run, test clients) warm up on the first request
+    if _warm_up_thread is None and not _ready.is_set():
+        start_warm_up()
+
+
+@app.after_request
+def record_request_time(response):
+    started = request.environ.get('app.started')
+    if started is not None:
+        metrics.observe('http_request_seconds', time.perf_counter() - started,
+                        endpoint=request.endpoint or 'unmatched', status=str(response.status_code)[0] + 'xx')
+    return response
+
+
+@app.route('/metrics', methods=['GET'])
+def prometheus_metrics():
+    """Stage timings and counters in Prometheus text format (METRICS_MODE=full|summary|off)"""
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
+
+
 @app.route('/health', methods=['GET'])
 def health():
-    """Health check endpoint"""
+    """
+    Health check endpoint. Answers 503 ("starting") until this worker has
+    warmed up, so load balancers only route to it once patterns, example
+    posts and prompt prefixes are in memory.
+    """
+    ready = _ready.is_set()
     return jsonify({
-        "status": "healthy",
+        "status": "healthy" if ready else "starting",
+        "ready": ready,
+        "warm_up": _warm_up_report,
         "services": {
             "video_upload": True,
             "content_generation": True,
             "pattern_extraction": True
         }
-    }), 200
+    }), 200 if ready else 503
 
 
 @app.route('/api/upload-video', methods=['POST'])
@@ -71,59 +166,237 @@ def upload_video():
         # Get optional context
         context = request.form.get('context', '')
         
-        # Save the file
-        filename = secure_filename(file.filename)
-        timestamp = int(Path(filename).stem.split('-')[-1]) if '-' in filename else ''
-        unique_filename = f"video-{timestamp or 'upload'}-{filename}"
-        filepath = Path(app.config['UPLOAD_FOLDER']) / unique_filename
-        
-        file.save(str(filepath))
-        
-        # Call Node.js video analyzer
-        result = analyze_video_with_node(str(filepath), context)
+        # Save the file under its content digest (identical uploads share one file)
+        # allowed_file() checked the original name; the stored name comes from
+        # the digest, so only the (whitelisted) extension is used
+        extension = file.filename.rsplit('.', 1)[1].lower()
+        unique_filename, filepath, digest, deduplicated = videostore.save_upload(
+            file.stream, extension, app.config['UPLOAD_FOLDER']
+        )
         
-        return jsonify({
-            "success": True,
-            "filename": unique_filename,
-            "filepath": str(filepath),
-            "context": context,
-            "analysis": result,
-            "message": "Video uploaded and analyzed successfully"
-        }), 200
+        wait = request.values.get('wait', '').lower() in ('1', 'true', 'yes')
+        return start_analysis(unique_filename, filepath, digest, deduplicated, context, wait)
         
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 
-def analyze_video_with_node(video_path, context=""):
+def start_analysis(filename, filepath, digest, deduplicated, context, wait=False):
+    """
+    Respond to a stored upload: reuse its stored analysis, analyze it now
+    (wait=True) or queue an analysis job
+    """
+    upload = {
+        "success": True,
+        "filename": filename,
+        "filepath": str(filepath),
+        "digest": digest,
+        "deduplicated": deduplicated,
+        "context": context
+    }
+    
+    # Reuse the stored analysis for this video and context if there is one
+    result = videostore.get_analysis(digest, context, app.config['UPLOAD_FOLDER'])
+    metrics.cache_result('video_analysis', result is not None)
+    if result is not None:
+        print(f"⚡ Reusing stored analysis for {filename}")
+        return jsonify(dict(upload, cached=True, analysis=result,
+                            message="Video uploaded; stored analysis reused")), 200
+    
+    # wait=true keeps the old blocking behaviour
+    if wait:
+        result = analyze_upload(str(filepath), digest, context)
+        return jsonify(dict(upload, cached=False, analysis=result,
+                            message="Video uploaded and analyzed successfully")), 200
+    
+    try:
+        job = analysis_jobs.submit(analyze_upload, str(filepath), digest, context, kind='video-analysis')
+    except jobs.QueueFull as e:
+        return jsonify({"error": str(e)}), 503, {"Retry-After": "30"}
+    
+    return jsonify(dict(
+        upload,
+        cached=False,
+        job_id=job["id"],
+        status=job["status"],
+        status_url=f"/api/jobs/{job['id']}",
+        events_url=f"/api/jobs/{job['id']}/events",
+        message="Video uploaded; analysis queued"
+    )), 202
+
+
+@app.route('/api/uploads', methods=['POST'])
+def create_upload():
+    """
+    Start a resumable upload
+    Expects JSON: { "filename": "clip.mov", "size": 123, "sha256": "...", "context": "..." }
+    """
+    data = request.json or {}
+    filename = str(data.get('filename', ''))
+    if not allowed_file(filename):
+        return jsonify({
+            "error": f"File type not allowed. Allowed types: {', '.join(ALLOWED_EXTENSIONS)}"
+        }), 400
+    try:
+        session = resumable_uploads.create(
+            filename.rsplit('.', 1)[1].lower(), data.get('size'), data.get('sha256'), data.get('context', '')
+        )
+    except videostore.UploadError as e:
+        return jsonify({"error": str(e)}), e.status
+    return jsonify(dict(session, upload_url=f"/api/uploads/{session['id']}")), 201
+
+
+@app.route('/api/uploads/<upload_id>', methods=['GET', 'PATCH', 'DELETE'])
+def resumable_upload(upload_id):
+    """
+    GET: current offset (where to resume)
+    PATCH: append the raw request body at the Upload-Offset header
+           (optional X-Chunk-SHA256 header is verified before the chunk is kept)
+    DELETE: abandon the upload
+    """
+    try:
+        if request.method == 'GET':
+            return jsonify(resumable_uploads.get(upload_id)), 200
+        if request.method == 'DELETE':
+            resumable_uploads.get(upload_id)
+            resumable_uploads.discard(upload_id)
+            return jsonify({"success": True}), 200
+        
+        offset = request.headers.get('Upload-Offset', request.args.get('offset'))
+        if offset is None or not offset.isdigit():
+            return jsonify({"error": "Upload-Offset header required"}), 400
+        session = resumable_uploads.append(
+            upload_id, request.stream, int(offset), request.headers.get('X-Chunk-SHA256')
+        )
+        return jsonify(session), 200, {"Upload-Offset": str(session['offset'])}
+    except videostore.UploadError as e:
+        body = {"error": str(e)}
+        if e.offset is not None:
+            body["offset"] = e.offset
+        return jsonify(body), e.status
+
+
+@app.route('/api/uploads/<upload_id>/complete', methods=['POST'])
+def complete_upload(upload_id):
+    """
+    Finish a resumable upload: verify the checksum, store the video and
+    start its analysis (same response as /api/upload-video)
+    """
+    try:
+        session, stored = resumable_uploads.complete(upload_id)
+    except videostore.UploadError as e:
+        body = {"error": str(e)}
+        if e.offset is not None:
+            body["offset"] = e.offset
+        return jsonify(body), e.status
+    
+    filename, filepath, digest, deduplicated = stored
+    data = request.get_json(silent=True) or {}
+    return start_analysis(filename, filepath, digest, deduplicated, session['context'],
+                          bool(data.get('wait', False)))
+
+
+def analyze_upload(video_path, digest, context="", timeout=ANALYSIS_TIMEOUT):
+    """
+    Analyze a stored upload and save the result for later identical uploads
+    """
+    result = analyze_video_with_node(video_path, context, timeout)
+    videostore.store_analysis(digest, context, result, app.config['UPLOAD_FOLDER'])
+    return result
+
+
+def analyze_video_with_node(video_path, context="", timeout=ANALYSIS_TIMEOUT):
     """
     Call Node.js video analyzer script
     """
     try:
         node_script = Path(__file__).parent / 'video' / 'video-analyzer.cjs'
         
+        # Send a small local proxy instead of the raw capture when ffmpeg is available
+        deadline = time.monotonic() + timeout
+        with metrics.timer('video_preprocess'):
+            analyzed_path, prep = videoprep.prepare_video(video_path, timeout)
+        print(f"🎞️ Pre-processing: {prep['mode']}, {prep['original_bytes']} -> {prep['bytes']} bytes "
+              f"in {prep['seconds']}s")
+        
+        if ANALYZER_MODE == 'pool':
+            with metrics.timer('video_analysis'):
+                analysis = analyzer_pool.analyze(analyzed_path, context, max(deadline - time.monotonic(), 1))
+            if isinstance(analysis, dict) and 'error' in analysis:
+                metrics.inc('errors_total', stage='video_analysis')
+            if isinstance(analysis, dict) and 'error' not in analysis:
+                analysis["preprocessing"] = prep
+            return analysis
+        
         # Run the Node.js analyzer
-        result = subprocess.run(
-            ['node', str(node_script), video_path, context],
-            capture_output=True,
-            text=True,
-            timeout=300  # 5 minute timeout
-        )
+        with metrics.timer('video_analysis'):
+            result = subprocess.run(
+                ['node', str(node_script), analyzed_path, context],
+                capture_output=True,
+                text=True,
+                timeout=max(deadline - time.monotonic(), 1)
+            )
         
         if result.returncode == 0:
             try:
-                return json.loads(result.stdout)
+                analysis = json.loads(result.stdout)
             except json.JSONDecodeError:
                 return {"raw_output": result.stdout}
+            if isinstance(analysis, dict):
+                analysis["preprocessing"] = prep
+            return analysis
         else:
             return {"error": result.stderr or "Video analysis failed"}
             
     except subprocess.TimeoutExpired:
+        metrics.inc('errors_total', stage='video_analysis')
         return {"error": "Video analysis timed out"}
     except Exception as e:
         return {"error": f"Analysis error: {str(e)}"}
 
 
+@app.route('/api/jobs', methods=['GET'])
+def job_stats():
+    """Analysis queue depth, job counts, analyzer worker stats and whether the idle workers answer a ping"""
+    analyzer = dict(analyzer_pool.stats(), healthy=analyzer_pool.health())
+    return jsonify(dict(analysis_jobs.stats(), analyzer=analyzer)), 200
+
+
+@app.route('/api/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    """Status (and result, once finished) of an analysis job"""
+    job = analysis_jobs.get(job_id)
+    if job is None:
+        return jsonify({"error": "Job not found"}), 404
+    return jsonify(job), 200
+
+
+@app.route('/api/jobs/<job_id>/events', methods=['GET'])
+def job_events(job_id):
+    """
+    Server-sent events for an analysis job: one event per status change,
+    ending after the job succeeds or fails
+    """
+    job = analysis_jobs.get(job_id)
+    if job is None:
+        return jsonify({"error": "Job not found"}), 404
+    
+    def stream(job):
+        while True:
+            yield f"event: {job['status']}\ndata: {json.dumps(job, ensure_ascii=False)}\n\n"
+            if job['status'] in jobs.TERMINAL_STATES:
+                return
+            status = job['status']
+            while job['status'] == status:
+                job = analysis_jobs.wait(job_id, status, timeout=15)
+                if job['status'] == status:
+                    # Comment line keeps proxies from closing an idle stream
+                    yield ": keepalive\n\n"
+    
+    return Response(stream(job), mimetype='text/event-stream',
+                    headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+
 @app.route('/api/generate-post', methods=['POST'])
 def generate_post():
     """
@@ -139,6 +412,8 @@ def generate_post():
         context = data.get('context', '').strip()
         style = data.get('style', 'professional').strip()
         video_analysis = data.get('video_analysis', {})
+        # "cache": false asks for a fresh post instead of a cached one
+        use_cache = bool(data.get('cache', True))
         
         if not context and not video_analysis:
             return jsonify({"error": "Either context or video_analysis is required"}), 400
@@ -147,49 +422,25 @@ def generate_post():
         print(f"   → Style: {style}")
         print(f"   → Context: {context[:100]}...")
         
-        # Map serious to professional for file lookup
-        dataset_name = 'professional' if style == 'serious' else style
-        
-        # Check if patterns exist for this style
-        patterns = {}
-        patterns_file = DATA_FOLDER / 'processed' / f'patterns_{dataset_name}.json'
+        patterns = load_patterns_for(style)
         
-        if not patterns_file.exists():
-            print(f"   ⚠️ Patterns not found for {style}, extracting...")
-            # Extract patterns first
-            dataset_path = DATA_FOLDER / 'raw' / f'{dataset_name}.json'
-            
-            if dataset_path.exists():
-                result = subprocess.run(
-                    ['python', 'backend/extractpatterns.py', str(dataset_path), str(patterns_file)],
-                    capture_output=True,
-                    text=True,
-                    cwd=Path(__file__).parent.parent
-                )
-                
-                if result.returncode == 0:
-                    print(f"   ✅ Patterns extracted successfully")
-                else:
-                    print(f"   ⚠️ Pattern extraction failed: {result.stderr}")
-        
-        # Load patterns
-        if patterns_file.exists():
-            with open(patterns_file, 'r', encoding='utf-8') as f:
-                patterns = json.load(f)
+        if patterns:
             print(f"   ✅ Patterns loaded for {style}")
         else:
+            patterns = {}
             print(f"   ⚠️ No patterns available, using default generation")
         
         # Generate post using patterns and context
         print(f"   🚀 Generating post...")
-        post = generate_linkedin_post(context, style, video_analysis, patterns)
+        post = generate_linkedin_post(context, style, video_analysis, patterns, use_cache)
         print(f"   ✅ Post generated successfully!")
         
         return jsonify({
             "success": True,
             "post": post,
             "style": style,
-            "patterns_used": bool(patterns)
+            "patterns_used": bool(patterns),
+            "cached": post.get("cached", False)
         }), 200
         
     except Exception as e:
@@ -199,36 +450,212 @@ def generate_post():
         return jsonify({"error": str(e)}), 500
 
 
-def generate_linkedin_post(context, style, video_analysis, patterns):
+def generate_linkedin_post(context, style, video_analysis, patterns, use_cache=True):
     """
     Generate a LinkedIn post using extracted patterns and context
     """
     # Import the generator module
     from generator import generate_linkedin_post as generate_post
     
-    # Build full context from video if available
+    # Generate post using the new generator
+    post_data = generate_post(build_full_context(context, video_analysis), style, patterns, use_cache)
+    
+    return post_data
+
+
+def build_full_context(context, video_analysis):
+    """Append video description and key moments to the user's context"""
     full_context = context
     if video_analysis:
         if 'description' in video_analysis:
             full_context += f"\n\nVideo context: {video_analysis['description']}"
         if 'key_moments' in video_analysis:
             full_context += f"\n\nKey moments: {', '.join(video_analysis['key_moments'])}"
+    return full_context
+
+
+class BatchRequestError(ValueError):
+    """A malformed /api/generate-posts body (reported as a 400)"""
+
+
+def _batch_items(data):
+    """
+    Expand a /api/generate-posts body into [{"context", "style"}] items,
+    checking field types and MAX_BATCH_SIZE before anything is built.
+
+    Raises:
+        BatchRequestError: If the body is malformed or asks for too many posts
+    """
+    def text(value, field):
+        if value is None:
+            return ''
+        if not isinstance(value, str):
+            raise BatchRequestError(f"{field} must be a string")
+        return value.strip()
+
+    def string_list(value, field):
+        if not isinstance(value, list) or not all(isinstance(entry, str) for entry in value):
+            raise BatchRequestError(f"{field} must be a list of strings")
+        return value
+
+    if not isinstance(data, dict):
+        raise BatchRequestError("Expected a JSON object")
+    if 'items' in data:
+        entries = data['items']
+        if not isinstance(entries, list) or not all(isinstance(item, dict) for item in entries):
+            raise BatchRequestError("items must be a list of objects")
+        if len(entries) > MAX_BATCH_SIZE:
+            raise BatchRequestError(f"At most {MAX_BATCH_SIZE} posts per batch")
+        items = []
+        for item in entries:
+            video_analysis = item.get('video_analysis') or {}
+            if not isinstance(video_analysis, dict):
+                raise BatchRequestError("video_analysis must be an object")
+            items.append({
+                "context": build_full_context(text(item.get('context'), 'context'), video_analysis),
+                "style": text(item.get('style'), 'style') or 'professional'
+            })
+        return items
+
+    styles = data.get('styles', 'all')
+    styles = patterncache.dataset_names() if styles == 'all' else string_list(styles, 'styles')
+    contexts = string_list(data.get('contexts', []), 'contexts')
+    if len(styles) * len(contexts) > MAX_BATCH_SIZE:
+        raise BatchRequestError(f"At most {MAX_BATCH_SIZE} posts per batch")
+    return [
+        {"context": context.strip(), "style": style.strip()}
+        for style in styles
+        for context in contexts
+    ]
+
+
+@app.route('/api/generate-posts', methods=['POST'])
+def generate_posts():
+    """
+    Generate a batch of LinkedIn posts, streamed back as they complete
+    Expects JSON, either explicit items:
+        { "items": [{ "context": "...", "style": "boardy", "video_analysis": {...} }], "concurrency": 4 }
+    or a fan-out of every style (or "all" datasets) × every context:
+        { "contexts": ["...", "..."], "styles": ["boardy", "cluely"] | "all", "concurrency": 4 }
+    Responds with newline-delimited JSON: one line per post, then a summary line.
+    """
+    from generator import generate_linkedin_posts_batch
     
-    # Generate post using the new generator
-    post_data = generate_post(full_context, style, patterns)
+    data = request.json
+    if not data:
+        return jsonify({"error": "No data provided"}), 400
     
-    return post_data
+    try:
+        items = _batch_items(data)
+    except BatchRequestError as e:
+        return jsonify({"error": str(e)}), 400
+    try:
+        concurrency = int(data.get('concurrency', BATCH_CONCURRENCY))
+    except (TypeError, ValueError):
+        return jsonify({"error": "concurrency must be an integer"}), 400
+    
+    if not items:
+        return jsonify({"error": "No posts requested"}), 400
+    if any(not item['context'] for item in items):
+        return jsonify({"error": "Every post needs a context"}), 400
+    if concurrency < 1:
+        return jsonify({"error": "concurrency must be at least 1"}), 400
+    
+    concurrency = min(concurrency, MAX_BATCH_CONCURRENCY)
+    use_cache = bool(data.get('cache', True))
+    print(f"\n📦 [BATCH GENERATION] {len(items)} posts, concurrency {concurrency}")
+    
+    # Resolve patterns here, extracting missing ones like /api/generate-post,
+    # so the batch's event loop never waits on disk or an extraction
+    patterns_by_style = {
+        style: load_patterns_for(style) or {} for style in {item['style'] for item in items}
+    }
+    
+    def stream():
+        completed = 0
+        for result in generate_linkedin_posts_batch(items, concurrency, use_cache=use_cache,
+                                                    patterns_by_style=patterns_by_style):
+            completed += 1
+            yield json.dumps(result) + "\n"
+        yield json.dumps({"done": True, "count": completed}) + "\n"
+    
+    return Response(stream(), mimetype='application/x-ndjson')
+
+
+def _get_extraction_pool():
+    """Create the extraction worker pool on first use"""
+    global _extraction_pool
+    with _extraction_locks_guard:
+        if _extraction_pool is None:
+            _extraction_pool = ProcessPoolExecutor(max_workers=EXTRACTION_WORKERS)
+        return _extraction_pool
+
+
+def _extraction_lock(dataset_name):
+    """Lock serializing extractions that write the same patterns file"""
+    with _extraction_locks_guard:
+        return _extraction_locks.setdefault(dataset_name, threading.Lock())
+
+
+def run_pattern_extraction(dataset_name, incremental=True):
+    """
+    Extract patterns for a dataset in the worker pool and return them.
+    
+    Runs extractpatterns in an already-running worker process instead of a
+    fresh interpreter, and hands the patterns back directly rather than
+    through a disk round trip. Concurrent requests for the same dataset, in
+    this or another worker process, wait for each other instead of racing
+    on the output file.
+    """
+    dataset_path = patterncache.dataset_path(dataset_name)
+    output_path = patterncache.patterns_path(dataset_name)
+    
+    with _extraction_lock(dataset_name), file_lock(output_path.with_suffix('.lock')):
+        future = _get_extraction_pool().submit(
+            extract_patterns_from_file, str(dataset_path), str(output_path), 1, incremental
+        )
+        with metrics.timer('pattern_extraction'):
+            patterns = future.result()
+        # Serve the new patterns without re-reading the file
+        patterncache.set_patterns(dataset_name, patterns)
+        return patterns
+
+
+def load_patterns_for(style):
+    """
+    Patterns for a style, extracted first if its dataset has none yet
+    (shared by the single and batch generation endpoints).
+    
+    Returns:
+        dict: Patterns, or None if there is no dataset or extraction failed
+    """
+    # Map serious to professional for file lookup
+    dataset_name = patterncache.resolve_dataset(style)
+    
+    # Parsed once per file version, see patterncache
+    patterns = patterncache.get_patterns(dataset_name)
+    
+    if patterns is None and patterncache.dataset_path(dataset_name).exists():
+        print(f"   ⚠️ Patterns not found for {style}, extracting...")
+        try:
+            patterns = run_pattern_extraction(dataset_name)
+            print(f"   ✅ Patterns extracted successfully")
+        except Exception as e:
+            print(f"   ⚠️ Pattern extraction failed: {e}")
+    return patterns
 
 
 @app.route('/api/extract-patterns', methods=['POST'])
 def extract_patterns():
     """
     Extract writing patterns from uploaded JSON dataset
-    Expects JSON: { "dataset_name": "boardy" }
+    Expects JSON: { "dataset_name": "boardy", "full_rebuild": false }
+    Only posts appended since the last extraction are read unless full_rebuild is set.
     """
     try:
         data = request.json
         dataset_name = data.get('dataset_name', 'boardy')
+        full_rebuild = bool(data.get('full_rebuild', False))
         original_name = dataset_name
         
         print(f"\n🔍 [PATTERN EXTRACTION] Request received for: {dataset_name}")
@@ -247,37 +674,25 @@ def extract_patterns():
             return jsonify({"error": f"Dataset {dataset_name}.json not found"}), 404
         
         # Run pattern extraction
-        output_path = DATA_FOLDER / 'processed' / f'patterns_{dataset_name}.json'
-        print(f"   → Output path: {output_path}")
-        print(f"   🚀 Running extractpatterns.py...")
-        
-        result = subprocess.run(
-            ['python', 'backend/extractpatterns.py', str(dataset_path), str(output_path)],
-            capture_output=True,
-            text=True,
-            cwd=Path(__file__).parent.parent
-        )
+        print(f"   🚀 Running pattern extraction...")
         
-        if result.returncode == 0:
-            print(f"   ✅ Extraction completed successfully!")
-            
-            with open(output_path, 'r') as f:
-                patterns = json.load(f)
-            
-            print(f"   📊 Patterns loaded: {len(patterns.get('opening_patterns', []))} openings, "
-                  f"{len(patterns.get('common_phrases', []))} phrases")
-            print(f"   ✅ Response sent to frontend\n")
-            
-            return jsonify({
-                "success": True,
-                "patterns": patterns,
-                "dataset": original_name,
-                "message": f"Patterns extracted successfully from {dataset_name}.json"
-            }), 200
-        else:
-            print(f"   ❌ Extraction failed!")
-            print(f"   STDERR: {result.stderr}")
-            return jsonify({"error": result.stderr}), 500
+        try:
+            patterns = run_pattern_extraction(dataset_name, incremental=not full_rebuild)
+        except Exception as e:
+            print(f"   ❌ Extraction failed: {e}")
+            return jsonify({"error": str(e)}), 500
+        
+        print(f"   ✅ Extraction completed successfully!")
+        print(f"   📊 Patterns loaded: {len(patterns.get('opening_patterns', []))} openings, "
+              f"{len(patterns.get('common_phrases', []))} phrases")
+        print(f"   ✅ Response sent to frontend\n")
+        
+        return jsonify({
+            "success": True,
+            "patterns": patterns,
+            "dataset": original_name,
+            "message": f"Patterns extracted successfully from {dataset_name}.json"
+        }), 200
             
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -287,8 +702,7 @@ def extract_patterns():
 def list_datasets():
     """List available datasets in data/raw/"""
     try:
-        raw_folder = DATA_FOLDER / 'raw'
-        datasets = [f.stem for f in raw_folder.glob('*.json')]
+        datasets = patterncache.dataset_names()
         
         return jsonify({
             "datasets": datasets,
@@ -299,6 +713,18 @@ def list_datasets():
         return jsonify({"error": str(e)}), 500
 
 
+@app.route('/api/cache-stats', methods=['GET'])
+def cache_stats():
+    """Hit/miss counters of the pattern and response caches, and cached prompt prefixes"""
+    import responsecache
+    from generator import prompt_prefix_stats
+    return jsonify({
+        "patterns": patterncache.stats(),
+        "responses": responsecache.stats(),
+        "prompt_prefixes": prompt_prefix_stats()
+    }), 200
+
+
 @app.route('/api/patterns', methods=['GET'])
 def get_patterns():
     """Get extracted patterns"""
@@ -317,11 +743,141 @@ def get_patterns():
         return jsonify({"error": str(e)}), 500
 
 
+def reload_api_key(signum=None, frame=None):
+    """Re-read .env and switch the shared Gemini client to the current key (SIGHUP)"""
+    load_dotenv(override=True)
+    llm.rotate_api_key()
+    analyzer_pool.restart()
+    print("🔑 Gemini API key reloaded")
+
+
+def warm_up():
+    """
+    Do the work the first /api/generate-post for each style would otherwise
+    pay for: extract patterns for any dataset in data/raw/ that has none,
+    load patterns and example posts into patterncache, build each style's
+    prompt prefix and template tables, and create the model client.
+    Marks this worker ready for /health when done; a dataset that fails is
+    reported there and loads lazily on request instead.
+    
+    Returns:
+        dict: Warm-up report, as served by /health
+    """
+    global _warm_up_report
+    from generator import get_prompt_prefix, get_template_tables
+    
+    started = time.perf_counter()
+    _warm_up_report = {"state": "running"}
+    styles = []
+    extracted = []
+    errors = {}
+    for name in patterncache.dataset_names():
+        try:
+            patterns = patterncache.get_patterns(name)
+            if patterns is None:
+                print(f"🔥 Extracting missing patterns for {name}")
+                patterns = run_pattern_extraction(name)
+                extracted.append(name)
+            for style in patterncache.styles_for(name):
+                get_prompt_prefix(style, patterns)
+                get_template_tables(style, patterns)
+                styles.append(style)
+            print(f"🔥 Preloaded patterns for {name}")
+        except Exception as e:
+            errors[name] = str(e)
+            print(f"⚠️ Warm-up failed for {name}: {e}")
+    try:
+        model_ready = llm.get_model() is not None
+    except Exception as e:
+        model_ready = False
+        errors["model"] = str(e)
+    
+    seconds = round(time.perf_counter() - started, 3)
+    _warm_up_report = {
+        "state": "done",
+        "seconds": seconds,
+        "styles": styles,
+        "extracted": extracted,
+        "model_client": model_ready,
+        "errors": errors,
+    }
+    _ready.set()
+    print(f"🔥 Warm-up finished in {seconds:.2f}s ({len(styles)} styles)")
+    return _warm_up_report
+
+
+def preload():
+    """
+    Import what this process would otherwise load on first use (the Gemini
+    SDK), so workers forked after this (gunicorn --preload) share it
+    """
+    if llm.MODEL_BACKEND != 'stub' and llm.GEMINI_AVAILABLE:
+        llm.load_sdk()
+
+
+def start_warm_up():
+    """Run warm_up() once per process on a background thread (no-op when WARM_UP=0)"""
+    global _warm_up_thread
+    with _warm_up_guard:
+        if _warm_up_thread is not None or _ready.is_set():
+            return
+        _warm_up_thread = threading.Thread(target=warm_up, name='warm-up', daemon=True)
+        _warm_up_thread.start()
+
+
+def shutdown(timeout=None):
+    """
+    Let queued and running analyses finish, then stop the Node analyzers and
+    the extraction pool, all within timeout seconds (run when a server
+    worker exits)
+    """
+    deadline = None if timeout is None else time.monotonic() + timeout
+    if not analysis_jobs.drain(timeout):
+        print("⚠️ Analysis jobs still running at shutdown; they will be reported as interrupted")
+    analyzer_pool.close()
+    if _extraction_pool is not None:
+        # Join the pool so its management thread is gone before the
+        # interpreter tears down; queued extractions are cancelled and a
+        # running one gets whatever is left of the window
+        closer = threading.Thread(target=_extraction_pool.shutdown, kwargs={'wait': True, 'cancel_futures': True},
+                                  name='extraction-pool-shutdown', daemon=True)
+        closer.start()
+        closer.join(None if deadline is None else max(deadline - time.monotonic(), 0))
+        if closer.is_alive():
+            print("⚠️ Pattern extraction still running at shutdown")
+
+
 # Serve uploaded videos (for preview)
 @app.route('/uploads/<filename>')
 def uploaded_file(filename):
-    """Serve uploaded video files"""
-    return send_from_directory(app.config['UPLOAD_FOLDER'], filename)
+    """
+    Serve uploaded video files with Range support and a strong ETag (the
+    SHA-256 for content-addressed videos, which never change and are cached
+    as immutable; size and mtime for other files).
+    """
+    folder = app.config['UPLOAD_FOLDER']
+    path = safe_join(folder, filename)
+    if path is None or not os.path.isfile(path):
+        abort(404)
+    
+    etag = videostore.file_etag(path)
+    if videostore.digest_from_filename(filename):
+        cache_control = f"public, max-age={IMMUTABLE_MAX_AGE}, immutable"
+    else:
+        cache_control = "public, no-cache"
+    
+    if UPLOADS_ACCEL_REDIRECT:
+        # Let nginx send the bytes (and handle Range) from its internal location
+        response = Response(mimetype=mimetypes.guess_type(filename)[0] or 'application/octet-stream')
+        response.headers['X-Accel-Redirect'] = UPLOADS_ACCEL_REDIRECT.rstrip('/') + '/' + filename
+        response.set_etag(etag)
+        response.make_conditional(request)
+        if response.status_code == 304:
+            del response.headers['X-Accel-Redirect']
+    else:
+        response = send_from_directory(folder, filename, etag=etag)
+    response.headers['Cache-Control'] = cache_control
+    return response
 
 
 if __name__ == '__main__':
@@ -330,6 +886,13 @@ if __name__ == '__main__':
     print(f"📁 Data folder: {DATA_FOLDER}")
     print(f"🌐 Server running on http://localhost:5001")
     print(f"📝 API docs: backend/API_GUIDE.md")
+    print(f"🏭 Development server; for production run: gunicorn -c gunicorn.conf.py app:app")
+    
+    # `kill -HUP <pid>` rotates the Gemini key without a restart
+    if hasattr(signal, 'SIGHUP'):
+        signal.signal(signal.SIGHUP, reload_api_key)
     
-    app.run(debug=True, host='0.0.0.0', port=5001)
+    start_warm_up()
+    # FLASK_DEBUG=1 for the reloader and debugger
+    app.run(debug=os.getenv('FLASK_DEBUG', '').lower() in ('1', 'true', 'yes'), host='0.0.0.0', port=5001)
 
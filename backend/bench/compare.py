@@ -0,0 +1,84 @@
+"""
+Compare two bench/run.py result files and flag regressions.
+
+Every median/percentile/per-call timing present in both files is compared;
+a timing counts as a regression when it grew by more than --threshold and by
+more than --min-ms in absolute terms (to ignore noise on tiny numbers).
+
+Usage:
+    python compare.py baseline.json current.json [--threshold 0.1]
+
+Exits with status 1 if anything regressed.
+"""
+import argparse
+import json
+import sys
+
+COMPARED = ('median_ms', 'p95_ms', 'p99_ms', 'us_per_call')
+
+
+def flatten(results, prefix=''):
+    """{'a.b.median_ms': value} for every compared timing"""
+    flat = {}
+    for key, value in results.items():
+        path = f"{prefix}.{key}" if prefix else key
+        if isinstance(value, dict):
+            flat.update(flatten(value, path))
+        elif key in COMPARED and isinstance(value, (int, float)):
+            flat[path] = value
+    return flat
+
+
+def compare(baseline, current, threshold=0.1, min_ms=1.0):
+    """
+    Returns:
+        list[dict]: One row per timing in both runs, with "ratio" and "regressed"
+    """
+    old = flatten(baseline.get('results', {}))
+    new = flatten(current.get('results', {}))
+    rows = []
+    for path in sorted(old.keys() & new.keys()):
+        before, after = old[path], new[path]
+        # us_per_call entries are microseconds
+        delta_ms = (after - before) / 1000 if path.endswith('us_per_call') else after - before
+        ratio = after / before if before else None
+        rows.append({
+            "metric": path,
+            "baseline": before,
+            "current": after,
+            "ratio": round(ratio, 3) if ratio is not None else None,
+            "regressed": ratio is not None and ratio > 1 + threshold and delta_ms > min_ms,
+        })
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare two benchmark result files")
+    parser.add_argument('baseline')
+    parser.add_argument('current')
+    parser.add_argument('--threshold', type=float, default=0.1, help="Allowed relative slowdown (default 0.1)")
+    parser.add_argument('--min-ms', type=float, default=1.0, help="Ignore slowdowns smaller than this")
+    parser.add_argument('--json', action='store_true', help="Print the comparison as JSON")
+    args = parser.parse_args()
+
+    with open(args.baseline, 'r', encoding='utf-8') as f:
+        baseline = json.load(f)
+    with open(args.current, 'r', encoding='utf-8') as f:
+        current = json.load(f)
+    rows = compare(baseline, current, args.threshold, args.min_ms)
+    regressions = [row for row in rows if row["regressed"]]
+
+    if args.json:
+        print(json.dumps({"rows": rows, "regressions": len(regressions)}, indent=2))
+    else:
+        print(f"{'metric':<60}{'baseline':>12}{'current':>12}{'ratio':>8}")
+        for row in rows:
+            marker = '  ❌' if row["regressed"] else ''
+            ratio = f"{row['ratio']:.2f}" if row["ratio"] is not None else '-'
+            print(f"{row['metric']:<60}{row['baseline']:>12}{row['current']:>12}{ratio:>8}{marker}")
+        print(f"\n{len(regressions)} regression(s) over {args.threshold:.0%}")
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == '__main__':
+    main()
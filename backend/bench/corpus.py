@@ -0,0 +1,140 @@
+"""
+Synthetic post corpora shaped like data/raw/*.json (schema in data/raw/format.txt).
+
+Posts are built from sentence fragments with the features the extractor
+looks at: several paragraphs, questions and exclamations, first/second
+person, bullet points, bold text, emoji and hashtags. The same seed always
+gives the same corpus, so benchmark runs are comparable.
+
+Usage:
+    python corpus.py 100000 corpus.json [--seed 1] [--jsonl]
+"""
+import argparse
+import datetime
+import json
+import random
+
+STYLES = ['performative', 'serious', 'cluely', 'boardy']
+
+OPENERS = [
+    "I'm incredibly humbled to announce", "Hot take", "Unpopular opinion", "I sent 47 cold DMs this week",
+    "Your network determines your net worth", "A year ago I felt stuck", "Today marks a milestone",
+    "Leveraging synergies is a paradigm shift", "Nobody talks about this", "I almost quit last month",
+    "Here's what nobody tells you about hiring", "Stop scrolling for a second",
+]
+SUBJECTS = [
+    "I", "We", "You", "Your team", "Every founder", "The best leaders", "My manager", "Our startup",
+    "People who win", "Most people", "The market", "This industry",
+]
+VERBS = [
+    "need to rethink", "are building", "underestimate", "keep ignoring", "should double down on",
+    "learned the hard way about", "finally understand", "are scaling", "keep talking about", "stopped chasing",
+]
+OBJECTS = [
+    "authentic connection", "cross-functional synergy", "the power of networking", "remote culture",
+    "AI-driven workflows", "your personal brand", "radical transparency", "the hiring funnel",
+    "operational excellence", "a growth mindset", "community over competition", "shipping fast",
+]
+CLOSERS = [
+    "What do you think?", "Agree or disagree?", "Drop your thoughts below!", "Let that sink in.",
+    "Thoughts? 👇", "Who else has felt this?", "Here's to the next chapter! 🚀",
+]
+EMOJI = ["🚀", "💡", "🔥", "🙏", "✅", "👇", "💭", "📈"]
+HASHTAGS = ["#Leadership", "#Growth", "#Startups", "#AI", "#Networking", "#Innovation", "#Hiring", "#Community"]
+
+
+def _sentence(rng):
+    sentence = f"{rng.choice(SUBJECTS)} {rng.choice(VERBS)} {rng.choice(OBJECTS)}"
+    roll = rng.random()
+    if roll < 0.15:
+        return sentence + "?"
+    if roll < 0.3:
+        return sentence + "!"
+    if roll < 0.35:
+        return f"**{sentence}**."
+    return sentence + "."
+
+
+def _paragraph(rng):
+    if rng.random() < 0.15:
+        return "\n".join(f"{rng.choice(['•', '→', '-', '✅'])} {rng.choice(OBJECTS)}" for _ in range(rng.randint(3, 5)))
+    text = " ".join(_sentence(rng) for _ in range(rng.randint(1, 4)))
+    if rng.random() < 0.2:
+        text += " " + rng.choice(EMOJI)
+    return text
+
+
+def make_post(index, rng):
+    """One post dictionary following data/raw/format.txt"""
+    style = rng.choice(STYLES)
+    paragraphs = [rng.choice(OPENERS) + "."]
+    paragraphs += [_paragraph(rng) for _ in range(rng.randint(2, 9))]
+    paragraphs.append(rng.choice(CLOSERS))
+    hashtags = rng.sample(HASHTAGS, rng.randint(0, 4))
+    if hashtags:
+        paragraphs.append(" ".join(hashtags))
+    posted = datetime.date(2024, 1, 1) + datetime.timedelta(days=index % 700)
+    return {
+        "post_id": f"SYN-{index:07d}",
+        "style_preset": style,
+        "date_posted": posted.isoformat(),
+        "original_context": f"{rng.choice(SUBJECTS)} {rng.choice(VERBS)} {rng.choice(OBJECTS)}",
+        "generated_post_text": "\n\n".join(paragraphs),
+        "visual_context": rng.choice(["", "Photo of a whiteboard", "Team selfie at an offsite", "Screenshot of a chart"]),
+        "engagement_metrics": {
+            "likes": int(rng.paretovariate(1.2) * 10),
+            "comments": int(rng.paretovariate(1.5) * 2),
+            "shares": int(rng.paretovariate(2.0)),
+        },
+        "key_hashtags": hashtags,
+    }
+
+
+def generate_posts(count, seed=1):
+    """Yield `count` synthetic posts (deterministic for a seed)"""
+    rng = random.Random(seed)
+    for index in range(count):
+        yield make_post(index, rng)
+
+
+def write_corpus(path, count, seed=1, jsonl=False):
+    """
+    Stream a corpus to disk without holding it in memory.
+
+    Args:
+        path (str): Output file
+        count (int): Number of posts
+        seed (int): Random seed
+        jsonl (bool): One post per line instead of a JSON array
+
+    Returns:
+        int: Bytes written
+    """
+    with open(path, 'w', encoding='utf-8') as f:
+        if jsonl:
+            for post in generate_posts(count, seed):
+                f.write(json.dumps(post, ensure_ascii=False))
+                f.write("\n")
+        else:
+            f.write("[\n")
+            for index, post in enumerate(generate_posts(count, seed)):
+                if index:
+                    f.write(",\n")
+                f.write(json.dumps(post, ensure_ascii=False, indent=2))
+            f.write("\n]\n")
+        return f.tell()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write a synthetic post corpus")
+    parser.add_argument('count', type=int)
+    parser.add_argument('output')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--jsonl', action='store_true', help="Write JSON Lines instead of a JSON array")
+    args = parser.parse_args()
+    size = write_corpus(args.output, args.count, args.seed, args.jsonl)
+    print(f"✅ Wrote {args.count} posts ({size / 1e6:.1f} MB) to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
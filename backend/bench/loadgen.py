@@ -0,0 +1,250 @@
+"""
+Closed-loop load generator for the Flask API.
+
+Each of --clients threads keeps one keep-alive connection and sends requests
+back to back (after an optional think time) until --duration or --requests
+is reached. Start the app against the model stub so the numbers measure our
+own code, not Gemini:
+
+    MODEL_BACKEND=stub MODEL_STUB_LATENCY=lognormal:0.8:0.5 python app.py
+    python bench/loadgen.py --clients 200 --duration 60 --mix generate:4,upload:1 -o load.json
+
+Scenarios:
+    generate  POST /api/generate-post with "cache": false
+    upload    POST /api/upload-video; each body is unique unless --dedupe, and
+              the analysis is awaited (wait=true, or job polling with --upload-mode job)
+    health    GET /health
+
+Results are JSON: throughput, status counts and latency percentiles per
+scenario. error_rate counts everything but a 200 from the model path,
+including posts that fell back to templates.
+"""
+import argparse
+import http.client
+import itertools
+import json
+import os
+import random
+import sys
+import threading
+import time
+import uuid
+from urllib.parse import urlsplit
+
+from timing import summarize
+
+CONTEXTS = [
+    "Launching our new AI hiring assistant",
+    "What I learned from 47 cold DMs",
+    "Why we moved the whole team to a four-day week",
+    "Our seed round closed today",
+    "The best manager I ever had",
+]
+STYLES = ['performative', 'serious', 'cluely', 'boardy']
+TERMINAL_STATES = ('succeeded', 'failed')  # as in jobs.py
+
+
+class Client:
+    """One simulated user with its own keep-alive connection"""
+
+    def __init__(self, base_url, args, rng):
+        parts = urlsplit(base_url)
+        self.host = parts.hostname
+        self.port = parts.port or 80
+        self.args = args
+        self.rng = rng
+        self.connection = None
+
+    def request(self, method, path, body=None, headers=None, timeout=None):
+        """Returns (status, parsed JSON or None); reconnects once on a dropped connection"""
+        for attempt in range(2):
+            if self.connection is None:
+                self.connection = http.client.HTTPConnection(self.host, self.port, timeout=timeout or self.args.timeout)
+            try:
+                self.connection.request(method, path, body=body, headers=headers or {})
+                response = self.connection.getresponse()
+                data = response.read()
+                break
+            except (http.client.HTTPException, OSError):
+                self.connection.close()
+                self.connection = None
+                if attempt:
+                    raise
+        try:
+            return response.status, json.loads(data) if data else None
+        except ValueError:
+            return response.status, None
+
+    def generate(self):
+        body = json.dumps({
+            "context": self.rng.choice(CONTEXTS),
+            "style": self.rng.choice(STYLES),
+            "cache": False,
+        })
+        status, data = self.request('POST', '/api/generate-post', body, {'Content-Type': 'application/json'})
+        if status == 200 and data and data.get('post', {}).get('generator') == 'template':
+            return 'template-fallback'  # the model call failed
+        return status
+
+    def upload(self):
+        video = self.args.video_bytes
+        if not self.args.dedupe:
+            video += uuid.uuid4().bytes
+        boundary = uuid.uuid4().hex
+        wait = self.args.upload_mode == 'wait'
+        body = b''.join([
+            f'--{boundary}\r\nContent-Disposition: form-data; name="context"\r\n\r\n'.encode(),
+            self.rng.choice(CONTEXTS).encode(),
+            f'\r\n--{boundary}\r\nContent-Disposition: form-data; name="wait"\r\n\r\n{str(wait).lower()}'.encode(),
+            f'\r\n--{boundary}\r\nContent-Disposition: form-data; name="video"; filename="load.mp4"\r\n'
+            f'Content-Type: video/mp4\r\n\r\n'.encode(),
+            video,
+            f'\r\n--{boundary}--\r\n'.encode(),
+        ])
+        status, data = self.request('POST', '/api/upload-video', body,
+                                    {'Content-Type': f'multipart/form-data; boundary={boundary}'})
+        if status != 202 or not data or 'job_id' not in data:
+            return status
+        # Poll the job until the analysis finishes
+        deadline = time.monotonic() + self.args.timeout
+        while time.monotonic() < deadline:
+            time.sleep(self.args.poll_interval)
+            job_status, job = self.request('GET', f"/api/jobs/{data['job_id']}")
+            if job_status != 200:
+                return job_status
+            if job.get('status') in TERMINAL_STATES:
+                return 200 if job['status'] == 'succeeded' else f"job-{job['status']}"
+        return 'job-timeout'
+
+    def health(self):
+        return self.request('GET', '/health')[0]
+
+
+def parse_mix(text):
+    """'generate:4,upload:1' -> ['generate', 'generate', 'generate', 'generate', 'upload']"""
+    mix = []
+    for part in text.split(','):
+        name, _, weight = part.partition(':')
+        name = name.strip()
+        if name not in ('generate', 'upload', 'health'):
+            raise argparse.ArgumentTypeError(f"Unknown scenario: {name}")
+        mix.extend([name] * int(weight or 1))
+    return mix
+
+
+def run_load(args):
+    """
+    Run the load test.
+
+    Returns:
+        dict: {"config", "elapsed_s", "scenarios": {name: stats}}
+    """
+    samples = {}
+    statuses = {}
+    lock = threading.Lock()
+    issued = itertools.count()
+    stop_at = time.monotonic() + args.duration if args.duration else None
+
+    def worker(index):
+        # Ramp up: spread client start times over --ramp-up seconds
+        if args.ramp_up:
+            time.sleep(args.ramp_up * index / args.clients)
+        rng = random.Random(args.seed * 100003 + index)
+        client = Client(args.url, args, rng)
+        while True:
+            if stop_at is not None and time.monotonic() >= stop_at:
+                break
+            if args.requests and next(issued) >= args.requests:
+                break
+            scenario = rng.choice(args.mix)
+            started = time.perf_counter()
+            try:
+                status = getattr(client, scenario)()
+            except (http.client.HTTPException, OSError) as e:
+                status = type(e).__name__
+            elapsed = time.perf_counter() - started
+            with lock:
+                samples.setdefault(scenario, []).append(elapsed)
+                counts = statuses.setdefault(scenario, {})
+                counts[str(status)] = counts.get(str(status), 0) + 1
+            if args.think:
+                time.sleep(rng.expovariate(1 / args.think))
+
+    threads = [threading.Thread(target=worker, args=(i,), daemon=True) for i in range(args.clients)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    scenarios = {}
+    for name, durations in samples.items():
+        ok = statuses[name].get('200', 0)
+        scenarios[name] = dict(
+            summarize(durations),
+            requests=len(durations),
+            ok=ok,
+            error_rate=round(1 - ok / len(durations), 4),
+            throughput_per_sec=round(len(durations) / elapsed, 2),
+            statuses=statuses[name],
+        )
+    return {
+        "config": {
+            "url": args.url,
+            "clients": args.clients,
+            "duration_s": args.duration,
+            "requests": args.requests,
+            "mix": args.mix_text,
+            "think_s": args.think,
+            "upload_mode": args.upload_mode,
+            "video_bytes": len(args.video_bytes),
+            "dedupe": args.dedupe,
+        },
+        "elapsed_s": round(elapsed, 3),
+        "scenarios": scenarios,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test the Flask API with concurrent clients")
+    parser.add_argument('--url', default='http://127.0.0.1:5001')
+    parser.add_argument('--clients', type=int, default=50)
+    parser.add_argument('--duration', type=float, default=30, help="Seconds to run (0 = until --requests)")
+    parser.add_argument('--requests', type=int, default=0, help="Stop after this many requests in total")
+    parser.add_argument('--mix', default='generate', help="Weighted scenarios, e.g. generate:4,upload:1")
+    parser.add_argument('--think', type=float, default=0.0, help="Mean think time between requests (s)")
+    parser.add_argument('--ramp-up', type=float, default=0.0, help="Seconds over which clients start")
+    parser.add_argument('--timeout', type=float, default=300)
+    parser.add_argument('--video', help="Video file to upload (default: 256 KB of random bytes)")
+    parser.add_argument('--dedupe', action='store_true', help="Upload identical bytes (exercise the caches)")
+    parser.add_argument('--upload-mode', choices=('job', 'wait'), default='job')
+    parser.add_argument('--poll-interval', type=float, default=0.2)
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('-o', '--output', help="Write results here instead of stdout")
+    args = parser.parse_args()
+    try:
+        args.mix_text, args.mix = args.mix, parse_mix(args.mix)
+    except (argparse.ArgumentTypeError, ValueError) as e:
+        parser.error(str(e))
+    if not args.duration and not args.requests:
+        parser.error("Give --duration or --requests")
+    if args.video:
+        with open(args.video, 'rb') as f:
+            args.video_bytes = f.read()
+    else:
+        args.video_bytes = os.urandom(256 * 1024)
+
+    print(f"🚦 {args.clients} clients against {args.url} ({args.mix_text})", file=sys.stderr)
+    report = run_load(args)
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text + '\n')
+        print(f"✅ Results written to {args.output}", file=sys.stderr)
+    else:
+        print(text)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,335 @@
+"""
+Benchmark suite for pattern extraction, prompt building, generation and
+process startup.
+
+Synthetic corpora (see corpus.py) are written once per size and seed and
+reused across runs. Gemini is replaced by modelstub.StubModel, so the
+generation numbers measure our own code plus the injected latency.
+
+Usage (from backend/):
+    python bench/run.py --sizes 1000,10000,100000 -o bench-results.json
+    python bench/run.py --sizes 1000000 --suites extraction --workers 0
+    python bench/run.py --suites startup
+    python bench/compare.py baseline.json bench-results.json
+
+Results are JSON: run metadata (git commit, Python, platform), the
+configuration, and per-suite timings in milliseconds.
+"""
+import argparse
+import contextlib
+import datetime
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+
+import extractpatterns  # noqa: E402
+import generator  # noqa: E402
+import llm  # noqa: E402
+from corpus import write_corpus  # noqa: E402
+from modelstub import StubModel, parse_latency  # noqa: E402
+from startup import bench_startup  # noqa: E402
+from timing import summarize  # noqa: E402
+
+DEFAULT_WORKDIR = BACKEND_DIR.parent / 'data' / 'cache' / 'bench'
+SUITES = ('extraction', 'prompt', 'generation', 'startup')
+
+# extractpatterns functions that take a list of posts
+LIST_FUNCTIONS = (
+    'extract_summary',
+    'overall_patterns',
+    'extract_openings',
+    'extract_sentence_starters',
+    'extract_common_phrases',
+    'detect_formatting_patterns',
+    'detect_tone_indicators',
+    'analyze_structure',
+    'extract_key_vocabulary',
+)
+
+CONTEXTS = [
+    "Launching our new AI hiring assistant",
+    "What I learned from 47 cold DMs",
+    "Why we moved the whole team to a four-day week",
+    "Our seed round closed today",
+    "The best manager I ever had",
+]
+
+
+@contextlib.contextmanager
+def quiet():
+    """Silence the progress prints of the code under test"""
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        yield
+
+
+def timed(func, repeat):
+    """Run func `repeat` times; (statistics, last return value)"""
+    samples = []
+    value = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        value = func()
+        samples.append(time.perf_counter() - started)
+    return summarize(samples), value
+
+
+def per_call(func, iterations):
+    """Mean microseconds per call over a tight loop"""
+    started = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    elapsed = time.perf_counter() - started
+    return {"iterations": iterations, "us_per_call": round(elapsed / iterations * 1e6, 2)}
+
+
+def with_rate(stats, count):
+    stats["posts_per_sec"] = round(count / (stats["median_ms"] / 1000)) if stats["median_ms"] else None
+    return stats
+
+
+def corpus_path(workdir, size, seed):
+    """Write the corpus for (size, seed) unless it already exists"""
+    path = Path(workdir) / f"corpus-{size}-seed{seed}.json"
+    if not path.exists():
+        tmp_path = path.with_suffix('.tmp')
+        print(f"📝 Writing {size} synthetic posts to {path}", file=sys.stderr)
+        write_corpus(tmp_path, size, seed)
+        os.replace(tmp_path, path)
+    return path
+
+
+def bench_extraction(size, args):
+    """Time every extractpatterns stage on one corpus size"""
+    path = corpus_path(args.workdir, size, args.seed)
+    result = {"corpus_bytes": path.stat().st_size}
+
+    stats, count = timed(lambda: sum(1 for _ in extractpatterns.iter_posts(str(path))), args.repeat)
+    result["iter_posts"] = with_rate(stats, count)
+
+    stats, _ = timed(
+        lambda: extractpatterns.analyze_posts(extractpatterns.iter_posts(str(path)), args.workers),
+        args.repeat
+    )
+    result["analyze_posts_streaming"] = with_rate(stats, size)
+
+    output_path = Path(args.workdir) / f"patterns-{size}.json"
+    with quiet():
+        stats, _ = timed(
+            lambda: extractpatterns.extract_patterns_from_file(str(path), str(output_path), args.workers),
+            args.repeat
+        )
+    result["extract_patterns_from_file"] = with_rate(stats, size)
+
+    # The list-based functions need the whole corpus in memory
+    if size > args.max_list_size:
+        result["skipped"] = f"list functions skipped above --max-list-size={args.max_list_size}"
+        return result
+
+    stats, posts = timed(lambda: extractpatterns.load_posts(str(path)), args.repeat)
+    result["load_posts"] = with_rate(stats, size)
+    for name in LIST_FUNCTIONS:
+        func = getattr(extractpatterns, name)
+        stats, _ = timed(lambda: func(posts), args.repeat)
+        result[name] = with_rate(stats, size)
+    stats, _ = timed(lambda: extractpatterns.analyze_posts(posts), args.repeat)
+    result["analyze_posts"] = with_rate(stats, size)
+    return result
+
+
+def bench_prompt(patterns, args):
+    """build_gemini_prompt with a cold and a warm prompt prefix cache"""
+    style = args.style
+    context = CONTEXTS[0]
+    generator.build_gemini_prompt(context, style, patterns)  # load example posts
+
+    def cold():
+        generator._prompt_prefixes.clear()
+        return generator.build_gemini_prompt(context, style, patterns)
+
+    return {
+        "style": style,
+        "prompt_chars": len(cold()),
+        "cold": per_call(cold, max(1, args.prompt_iterations // 10)),
+        "warm": per_call(lambda: generator.build_gemini_prompt(context, style, patterns), args.prompt_iterations),
+    }
+
+
+def bench_generation(patterns, args):
+    """generate_linkedin_post end to end (sequential and batched) against StubModel"""
+    style = args.style
+    result = {"style": style, "stub_latency": args.latency}
+    model = llm.use_model(StubModel(args.latency, seed=args.seed))
+
+    with quiet():
+        samples = []
+        for i in range(args.requests):
+            context = CONTEXTS[i % len(CONTEXTS)]
+            started = time.perf_counter()
+            post = generator.generate_linkedin_post(context, style, patterns, use_cache=False)
+            samples.append(time.perf_counter() - started)
+            if post["generator"] != "gemini":
+                raise RuntimeError("Stub model was not used; generation fell back to templates")
+        sequential = summarize(samples)
+        if args.constant_latency is not None:
+            # One generate and one polish call per post
+            sequential["overhead_ms"] = round(sequential["median_ms"] - 2 * args.constant_latency * 1000, 3)
+        result["sequential"] = sequential
+
+        items = [{"context": CONTEXTS[i % len(CONTEXTS)], "style": style} for i in range(args.requests)]
+        started = time.perf_counter()
+        results = list(generator.generate_linkedin_posts_batch(items, args.concurrency, use_cache=False))
+        elapsed = time.perf_counter() - started
+        errors = sum(1 for item in results if "error" in item)
+        result["batch"] = {
+            "concurrency": args.concurrency,
+            "posts": len(results),
+            "errors": errors,
+            "wall_ms": round(elapsed * 1000, 3),
+            "posts_per_sec": round(len(results) / elapsed, 2),
+        }
+        result["model_calls"] = model.calls
+    llm.use_model(None)
+    return result
+
+
+def git_commit():
+    try:
+        commit = subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=BACKEND_DIR, capture_output=True,
+                                text=True, timeout=10).stdout.strip()
+        dirty = subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'], cwd=BACKEND_DIR,
+                               capture_output=True, text=True, timeout=10).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        return None, None
+    return commit or None, bool(dirty)
+
+
+def run(args):
+    """
+    Run the selected suites.
+
+    Returns:
+        dict: {"meta", "config", "results"}
+    """
+    os.makedirs(args.workdir, exist_ok=True)
+    commit, dirty = git_commit()
+    report = {
+        "meta": {
+            "started_at": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec='seconds'),
+            "git_commit": commit,
+            "git_dirty": dirty,
+            "python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+        },
+        "config": {
+            "sizes": args.sizes,
+            "seed": args.seed,
+            "repeat": args.repeat,
+            "workers": args.workers,
+            "suites": args.suites,
+            "style": args.style,
+            "latency": args.latency,
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "import_budget_ms": args.import_budget_ms,
+            "ttfr_budget_ms": args.ttfr_budget_ms,
+        },
+        "results": {},
+    }
+    results = report["results"]
+
+    if 'extraction' in args.suites:
+        results["extraction"] = {}
+        for size in args.sizes:
+            print(f"⏱️ extraction: {size} posts", file=sys.stderr)
+            results["extraction"][str(size)] = bench_extraction(size, args)
+
+    if 'prompt' in args.suites or 'generation' in args.suites:
+        # Prompt and generation use patterns from the smallest corpus
+        size = min(args.sizes)
+        path = corpus_path(args.workdir, size, args.seed)
+        patterns = extractpatterns.analyze_posts(extractpatterns.iter_posts(str(path))).patterns()
+        if 'prompt' in args.suites:
+            print("⏱️ prompt", file=sys.stderr)
+            results["prompt"] = bench_prompt(patterns, args)
+        if 'generation' in args.suites:
+            print(f"⏱️ generation: {args.requests} requests", file=sys.stderr)
+            results["generation"] = bench_generation(patterns, args)
+
+    if 'startup' in args.suites:
+        print("⏱️ startup: imports and cold start", file=sys.stderr)
+        results["startup"] = bench_startup(args)
+
+    report["meta"]["finished_at"] = datetime.datetime.now(datetime.timezone.utc).isoformat(timespec='seconds')
+    return report
+
+
+def parse_sizes(text):
+    sizes = []
+    for part in text.split(','):
+        part = part.strip().lower()
+        scale = 1
+        if part.endswith('k'):
+            part, scale = part[:-1], 1000
+        elif part.endswith('m'):
+            part, scale = part[:-1], 1000000
+        sizes.append(int(float(part) * scale))
+    return sizes
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark extraction, prompt building and generation")
+    parser.add_argument('--sizes', type=parse_sizes, default=parse_sizes('1k,10k,100k'),
+                        help="Corpus sizes, e.g. 1k,10k,100k,1m (default: 1k,10k,100k)")
+    parser.add_argument('--suites', type=lambda text: text.split(','), default=list(SUITES),
+                        help=f"Comma-separated subset of {','.join(SUITES)}")
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--repeat', type=int, default=3, help="Runs per extraction measurement")
+    parser.add_argument('--workers', type=int, default=1, help="Worker processes for analyze_posts (0 = all cores)")
+    parser.add_argument('--max-list-size', type=int, default=100000,
+                        help="Largest corpus loaded into memory for the list-based functions")
+    parser.add_argument('--style', default='performative')
+    parser.add_argument('--prompt-iterations', type=int, default=2000)
+    parser.add_argument('--latency', default='0.05',
+                        help="Stub model latency per call: seconds or a modelstub spec, e.g. uniform:0.03:0.07")
+    parser.add_argument('--requests', type=int, default=50, help="Posts generated per generation run")
+    parser.add_argument('--concurrency', type=int, default=8, help="Batch generation concurrency")
+    parser.add_argument('--import-budget-ms', type=float, default=400,
+                        help="Target for `import app` in a fresh interpreter (default 400)")
+    parser.add_argument('--ttfr-budget-ms', type=float, default=2000,
+                        help="Target for a cold worker's spawn to first generated post (default 2000)")
+    parser.add_argument('--workdir', default=str(DEFAULT_WORKDIR), help="Where corpora are kept")
+    parser.add_argument('-o', '--output', help="Write results here instead of stdout")
+    args = parser.parse_args()
+    unknown = set(args.suites) - set(SUITES)
+    if unknown:
+        parser.error(f"Unknown suites: {', '.join(sorted(unknown))}")
+    try:
+        parse_latency(args.latency)
+    except ValueError as e:
+        parser.error(str(e))
+    try:
+        args.constant_latency = float(args.latency.removeprefix('const:'))
+    except ValueError:
+        args.constant_latency = None
+
+    report = run(args)
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text + '\n')
+        print(f"✅ Results written to {args.output}", file=sys.stderr)
+    else:
+        print(text)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,202 @@
+"""
+Process startup benchmarks: import time and cold time-to-first-response.
+
+Every measurement starts a fresh interpreter, so nothing is shared with the
+process running the suite:
+
+- imports: `python -X importtime -c "import <module>"` for the server
+  (app), the generation module and the extraction module, with the
+  slowest direct imports of each and whether the Gemini SDK was loaded.
+- cold_start: a one-worker gunicorn server from spawn until it answers
+  /health, until /health reports ready (warm-up done) and until its first
+  /api/generate-post response. The real Gemini SDK is used, pointed at a
+  zero-latency modelstub stand-in server, so SDK import and client setup
+  are included but model time is not.
+
+Both are checked against a budget (--import-budget-ms, --ttfr-budget-ms).
+"""
+import http.client
+import importlib.util
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+from modelstub import StubModel, start_server
+from timing import summarize
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+IMPORT_MODULES = ('app', 'generator', 'extractpatterns')
+# Modules that should only be imported on first use
+LAZY_MODULES = ('google.generativeai',)
+
+
+def parse_importtime(stderr):
+    """
+    Parse -X importtime output.
+
+    Returns:
+        list[tuple]: (depth, module, self_us, cumulative_us) in output order,
+        i.e. each module after the modules it imported
+    """
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        fields = line[len('import time:'):].split('|')
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            continue  # the header line
+        name = fields[2].rstrip()
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        rows.append((depth, name.strip(), int(fields[0]), int(fields[1])))
+    return rows
+
+
+def direct_imports(rows, module):
+    """Rows of the modules `module` imported itself (one level down)"""
+    children = []
+    for depth, name, self_us, cumulative_us in rows:
+        if depth == 0:
+            if name == module:
+                return children
+            children = []
+        elif depth == 1:
+            children.append((depth, name, self_us, cumulative_us))
+    return []
+
+
+def import_time(module, repeat, top=10):
+    """
+    Import `module` in `repeat` fresh interpreters (without a Gemini key).
+
+    Returns:
+        dict: Import time statistics, whole-process time (interpreter start
+        included), and the slowest direct imports of the median run
+    """
+    env = dict(os.environ, GEMINI_API_KEY='', MODEL_BACKEND='gemini')
+    env.pop('GEMINI_BASE_URL', None)
+    runs = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        proc = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+                              cwd=BACKEND_DIR, env=env, capture_output=True, text=True, timeout=120)
+        wall = time.perf_counter() - started
+        if proc.returncode:
+            raise RuntimeError(f"import {module} failed:\n{proc.stderr[-2000:]}")
+        rows = parse_importtime(proc.stderr)
+        total = next(row[3] for row in reversed(rows) if row[0] == 0 and row[1] == module)
+        runs.append((total, wall, rows))
+
+    runs.sort(key=lambda run: run[0])
+    median_rows = runs[len(runs) // 2][2]
+    loaded = {row[1] for row in median_rows}
+    slowest = sorted(direct_imports(median_rows, module), key=lambda row: -row[3])[:top]
+    return {
+        "import": summarize([run[0] / 1e6 for run in runs]),
+        "process": summarize([run[1] for run in runs]),
+        "modules": len(median_rows),
+        "lazy_modules_loaded": sorted(name for name in LAZY_MODULES if name in loaded),
+        "slowest_imports": [
+            {"module": name, "cumulative_ms": round(cumulative / 1000, 3), "self_ms": round(own / 1000, 3)}
+            for _, name, own, cumulative in slowest
+        ],
+    }
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def _request(port, method, path, body=None, timeout=60):
+    connection = http.client.HTTPConnection('127.0.0.1', port, timeout=timeout)
+    try:
+        headers = {'Content-Type': 'application/json'} if body else {}
+        connection.request(method, path, body=body, headers=headers)
+        response = connection.getresponse()
+        return response.status, response.read()
+    finally:
+        connection.close()
+
+
+def cold_start_once(model_url, timeout=60):
+    """
+    Start a one-worker gunicorn server and time its first responses.
+
+    Returns:
+        dict: Seconds from spawn to listening, ready and first post, and the
+        first and second /api/generate-post request times
+    """
+    port = free_port()
+    env = dict(os.environ, BIND=f'127.0.0.1:{port}', WEB_CONCURRENCY='1', MODEL_BACKEND='gemini',
+               GEMINI_API_KEY='bench', GEMINI_BASE_URL=model_url, ACCESS_LOG='', PIDFILE='')
+    body = json.dumps({"context": "Our seed round closed today", "style": "performative", "cache": False})
+    started = time.perf_counter()
+    proc = subprocess.Popen([sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', 'app:app'],
+                            cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    timings = {}
+    try:
+        deadline = started + timeout
+        while 'ready' not in timings:
+            if time.perf_counter() > deadline or proc.poll() is not None:
+                raise RuntimeError("Server did not become ready")
+            try:
+                status, _ = _request(port, 'GET', '/health', timeout=5)
+            except OSError:
+                time.sleep(0.05)
+                continue
+            timings.setdefault('listening', time.perf_counter() - started)
+            if status == 200:
+                timings['ready'] = time.perf_counter() - started
+            else:
+                time.sleep(0.05)
+
+        for key in ('first_request', 'second_request'):
+            request_started = time.perf_counter()
+            status, data = _request(port, 'POST', '/api/generate-post', body)
+            timings[key] = time.perf_counter() - request_started
+            if status != 200 or json.loads(data)['post'].get('generator') != 'gemini':
+                raise RuntimeError(f"Generation failed ({status}): {data[:200]!r}")
+            timings.setdefault('first_response', time.perf_counter() - started)
+    finally:
+        proc.terminate()
+        try:
+            proc.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+            proc.wait()
+    return timings
+
+
+def cold_start(repeat):
+    """
+    Cold worker time-to-first-response over `repeat` server starts.
+
+    Returns:
+        dict: Statistics per phase, or {"skipped": reason}
+    """
+    if importlib.util.find_spec('gunicorn') is None:
+        return {"skipped": "gunicorn is not installed"}
+    model = StubModel('0')
+    model_url = start_server(model)
+    runs = [cold_start_once(model_url) for _ in range(repeat)]
+    return {phase: summarize([run[phase] for run in runs]) for phase in runs[0]}
+
+
+def bench_startup(args):
+    """Import time and cold start, each against its budget"""
+    imports = {module: import_time(module, args.repeat) for module in IMPORT_MODULES}
+    imports["app"]["budget_ms"] = args.import_budget_ms
+    imports["app"]["within_budget"] = imports["app"]["import"]["median_ms"] <= args.import_budget_ms
+
+    result = {"imports": imports, "cold_start": cold_start(args.repeat)}
+    if "first_response" in result["cold_start"]:
+        result["cold_start"]["budget_ms"] = args.ttfr_budget_ms
+        result["cold_start"]["within_budget"] = (
+            result["cold_start"]["first_response"]["median_ms"] <= args.ttfr_budget_ms
+        )
+    return result
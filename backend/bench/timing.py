@@ -0,0 +1,22 @@
+"""Latency statistics shared by the benchmark and load-test scripts."""
+import statistics
+
+
+def summarize(samples):
+    """Millisecond statistics for a list of durations in seconds"""
+    ordered = sorted(sample * 1000 for sample in samples)
+
+    def percentile(p):
+        return ordered[min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))]
+
+    result = {
+        "runs": len(ordered),
+        "min_ms": round(ordered[0], 3),
+        "median_ms": round(statistics.median(ordered), 3),
+        "mean_ms": round(statistics.fmean(ordered), 3),
+        "max_ms": round(ordered[-1], 3),
+    }
+    if len(ordered) >= 20:
+        result["p95_ms"] = round(percentile(95), 3)
+        result["p99_ms"] = round(percentile(99), 3)
+    return result
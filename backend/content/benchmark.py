@@ -0,0 +1,76 @@
+"""
+Throughput benchmark for the fallback post templates.
+
+Compares the compiled registry (one chosen variant rendered) with eager
+rendering (every hook and template formatted, then one picked, which is what
+the generators used to do), and measures the cost of a hot-reload check.
+
+Usage:
+    python benchmark.py [-n ITERATIONS] [--json]
+"""
+import argparse
+import json
+import random
+import time
+
+from generator import TemplateRegistry, TEMPLATES_PATH
+
+
+def eager_render(raw_styles, style, topic, details):
+    """Format every hook and template, then choose one (the pre-registry behaviour)"""
+    spec = raw_styles[style]
+    hooks = [hook.format(topic=topic, details=details) for hook in spec.get('hooks', [])]
+    templates = [
+        template.format(topic=topic, details=details, hook=random.choice(hooks) if hooks else '')
+        for template in spec['templates']
+    ]
+    return random.choice(templates)
+
+
+def measure(func, iterations):
+    started = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    elapsed = time.perf_counter() - started
+    return {"posts_per_sec": round(iterations / elapsed), "us_per_post": round(elapsed / iterations * 1e6, 2)}
+
+
+def run(iterations=100000):
+    """
+    Returns:
+        dict: Per-style throughput for the eager and compiled paths
+    """
+    with open(TEMPLATES_PATH, 'r', encoding='utf-8') as f:
+        raw_styles = json.load(f)['styles']
+    topic, details = "AI hiring", "We replaced our interview loop with a take-home that takes 20 minutes."
+
+    cached = TemplateRegistry(reload_interval=-1)
+    checked = TemplateRegistry(reload_interval=0)
+    results = {}
+    for style in raw_styles:
+        results[style] = {
+            "eager": measure(lambda: eager_render(raw_styles, style, topic, details), iterations),
+            "compiled": measure(lambda: cached.render(style, topic, details), iterations),
+            "compiled_stat_every_call": measure(lambda: checked.render(style, topic, details), iterations),
+        }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark fallback post templates")
+    parser.add_argument('-n', '--iterations', type=int, default=100000)
+    parser.add_argument('--json', action='store_true', help="Print results as JSON")
+    args = parser.parse_args()
+
+    results = run(args.iterations)
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f"{'style':<14}{'mode':<26}{'posts/sec':>12}{'µs/post':>10}")
+    for style, modes in results.items():
+        for mode, numbers in modes.items():
+            print(f"{style:<14}{mode:<26}{numbers['posts_per_sec']:>12}{numbers['us_per_post']:>10}")
+
+
+if __name__ == '__main__':
+    main()
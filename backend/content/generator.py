@@ -1,198 +1,185 @@
 import json
-import random
 import os
+import random
+import string
+import threading
+import time
 from pathlib import Path
 
 # Get the base directory for data files
 BASE_DIR = Path(__file__).parent.parent.parent
 DATA_DIR = BASE_DIR / "data"
+TEMPLATES_PATH = Path(os.getenv('CONTENT_TEMPLATES_PATH', Path(__file__).parent / 'templates.json'))
+# Seconds between checks of templates.json for changes (0 = every call, negative = never)
+TEMPLATE_RELOAD_INTERVAL = float(os.getenv('TEMPLATE_RELOAD_INTERVAL', '1'))
+
+_formatter = string.Formatter()
+
+
+def compile_template(text):
+    """
+    Split a template into literal text and field names once, so rendering is
+    a join instead of a format parse.
+
+    Returns:
+        tuple: Alternating (literal, field) pairs; field is None after the last literal
+    """
+    parts = []
+    for literal, field, format_spec, conversion in _formatter.parse(text):
+        if format_spec or conversion:
+            raise ValueError(f"Unsupported placeholder {{{field}!{conversion}:{format_spec}}}")
+        parts.append((literal, field))
+    return tuple(parts)
+
+
+def render_template(compiled, values):
+    """Fill a compiled template; values are inserted verbatim (never re-parsed)"""
+    return ''.join([
+        literal + values[field] if field is not None else literal
+        for literal, field in compiled
+    ])
+
+
+class TemplateRegistry:
+    """
+    Compiled post templates per style, loaded from a JSON data file.
+
+    The file is read on first use and re-read when its (mtime, size)
+    changes, checked at most every `reload_interval` seconds. A file that
+    fails to load leaves the previous templates in place.
+
+    File format:
+        {"default_style": "...", "aliases": {"name": "style"},
+         "styles": {"style": {"hooks": ["..."], "templates": ["...{hook}..."]}}}
+
+    Templates may use {topic}, {details} and {hook} (a randomly chosen hook,
+    itself rendered with {topic} and {details}).
+    """
+
+    def __init__(self, path=TEMPLATES_PATH, reload_interval=TEMPLATE_RELOAD_INTERVAL):
+        self.path = Path(path)
+        self.reload_interval = reload_interval
+        self._lock = threading.Lock()
+        self._data = None
+        self._checked_at = 0.0
+
+    def _stat_signature(self):
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def _load(self, signature):
+        with open(self.path, 'r', encoding='utf-8') as f:
+            raw = json.load(f)
+        styles = {
+            name: (
+                tuple(compile_template(hook) for hook in spec.get('hooks', [])),
+                tuple(compile_template(template) for template in spec['templates']),
+            )
+            for name, spec in raw['styles'].items()
+        }
+        default_style = raw.get('default_style') or next(iter(styles))
+        return {
+            "styles": styles,
+            "aliases": {alias.lower(): style for alias, style in raw.get('aliases', {}).items()},
+            "default": styles[default_style],
+            "signature": signature,
+        }
+
+    def _current(self):
+        """Loaded templates, (re)loading if due and the file changed"""
+        data = self._data
+        now = time.monotonic()
+        if data is not None and (self.reload_interval < 0 or now - self._checked_at < self.reload_interval):
+            return data
+        with self._lock:
+            self._checked_at = now
+            signature = self._stat_signature()
+            if self._data is None or signature != self._data["signature"]:
+                try:
+                    self._data = self._load(signature)
+                except (OSError, ValueError, KeyError, TypeError, StopIteration) as e:
+                    if self._data is None:
+                        raise
+                    print(f"Warning: could not reload templates from {self.path}: {e}")
+            return self._data
+
+    def styles(self):
+        """Names of the styles in the registry (without aliases)"""
+        return list(self._current()["styles"])
+
+    def render(self, style, topic, details):
+        """Render one randomly chosen template of a style (unknown styles use the default)"""
+        data = self._current()
+        style = style.lower()
+        hooks, templates = data["styles"].get(
+            data["aliases"].get(style, style), data["default"]
+        )
+        values = {"topic": topic, "details": details}
+        if hooks:
+            values["hook"] = render_template(random.choice(hooks), values)
+        return render_template(random.choice(templates), values)
+
+
+registry = TemplateRegistry()
+
+_posts_cache = {}
+
 
 def load_posts_by_style(style):
-    """Load example posts for a specific style"""
+    """Load example posts for a specific style (cached until the file changes)"""
     style_map = {
         'performative': 'professional.json',
-        'serious': 'professional.json', 
+        'serious': 'professional.json',
         'cluely': 'cluely.json',
         'boardy': 'boardy.json'
     }
-    
+
     filename = style_map.get(style.lower(), 'professional.json')
     filepath = DATA_DIR / "raw" / filename
-    
+
     try:
+        stat = os.stat(filepath)
+        signature = (stat.st_mtime_ns, stat.st_size)
+        cached = _posts_cache.get(filepath)
+        if cached is not None and cached[0] == signature:
+            return cached[1]
         with open(filepath, 'r', encoding='utf-8') as f:
             data = json.load(f)
             if isinstance(data, list):
-                return data
+                posts = data
             elif isinstance(data, dict) and 'posts' in data:
-                return data['posts']
+                posts = data['posts']
             else:
-                return []
+                posts = []
+        _posts_cache[filepath] = (signature, posts)
+        return posts
     except FileNotFoundError:
         print(f"Warning: Posts file not found at {filepath}")
         return []
 
 def generate_cluely_post(topic, details):
     """Generate a Cluely-style controversial post"""
-    hooks = [
-        f"{topic} isn't the problem — your mindset is.",
-        f"Hot take: {topic} is actually the future.",
-        f"Everyone's pretending they don't use {topic}. I just said the quiet part out loud.",
-        f"You think {topic} is wrong until it works.",
-        f"Unpopular opinion: {topic} is efficient, not unethical."
-    ]
-    
-    templates = [
-        f"{random.choice(hooks)}\n\nIf you think {details}, then you're missing the point.\n\nThe world is changing faster than your comfort zone. Adapt or get left behind.\n\n💭 Debate me below.",
-        f"{random.choice(hooks)}\n\nLet's be real: everyone's already doing this. I'm just being honest about it.\n\n{details}\n\nStop pretending authenticity matters more than results.\n\nThoughts? 👇",
-        f"{random.choice(hooks)}\n\nYour company's values are built on fear, not innovation.\n\n{details}\n\nThe future doesn't wait for permission.\n\n#Disruption #Innovation #AI"
-    ]
-    
-    return random.choice(templates)
+    return registry.render('cluely', topic, details)
 
 def generate_boardy_post(topic, details):
     """Generate a Boardy-style relatable/personal post"""
-    openings = [
-        "💭 A year ago, I felt stuck.",
-        "If you're tired of feeling like everyone's life is moving faster than yours - read this:",
-        "I've almost given up on my dream more times than I can count.",
-        "My best friends are crushing it. And for a while, that hurt."
-    ]
-    
-    template = f"""{random.choice(openings)}
-
-{details}
-
-It felt like everyone around me had it figured out. New jobs. Promotions. {topic}.
-
-And you scroll through LinkedIn thinking:
-"What am I even doing?"
-"How are they so far ahead?"
-
-But that mindset is the trap.
-
-Once I stopped comparing and started connecting with people on the same journey, everything changed.
-
-You realize success isn't a race. It's a community.
-
-The more you're around people chasing real goals (not just posting about them), the more you start believing it's possible for you too.
-
-So here's the truth:
-If you want help building {topic}, you need people who get it.
-
-Because when you spend time with the right people, you don't fall behind — you level up together.
-
-Want to join a community like that? 👇"""
-    
-    return template
+    return registry.render('boardy', topic, details)
 
 def generate_performative_post(topic, details):
     """Generate a classic performative LinkedIn post"""
-    openings = [
-        "I'm incredibly humbled to announce...",
-        "I'm honored to share...",
-        "After years of hard work...",
-        "Today marks a significant milestone...",
-        "I never thought I'd be saying this, but..."
-    ]
-    
-    templates = [
-        f"""{random.choice(openings)}
-
-{details}
-
-This journey wouldn't have been possible without the amazing team who believed in {topic} from day one.
-
-Key learnings:
-✅ Always stay curious
-✅ Embrace failure as growth
-✅ Network with purpose
-✅ Give back to the community
-
-Here's to the next chapter! 🚀
-
-What's your biggest career lesson this year? Drop it below! 👇
-
-#Leadership #Growth #Success #Grateful""",
-        
-        f"""Lesson learned about {topic}:
-
-{details}
-
-5 years ago, I would have never imagined this.
-
-But here's what I've learned:
-→ Success is a team sport
-→ Authenticity builds trust
-→ Impact over ego
-→ Always be learning
-
-Grateful for this journey and excited for what's next! 💡
-
-What resonates with you? Let me know in the comments!
-
-#ThoughtLeadership #Innovation #CareerGrowth"""
-    ]
-    
-    return random.choice(templates)
+    return registry.render('performative', topic, details)
 
 def generate_serious_post(topic, details):
     """Generate a serious/corporate jargon heavy post"""
-    templates = [
-        f"""Leveraging synergies in {topic}: A paradigm shift
-
-{details}
-
-In today's rapidly evolving landscape, organizations must pivot to embrace transformational strategies that drive stakeholder value.
-
-Key takeaways:
-🔹 Optimize vertical integration
-🔹 Maximize operational excellence
-🔹 Foster cross-functional collaboration
-🔹 Deploy agile methodologies
-
-Moving forward, we must think outside the box to achieve mission-critical objectives.
-
-Let's circle back offline to drill down on these action items.
-
-#DigitalTransformation #EnterpriseStrategy #Innovation #Leadership""",
-        
-        f"""Disrupting {topic} through strategic innovation
-
-{details}
-
-As we navigate the new normal, it's imperative to:
-• Cultivate a culture of continuous improvement
-• Harness the power of data-driven insights
-• Scale sustainable growth initiatives
-• Drive best-in-class customer experiences
-
-At the end of the day, it's about creating value propositions that resonate with our core competencies.
-
-Let's ideate and workshop solutions that move the needle.
-
-#BusinessStrategy #Synergy #ThoughtLeadership"""
-    ]
-    
-    return random.choice(templates)
+    return registry.render('serious', topic, details)
 
 def generate_post(topic, details, style='professional'):
     """Generate a LinkedIn post based on topic, details, and style"""
-    style = style.lower()
-    
-    generators = {
-        'performative': generate_performative_post,
-        'serious': generate_serious_post,
-        'cluely': generate_cluely_post,
-        'boardy': generate_boardy_post,
-        'professional': generate_performative_post
-    }
-    
-    generator_func = generators.get(style, generate_performative_post)
-    
     try:
-        return generator_func(topic, details)
+        return registry.render(style, topic, details)
     except Exception as e:
         print(f"Error generating post: {e}")
         return f"Thoughts on {topic}:\n\n{details}\n\nWhat do you think? Let me know in the comments! 👇\n\n#LinkedIn #Thoughts"
-
@@ -1,6 +1,6 @@
 from flask import Flask, request, jsonify
 from flask_cors import CORS
-from generator import generate_post
+from generator import generate_post, registry
 import os
 from dotenv import load_dotenv
 from pathlib import Path
@@ -42,12 +42,19 @@ def generate():
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+def warm_up():
+    """Compile the post templates before the first request (run at server worker boot)"""
+    print(f"🔥 Preloaded templates for {', '.join(registry.styles())}")
+
 if __name__ == '__main__':
     port = int(os.getenv('FLASK_PORT', 5001))
     print(f'\n🚀 Content Generator API running on http://localhost:{port}')
     print('📊 Endpoints available:')
     print(f'   GET  http://localhost:{port}/health')
     print(f'   POST http://localhost:{port}/generate')
+    print('   (development server; for production: gunicorn -c ../gunicorn.conf.py server:app)')
     print('\n')
-    app.run(debug=True, port=port, host='0.0.0.0')
+    warm_up()
+    # FLASK_DEBUG=1 for the reloader and debugger
+    app.run(debug=os.getenv('FLASK_DEBUG', '').lower() in ('1', 'true', 'yes'), port=port, host='0.0.0.0')
 
@@ -1,6 +1,32 @@
+import codecs
 import json
 import re
 import os
+import hashlib
+import heapq
+import uuid
+from collections import Counter
+from operator import itemgetter
+
+# Common stopwords to exclude from vocabulary
+STOPWORDS = {'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for',
+             'of', 'with', 'by', 'from', 'as', 'is', 'was', 'are', 'been', 'be',
+             'have', 'has', 'had', 'do', 'does', 'did', 'will', 'would', 'could',
+             'should', 'may', 'might', 'can', 'this', 'that', 'these', 'those'}
+
+# Characters that mark a post as using special formatting
+SPECIAL_CHARS = ['𝗯', '𝗶', '𝘣', '𝘪', '→', '➢', '•', '✓', '✅', '❌']
+
+# Bump when PatternAnalyzer.to_state() changes shape
+STATE_VERSION = 1
+
+# Compiled once and shared by every statistic
+WORD_RE = re.compile(r'\b\w+\b')
+OPENING_SPLIT_RE = re.compile(r'[.!?]\s+')
+STARTER_SPLIT_RE = re.compile(r'[.!?]\n')
+SENTENCE_SPLIT_RE = re.compile(r'[.!?]+')
+# Same test as ord(c) > 127000
+EMOJI_RE = re.compile('[\U0001F019-\U0010FFFF]')
 
 def load_posts(filename):
     """
@@ -20,6 +46,131 @@ def load_posts(filename):
     with open(filepath, 'r', encoding='utf-8') as f:
         return json.load(f)
 
+def iter_posts(input_path, chunk_size=1 << 16):
+    """
+    Stream posts from a JSON array or JSON Lines file one at a time.
+
+    Only the post being decoded (plus one read chunk) is held in memory,
+    so callers that fold posts into counters run in memory proportional
+    to their vocabulary rather than the size of the file.
+
+    Args:
+        input_path (str): Path to a JSON array (.json) or JSON Lines file
+        chunk_size (int): Bytes read from disk at a time
+
+    Yields:
+        dict: One post per element/line
+    """
+    return iter(PostReader(input_path, chunk_size=chunk_size))
+
+class PostReader:
+    """
+    Iterable over the posts of a JSON array or JSON Lines file that also
+    tracks ``offset``: the byte position just past the last post yielded.
+
+    Passing a previous ``offset`` back in as ``start`` resumes after that
+    post, so posts appended to the file later can be read without decoding
+    the ones before them.
+    """
+
+    def __init__(self, input_path, start=0, chunk_size=1 << 16):
+        self.input_path = input_path
+        self.start = start
+        self.chunk_size = chunk_size
+        self.format = None
+        self._mark = (start, '', 0)
+
+    @property
+    def offset(self):
+        """Byte offset just past the last post yielded (or ``start``)."""
+        base, buf, end = self._mark
+        return base + len(buf[:end].encode('utf-8'))
+
+    def __iter__(self):
+        with open(self.input_path, 'rb') as f:
+            head = f.read(self.chunk_size)
+            while head.isspace():
+                chunk = f.read(self.chunk_size)
+                if not chunk:
+                    break
+                head += chunk
+            if head.lstrip()[:1] == b'[':
+                self.format = 'array'
+                if self.start:
+                    # Resuming just after an element: ',' or ']' comes next
+                    f.seek(self.start)
+                    yield from self._iter_array(f, '', self.start, False)
+                else:
+                    f.seek(len(head) - len(head.lstrip()) + 1)
+                    yield from self._iter_array(f, '', f.tell(), True)
+            else:
+                # JSON Lines: one post object per non-blank line
+                self.format = 'jsonl'
+                f.seek(self.start)
+                position = self.start
+                for line in f:
+                    position += len(line)
+                    if line.strip():
+                        post = json.loads(line)
+                        self._mark = (position, '', 0)
+                        yield post
+
+    def _iter_array(self, f, buf, base, expect_value):
+        """Decode array elements; buf[0] sits at byte offset base."""
+        decoder = json.JSONDecoder()
+        utf8 = codecs.getincrementaldecoder('utf-8')()
+        chunk_size = self.chunk_size
+        pos = 0
+        eof = False
+        while True:
+            # Skip whitespace, refilling the buffer as needed
+            while True:
+                while pos < len(buf) and buf[pos] in ' \t\r\n':
+                    pos += 1
+                if pos < len(buf) or eof:
+                    break
+                base += len(buf.encode('utf-8'))
+                raw = f.read(chunk_size)
+                eof = not raw
+                buf, pos = utf8.decode(raw, eof), 0
+            if pos >= len(buf):
+                raise ValueError("Unexpected end of JSON array")
+
+            if not expect_value:
+                # Between elements: ',' or the closing ']'
+                if buf[pos] == ']':
+                    return
+                if buf[pos] != ',':
+                    raise ValueError(f"Expected ',' or ']' in JSON array, got {buf[pos]!r}")
+                pos += 1
+                expect_value = True
+                continue
+            if buf[pos] == ']':
+                return
+
+            # Decode one element; an element touching the end of the buffer may
+            # be truncated (e.g. a number), so read more before trusting it
+            try:
+                post, end = decoder.raw_decode(buf, pos)
+                if end == len(buf) and not eof:
+                    raise ValueError("element may continue in the next chunk")
+            except ValueError:
+                if eof:
+                    raise
+                raw = f.read(chunk_size)
+                eof = not raw
+                base += len(buf[:pos].encode('utf-8'))
+                buf, pos = buf[pos:] + utf8.decode(raw, eof), 0
+                continue
+            self._mark = (base, buf, end)
+            yield post
+            pos = end
+            expect_value = False
+            # Drop consumed text so the buffer stays around one chunk
+            if pos > chunk_size:
+                base += len(buf[:pos].encode('utf-8'))
+                buf, pos = buf[pos:], 0
+
 def extract_summary(posts):
     """
     Summarize key attributes from posts in a Gemini-friendly format.
@@ -121,28 +272,22 @@ def extract_sentence_starters(posts, top_n=20):
 
 def extract_common_phrases(posts, top_n=50):
     """Extract common 2-3 word phrases"""
-    from collections import Counter
-    phrases = []
+    counter = Counter()
     
     for post in posts:
         text = post.get('generated_post_text') or post.get('full_post_text') or ''
         if text:
             # Clean and split into words
             text = text.lower()
-            words = re.findall(r'\b\w+\b', text)
+            words = WORD_RE.findall(text)
             
-            # Extract 2-word phrases
-            for i in range(len(words) - 1):
-                phrase = f"{words[i]} {words[i+1]}"
-                if len(words[i]) > 2 or len(words[i+1]) > 2:  # At least one substantial word
-                    phrases.append(phrase)
+            # Count 2-word phrases with at least one substantial word
+            counter.update(f"{first} {second}" for first, second in zip(words, words[1:])
+                           if len(first) > 2 or len(second) > 2)
             
-            # Extract 3-word phrases
-            for i in range(len(words) - 2):
-                phrase = f"{words[i]} {words[i+1]} {words[i+2]}"
-                phrases.append(phrase)
+            # Count 3-word phrases
+            counter.update(map(' '.join, zip(words, words[1:], words[2:])))
     
-    counter = Counter(phrases)
     return counter.most_common(top_n)
 
 def detect_formatting_patterns(posts):
@@ -247,66 +392,390 @@ def analyze_structure(posts):
 
 def extract_key_vocabulary(posts, top_n=30):
     """Extract most common meaningful words"""
-    from collections import Counter
-    
-    # Common stopwords to exclude
-    stopwords = {'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 
-                 'of', 'with', 'by', 'from', 'as', 'is', 'was', 'are', 'been', 'be',
-                 'have', 'has', 'had', 'do', 'does', 'did', 'will', 'would', 'could',
-                 'should', 'may', 'might', 'can', 'this', 'that', 'these', 'those'}
-    
-    words = []
+    counter = Counter()
     for post in posts:
         text = post.get('generated_post_text') or post.get('full_post_text') or ''
         if text:
-            # Extract words (lowercase)
-            text_words = re.findall(r'\b\w+\b', text.lower())
-            for word in text_words:
-                if word not in stopwords and len(word) > 3:
-                    words.append(word)
+            # Count words (lowercase)
+            counter.update(word for word in WORD_RE.findall(text.lower())
+                           if word not in STOPWORDS and len(word) > 3)
     
-    counter = Counter(words)
     return counter.most_common(top_n)
 
-def extract_patterns_from_file(input_path, output_path):
+class PatternAnalyzer:
+    """
+    Single-pass pattern extractor.
+
+    Feeds every statistic of the extract_* / detect_* / analyze_* functions
+    above from one walk over the posts: each post's text is resolved,
+    lowercased, tokenized and split into paragraphs once. ``patterns()``
+    returns exactly what those functions return for the same posts, in the
+    same order (Counters are updated in the order the original lists were
+    built, so ``most_common`` ties break identically).
+    """
+
+    def __init__(self):
+        self.post_count = 0
+        self.openings = []
+        self.starters = Counter()
+        # All bigrams and trigrams, including short-word bigrams
+        self.phrases = Counter()
+        # All lowercased words, including stopwords
+        self.words = Counter()
+        # Formatting
+        self.bold_count = 0
+        self.bullet_count = 0
+        self.emoji_count = 0
+        self.special_chars = False
+        self.paragraph_chars = 0
+        self.paragraph_count = 0
+        # Tone
+        self.questions = 0
+        self.exclamations = 0
+        self.direct_address = 0
+        self.first_person = 0
+        self.second_person = 0
+        # Structure
+        self.total_length = 0
+        self.total_sentences = 0
+        self.total_words = 0
+
+    def add_posts(self, posts):
+        """Analyze every post in an iterable of post dictionaries."""
+        for post in posts:
+            self.add_post(post)
+        return self
+
+    def add_post(self, post):
+        """Analyze one post dictionary."""
+        self.add_text(post_text(post))
+
+    def add_texts(self, texts):
+        """Analyze every post text in an iterable of strings."""
+        for text in texts:
+            self.add_text(text)
+        return self
+
+    def add_text(self, text):
+        """Analyze the text of one post (empty text still counts as a post)."""
+        self.post_count += 1
+        if not text:
+            return
+
+        # Openings: first sentence of the stripped text
+        first_sentence = OPENING_SPLIT_RE.split(text.strip(), 1)[0]
+        if first_sentence:
+            self.openings.append(first_sentence.strip())
+
+        # Sentence starters
+        first_words = [words[0].lower().strip('.,!?;:')
+                       for words in map(str.split, STARTER_SPLIT_RE.split(text)) if words]
+        self.starters.update(word for word in first_words if len(word) > 2)
+
+        # Tokenize once; bigrams, then trigrams, then words. Everything is
+        # counted unfiltered so the loops stay in C; the length/stopword
+        # filters are applied per distinct key in patterns().
+        text_lower = text.lower()
+        words = WORD_RE.findall(text_lower)
+        self.phrases.update(map(' '.join, zip(words, words[1:])))
+        self.phrases.update(map(' '.join, zip(words, words[1:], words[2:])))
+        self.words.update(words)
+
+        # Formatting
+        self.bold_count += text.count('**') + text.count('𝗯') + text.count('𝘣')
+        self.bullet_count += text.count('•') + text.count('➢') + text.count('→')
+        self.emoji_count += len(EMOJI_RE.findall(text))
+        if not self.special_chars and any(c in text for c in SPECIAL_CHARS):
+            self.special_chars = True
+        for para in text.split('\n\n'):
+            if para.strip():
+                self.paragraph_chars += len(para)
+                self.paragraph_count += 1
+
+        # Tone
+        self.questions += text.count('?')
+        self.exclamations += text.count('!')
+        you = text_lower.count(' you ')
+        self.direct_address += you + text_lower.count(' your ')
+        self.first_person += text_lower.count(' i ') + text_lower.count(' my ') + text_lower.count(' we ')
+        self.second_person += you
+
+        # Structure
+        self.total_length += len(text)
+        self.total_sentences += len([s for s in SENTENCE_SPLIT_RE.split(text) if s.strip()])
+        if len(text_lower) == len(text):
+            # Lowercasing only changes word boundaries when it changes the
+            # length (e.g. 'İ' -> 'i̇'), so the lowercased tokens count the same
+            self.total_words += len(words)
+        else:
+            self.total_words += len(WORD_RE.findall(text))
+
+    def merge(self, other):
+        """
+        Fold in the partial results of an analyzer that saw the posts
+        following this one's (e.g. the next shard). Merging shards in order
+        gives the same patterns as analyzing all posts in one analyzer.
+        """
+        self.post_count += other.post_count
+        self.openings.extend(other.openings)
+        self.starters.update(other.starters)
+        self.phrases.update(other.phrases)
+        self.words.update(other.words)
+        self.bold_count += other.bold_count
+        self.bullet_count += other.bullet_count
+        self.emoji_count += other.emoji_count
+        self.special_chars = self.special_chars or other.special_chars
+        self.paragraph_chars += other.paragraph_chars
+        self.paragraph_count += other.paragraph_count
+        self.questions += other.questions
+        self.exclamations += other.exclamations
+        self.direct_address += other.direct_address
+        self.first_person += other.first_person
+        self.second_person += other.second_person
+        self.total_length += other.total_length
+        self.total_sentences += other.total_sentences
+        self.total_words += other.total_words
+        return self
+
+    # Attributes that are plain numbers/flags in to_state()/from_state()
+    _TOTALS = ('post_count', 'bold_count', 'bullet_count', 'emoji_count', 'special_chars',
+               'paragraph_chars', 'paragraph_count', 'questions', 'exclamations',
+               'direct_address', 'first_person', 'second_person', 'total_length',
+               'total_sentences', 'total_words')
+
+    def to_state(self):
+        """JSON-serializable raw aggregates (Counters keep insertion order)."""
+        state = {name: getattr(self, name) for name in self._TOTALS}
+        state['openings'] = self.openings
+        state['starters'] = dict(self.starters)
+        state['phrases'] = dict(self.phrases)
+        state['words'] = dict(self.words)
+        return state
+
+    @classmethod
+    def from_state(cls, state):
+        """Rebuild an analyzer from to_state() output."""
+        analyzer = cls()
+        for name in cls._TOTALS:
+            setattr(analyzer, name, state[name])
+        analyzer.openings = list(state['openings'])
+        analyzer.starters = Counter(state['starters'])
+        analyzer.phrases = Counter(state['phrases'])
+        analyzer.words = Counter(state['words'])
+        return analyzer
+
+    def patterns(self, top_starters=20, top_phrases=50, top_vocabulary=30):
+        """
+        Build the patterns dictionary written to patterns_<style>.json.
+
+        Returns:
+            dict: Same keys and values as the per-function extraction.
+        """
+        n = self.post_count
+        avg_sentences = self.total_sentences / n if n else 0
+        avg_words = self.total_words / n if n else 0
+        return {
+            'opening_patterns': list(self.openings),
+            'top_sentence_starters': self.starters.most_common(top_starters),
+            'common_phrases': _most_common(self.phrases, top_phrases, _is_phrase),
+            'formatting_patterns': {
+                'bold_usage': self.bold_count,
+                'bullet_points': self.bullet_count,
+                'emoji_count': self.emoji_count,
+                'avg_paragraph_length': self.paragraph_chars / self.paragraph_count if self.paragraph_count else 0,
+                'uses_special_characters': self.special_chars
+            },
+            'tone_indicators': {
+                'questions': self.questions,
+                'exclamations': self.exclamations,
+                'direct_address': self.direct_address,
+                'first_person': self.first_person,
+                'second_person': self.second_person
+            },
+            'structure': {
+                'avg_length': self.total_length / n if n else 0,
+                'avg_sentences': avg_sentences,
+                'avg_words_per_sentence': avg_words / avg_sentences if avg_sentences else 0,
+                'avg_paragraphs': self.paragraph_count / n if n else 0
+            },
+            'vocabulary': _most_common(self.words, top_vocabulary, _is_vocabulary)
+        }
+
+def _is_phrase(phrase):
+    """Keep trigrams and bigrams with at least one substantial word."""
+    words = phrase.split(' ')
+    return len(words) == 3 or len(words[0]) > 2 or len(words[1]) > 2
+
+def _is_vocabulary(word):
+    """Keep meaningful words (not stopwords, longer than 3 characters)."""
+    return len(word) > 3 and word not in STOPWORDS
+
+def _most_common(counter, n, keep):
+    """Counter.most_common(n) restricted to the keys kept (same tie order)."""
+    return heapq.nlargest(n, (item for item in counter.items() if keep(item[0])),
+                          key=itemgetter(1))
+
+def post_text(post):
+    """Text of a post, whichever key the dataset stores it under."""
+    return post.get('generated_post_text') or post.get('full_post_text') or ''
+
+def _analyze_shard(texts):
+    """Pool worker: partial aggregates for one shard of post texts."""
+    return PatternAnalyzer().add_texts(texts)
+
+def _iter_shards(posts, shard_size):
+    """Group post texts into lists of shard_size."""
+    shard = []
+    for post in posts:
+        shard.append(post_text(post))
+        if len(shard) >= shard_size:
+            yield shard
+            shard = []
+    if shard:
+        yield shard
+
+def analyze_posts(posts, workers=1, shard_size=2000):
+    """
+    Run PatternAnalyzer over posts, optionally across a process pool.
+
+    With workers > 1 the posts are cut into shards of shard_size, each shard
+    is analyzed in a worker process and the partial results are merged back
+    in shard order, so the patterns are identical to a single-process run.
+    Shards are dispatched as the posts stream in, keeping at most a few
+    shards per worker in flight.
+
+    Args:
+        posts (iterable[dict]): Posts, e.g. from iter_posts()
+        workers (int): Worker processes (1 = in-process, 0/None = all cores)
+        shard_size (int): Posts per shard
+
+    Returns:
+        PatternAnalyzer: Aggregates over all posts
+    """
+    if not workers:
+        workers = os.cpu_count() or 1
+    if workers == 1:
+        return PatternAnalyzer().add_posts(posts)
+
+    import multiprocessing
+    from collections import deque
+
+    analyzer = PatternAnalyzer()
+    # Pool.imap would read the whole input ahead; cap the shards in flight
+    pending = deque()
+    with multiprocessing.Pool(workers) as pool:
+        for shard in _iter_shards(posts, shard_size):
+            pending.append(pool.apply_async(_analyze_shard, (shard,)))
+            if len(pending) >= workers * 2:
+                analyzer.merge(pending.popleft().get())
+        while pending:
+            analyzer.merge(pending.popleft().get())
+    return analyzer
+
+def state_path_for(output_path):
+    """Where the raw aggregates behind a patterns file are kept."""
+    root, ext = os.path.splitext(str(output_path))
+    return f"{root}.state{ext or '.json'}"
+
+def _tail_digest(input_path, offset, size=4096):
+    """Hash of the bytes just before offset, to detect rewritten files."""
+    with open(input_path, 'rb') as f:
+        f.seek(max(0, offset - size))
+        return hashlib.sha256(f.read(offset - max(0, offset - size))).hexdigest()
+
+def _load_state(input_path, state_path):
+    """
+    Load saved aggregates if the dataset only had posts appended since.
+
+    Returns:
+        tuple: (PatternAnalyzer, offset) or (None, 0) if a full scan is needed
+    """
+    try:
+        with open(state_path, 'r', encoding='utf-8') as f:
+            state = json.load(f)
+        source = state['source']
+        offset = source['offset']
+        if (state.get('version') != STATE_VERSION
+                or os.path.getsize(input_path) < offset
+                or _tail_digest(input_path, offset) != source['tail_sha256']):
+            return None, 0
+        return PatternAnalyzer.from_state(state['aggregates']), offset
+    except (OSError, ValueError, KeyError, TypeError):
+        return None, 0
+
+def _write_json(path, data, **kwargs):
+    """Write JSON atomically so readers never see a half-written file."""
+    os.makedirs(os.path.dirname(str(path)) or '.', exist_ok=True)
+    tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+    try:
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, **kwargs)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+def extract_patterns_from_file(input_path, output_path, workers=1, incremental=False):
     """
     Extract patterns from a JSON file and save to output path.
     
+    Posts are streamed (see iter_posts), so memory grows with the
+    vocabulary and the opening lines kept in the output, not the file size.
+    The raw aggregates are saved next to the output (see state_path_for);
+    with incremental=True they are reused and only posts appended to the
+    dataset since the last run are read.
+    
     Args:
-        input_path (str): Path to input JSON file
+        input_path (str): Path to input JSON array or JSON Lines file
         output_path (str): Path to save patterns JSON
+        workers (int): Worker processes for analyze_posts()
+        incremental (bool): Fold in only newly appended posts when possible
     """
-    # Load the posts from the given file
-    with open(input_path, 'r', encoding='utf-8') as f:
-        posts = json.load(f)
+    state_path = state_path_for(output_path)
+    analyzer, offset = _load_state(input_path, state_path) if incremental else (None, 0)
     
-    # Extract all patterns
-    patterns = {
-        'opening_patterns': extract_openings(posts),
-        'top_sentence_starters': extract_sentence_starters(posts),
-        'common_phrases': extract_common_phrases(posts),
-        'formatting_patterns': detect_formatting_patterns(posts),
-        'tone_indicators': detect_tone_indicators(posts),
-        'structure': analyze_structure(posts),
-        'vocabulary': extract_key_vocabulary(posts)
-    }
+    reader = PostReader(input_path, start=offset)
+    if analyzer is None:
+        # Full scan
+        analyzer = analyze_posts(reader, workers)
+    else:
+        previous = analyzer.post_count
+        analyzer.merge(analyze_posts(reader, workers))
+        print(f"➕ Folded in {analyzer.post_count - previous} new posts")
+    patterns = analyzer.patterns()
     
-    # Save to output file
-    os.makedirs(os.path.dirname(output_path), exist_ok=True)
-    with open(output_path, 'w', encoding='utf-8') as f:
-        json.dump(patterns, f, indent=2, ensure_ascii=False)
+    # Save to output file, then the aggregates it was built from
+    _write_json(output_path, patterns, indent=2)
+    _write_json(state_path, {
+        'version': STATE_VERSION,
+        'source': {
+            'format': reader.format,
+            'offset': reader.offset,
+            'tail_sha256': _tail_digest(input_path, reader.offset),
+        },
+        'aggregates': analyzer.to_state()
+    })
     
     print(f"✅ Patterns extracted and saved to: {output_path}")
     return patterns
 
 if __name__ == "__main__":
-    import sys
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Extract writing patterns from a posts dataset")
+    parser.add_argument('input_path', nargs='?', help="JSON array or JSON Lines file of posts")
+    parser.add_argument('output_path', nargs='?', help="Where to write the patterns JSON")
+    parser.add_argument('--workers', type=int, default=1,
+                        help="Worker processes (0 = one per CPU core)")
+    parser.add_argument('--incremental', action='store_true',
+                        help="Only read posts appended since the last extraction")
+    args = parser.parse_args()
     
-    if len(sys.argv) >= 3:
+    if args.input_path and args.output_path:
         # Command line arguments provided (called from API)
-        input_path = sys.argv[1]
-        output_path = sys.argv[2]
-        patterns = extract_patterns_from_file(input_path, output_path)
+        patterns = extract_patterns_from_file(args.input_path, args.output_path, args.workers,
+                                              args.incremental)
     else:
         # Interactive mode (manual testing)
         filename = input("Enter the path to your JSON file: ").strip()
@@ -1,15 +1,17 @@
+import asyncio
+import hashlib
 import json
 import random
-import os
+import queue
 import re
-from pathlib import Path
+import threading
+from concurrent.futures import ThreadPoolExecutor
 
-try:
-    import google.generativeai as genai
-    GEMINI_AVAILABLE = True
-except ImportError:
-    GEMINI_AVAILABLE = False
-    print("⚠️ google-generativeai not installed. Using template generation.")
+import llm
+import metrics
+import patterncache
+import responsecache
+import sampling
 
 def load_patterns(style):
     """
@@ -21,68 +23,44 @@ def load_patterns(style):
     Returns:
         dict: Patterns dictionary or None
     """
-    # Map serious to professional
-    if style == 'serious':
-        style = 'professional'
-    
-    patterns_path = Path(__file__).parent.parent / 'data' / 'processed' / f'patterns_{style}.json'
-    
-    if patterns_path.exists():
-        with open(patterns_path, 'r', encoding='utf-8') as f:
-            return json.load(f)
-    return None
+    # Parsed once per file version and shared with app.py
+    return patterncache.get_patterns(style)
 
 def load_example_posts(style):
     """
     Load 2-3 full example posts from the dataset to show complete writing style.
     """
-    if style == 'serious':
-        style = 'professional'
-    
-    dataset_path = Path(__file__).parent.parent / 'data' / 'raw' / f'{style}.json'
-    
-    if not dataset_path.exists():
-        return []
-    
-    try:
-        with open(dataset_path, 'r', encoding='utf-8') as f:
-            posts = json.load(f)
-        
-        examples = []
-        for post in posts[:2]:  # Get first 2 posts as examples
-            text = post.get('generated_post_text') or post.get('full_post_text', '')
-            if text:
-                # Truncate if too long
-                if len(text) > 800:
-                    text = text[:800] + "..."
-                examples.append(text)
-        
-        return examples
-    except:
-        return []
+    return _truncate_examples(patterncache.get_example_posts(style, count=2))  # First 2 posts as examples
 
-def build_gemini_prompt(context, style, patterns):
+def _truncate_examples(texts):
+    examples = []
+    for text in texts:
+        # Truncate if too long
+        if len(text) > 800:
+            text = text[:800] + "..."
+        examples.append(text)
+    
+    return examples
+
+def build_prompt_prefix(style, patterns, example_posts):
     """
-    Build a detailed prompt for Gemini based on extracted patterns.
+    The part of the Gemini prompt that depends only on style, patterns and
+    example posts (everything except the context).
     
     Args:
-        context (str): User's topic/context
         style (str): Writing style
         patterns (dict): Extracted patterns from dataset
+        example_posts (list): Example post texts
     
     Returns:
-        str: Formatted prompt for Gemini
+        str: Prompt prefix; build_gemini_prompt appends the context and the
+        instructions that mention it
     """
-    if not patterns:
-        return f"Write a detailed, flowing LinkedIn post about: {context}. Use natural paragraphs and full sentences."
-    
     # Extract pattern details
     openings = patterns.get('opening_patterns', [])
-    starters = patterns.get('top_sentence_starters', [])
     phrases = patterns.get('common_phrases', [])
     structure = patterns.get('structure', {})
     tone = patterns.get('tone_indicators', {})
-    formatting = patterns.get('formatting_patterns', {})
     
     # Build style description
     style_desc = {
@@ -93,38 +71,32 @@ def build_gemini_prompt(context, style, patterns):
         'professional': 'corporate jargon overload, formal business language'
     }.get(style, 'professional and engaging')
     
-    # Load full example posts
-    example_posts = load_example_posts(style)
-    
-    prompt = f"""You are a LinkedIn content writer. Your task is to write an authentic, engaging LinkedIn post.
-
-CONTEXT/TOPIC: {context}
-
-WRITING STYLE TO MATCH: "{style}" ({style_desc})
-
-"""
+    parts = [
+        "You are a LinkedIn content writer. Your task is to write an authentic, engaging LinkedIn post.\n\n",
+        f'WRITING STYLE TO MATCH: "{style}" ({style_desc})\n\n',
+    ]
     
     # Add full example posts if available
     if example_posts:
-        prompt += f"Here are REAL examples of posts in this exact style. Study the voice, tone, and structure:\n\n"
+        parts.append("Here are REAL examples of posts in this exact style. Study the voice, tone, and structure:\n\n")
         for i, example in enumerate(example_posts, 1):
-            prompt += f"EXAMPLE {i}:\n{example}\n\n"
+            parts.append(f"EXAMPLE {i}:\n{example}\n\n")
     
     # Add structure guidance
-    prompt += f"\nYour post should be approximately {int(structure.get('avg_length', 500))} characters with {int(structure.get('avg_sentences', 10))}-{int(structure.get('avg_sentences', 10))+5} sentences across {int(structure.get('avg_paragraphs', 3))}-{int(structure.get('avg_paragraphs', 5))+2} paragraphs.\n\n"
+    parts.append(f"\nYour post should be approximately {int(structure.get('avg_length', 500))} characters with {int(structure.get('avg_sentences', 10))}-{int(structure.get('avg_sentences', 10))+5} sentences across {int(structure.get('avg_paragraphs', 3))}-{int(structure.get('avg_paragraphs', 5))+2} paragraphs.\n\n")
     
     # Add opening inspiration
-    if openings and len(openings) > 0:
-        prompt += f"Consider starting with a hook similar to these styles:\n"
+    if openings:
+        parts.append("Consider starting with a hook similar to these styles:\n")
         for opening in openings[:2]:
             opening_text = opening[:100] + "..." if len(opening) > 100 else opening
-            prompt += f'- "{opening_text}"\n'
-        prompt += "\n"
+            parts.append(f'- "{opening_text}"\n')
+        parts.append("\n")
     
     # Add common phrases naturally
     if phrases and len(phrases) > 5:
-        phrase_list = [p[0] for p in phrases[:8]]
-        prompt += f"Naturally incorporate phrases like: {', '.join(phrase_list[:5])}\n\n"
+        phrase_list = [p[0] for p in phrases[:5]]
+        parts.append(f"Naturally incorporate phrases like: {', '.join(phrase_list)}\n\n")
     
     # Add tone guidance
     tone_notes = []
@@ -138,12 +110,77 @@ WRITING STYLE TO MATCH: "{style}" ({style_desc})
         tone_notes.append("Use exclamation marks for emphasis and energy")
     
     if tone_notes:
-        prompt += "Tone guidelines:\n"
-        for note in tone_notes:
-            prompt += f"- {note}\n"
-        prompt += "\n"
+        parts.append("Tone guidelines:\n")
+        parts.extend(f"- {note}\n" for note in tone_notes)
+        parts.append("\n")
+    
+    return ''.join(parts)
+
+_prompt_prefixes = {}
+# Per-style caches are keyed by the requested style; keep at most this many styles
+MAX_CACHED_STYLES = 32
+
+_style_caches_lock = threading.Lock()
+
+def _remember(cache, style, entry):
+    """Store a per-style cache entry, dropping the oldest style when full"""
+    with _style_caches_lock:
+        if style not in cache and len(cache) >= MAX_CACHED_STYLES:
+            cache.pop(next(iter(cache)), None)
+        cache[style] = entry
+
+def get_prompt_prefix(style, patterns):
+    """
+    Cached prompt prefix for a style, rebuilt only when its patterns or
+    example posts change (patterncache returns the same objects until their
+    files change; the entry holds references so identities stay valid).
+    
+    The prefix is byte-identical across requests and its hash identifies
+    it (e.g. in /api/cache-stats). It is not sent to a context caching API:
+    google-generativeai 0.3.2 has none (CachedContent arrived in 0.7 and
+    only for gemini-1.5 models).
+    
+    Returns:
+        tuple: (prefix str, sha256 hex digest of the prefix)
+    """
+    raw_examples = patterncache.get_example_posts(style, count=2)
+    entry = _prompt_prefixes.get(style)
+    if entry is None or entry[0] is not patterns or entry[1] is not raw_examples:
+        prefix = build_prompt_prefix(style, patterns, _truncate_examples(raw_examples))
+        digest = hashlib.sha256(prefix.encode('utf-8')).hexdigest()
+        entry = (patterns, raw_examples, prefix, digest)
+        _remember(_prompt_prefixes, style, entry)
+    return entry[2], entry[3]
+
+def prompt_prefix_stats():
+    """Hash and size of each cached prompt prefix, keyed by style"""
+    return {
+        style: {"sha256": entry[3], "chars": len(entry[2])}
+        for style, entry in list(_prompt_prefixes.items())
+    }
+
+def build_gemini_prompt(context, style, patterns):
+    """
+    Build a detailed prompt for Gemini based on extracted patterns.
+    
+    The style-dependent part comes first and is cached (get_prompt_prefix);
+    only the context is added per request.
+    
+    Args:
+        context (str): User's topic/context
+        style (str): Writing style
+        patterns (dict): Extracted patterns from dataset
     
-    prompt += f"""IMPORTANT INSTRUCTIONS:
+    Returns:
+        str: Formatted prompt for Gemini
+    """
+    if not patterns:
+        return f"Write a detailed, flowing LinkedIn post about: {context}. Use natural paragraphs and full sentences."
+    
+    prefix, _ = get_prompt_prefix(style, patterns)
+    return f"""{prefix}CONTEXT/TOPIC: {context}
+
+IMPORTANT INSTRUCTIONS:
 - Write ONLY the LinkedIn post content itself (no titles, no labels, no "Here's the post:")
 - Use full, flowing paragraphs with natural transitions
 - Expand on "{context}" with specific details, examples, or personal insights
@@ -153,8 +190,6 @@ WRITING STYLE TO MATCH: "{style}" ({style_desc})
 - Make it feel genuine and emotionally resonant
 
 Now write the LinkedIn post:"""
-    
-    return prompt
 
 def clean_gemini_output(text):
     """
@@ -238,25 +273,17 @@ def add_boardy_cta(text, style):
     
     return text + "\n\n" + selected_cta
 
-def polish_with_gemini(text, style='professional'):
+def build_polish_prompt(text):
     """
-    Use Gemini to fix all English mistakes while keeping the same idea.
+    Build the grammar-check prompt for a draft post.
     
     Args:
         text (str): Draft post text
-        style (str): Post style (for boardy CTA)
     
     Returns:
-        str: Polished post text
+        str: Prompt for Gemini
     """
-    if not GEMINI_AVAILABLE:
-        return add_boardy_cta(text, style)
-    
-    api_key = os.getenv('GEMINI_API_KEY')
-    if not api_key:
-        return add_boardy_cta(text, style)
-    
-    polish_prompt = f"""You are a grammar checker. Fix ONLY grammar, spelling, and punctuation errors in this text.
+    return f"""You are a grammar checker. Fix ONLY grammar, spelling, and punctuation errors in this text.
 
 DO NOT:
 - Add new content
@@ -275,28 +302,55 @@ Text to fix:
 {text}
 
 Output the corrected text only:"""
+
+def finish_polish(text, response_text, style):
+    """
+    Validate Gemini's grammar-checked text and add the Boardy CTA.
+    
+    Args:
+        text (str): Draft post text
+        response_text (str): Raw grammar-check output
+        style (str): Post style (for boardy CTA)
+    
+    Returns:
+        str: Polished post text, or the draft if the output looks wrong
+    """
+    polished = clean_gemini_output(response_text)
+    
+    # Validate the output isn't crazy different
+    if polished and len(polished) > 50:  # Basic sanity check
+        print(f"   ✨ Grammar checked and corrected")
+        final_text = polished
+    else:
+        print(f"   ⚠️ Grammar check gave weird result, using original")
+        final_text = text
+    
+    # Add Boardy CTA if boardy style
+    return add_boardy_cta(final_text, style)
+
+def polish_with_gemini(text, style='professional'):
+    """
+    Use Gemini to fix all English mistakes while keeping the same idea.
+    
+    Args:
+        text (str): Draft post text
+        style (str): Post style (for boardy CTA)
+    
+    Returns:
+        str: Polished post text
+    """
+    model = llm.get_model()
+    if model is None:
+        return add_boardy_cta(text, style)
     
     try:
-        genai.configure(api_key=api_key)
-        model = genai.GenerativeModel('gemini-pro')
-        response = model.generate_content(polish_prompt)
-        polished = clean_gemini_output(response.text)
-        
-        # Validate the output isn't crazy different
-        if polished and len(polished) > 50:  # Basic sanity check
-            print(f"   ✨ Grammar checked and corrected")
-            final_text = polished
-        else:
-            print(f"   ⚠️ Grammar check gave weird result, using original")
-            final_text = text
-        
-        # Add Boardy CTA if boardy style
-        final_text = add_boardy_cta(final_text, style)
-        
-        return final_text
+        with metrics.timer('gemini_polish'):
+            response = model.generate_content(build_polish_prompt(text))
+        return finish_polish(text, response.text, style)
             
     except Exception as e:
         print(f"   ⚠️ Grammar check failed: {e}, using original")
+        metrics.inc('errors_total', stage='gemini_polish')
         return add_boardy_cta(text, style)
 
 def generate_with_gemini(prompt, style='professional'):
@@ -310,19 +364,15 @@ def generate_with_gemini(prompt, style='professional'):
     Returns:
         str: Generated post text
     """
-    if not GEMINI_AVAILABLE:
-        return None
-    
-    # Get API key from environment
-    api_key = os.getenv('GEMINI_API_KEY')
-    if not api_key:
+    # Shared client (configured once from GEMINI_API_KEY) or the stub backend
+    model = llm.get_model()
+    if model is None:
         print("⚠️ GEMINI_API_KEY not found in environment")
         return None
     
     try:
-        genai.configure(api_key=api_key)
-        model = genai.GenerativeModel('gemini-pro')
-        response = model.generate_content(prompt)
+        with metrics.timer('gemini_generate'):
+            response = model.generate_content(prompt)
         
         # Clean the output
         cleaned_text = clean_gemini_output(response.text)
@@ -335,9 +385,76 @@ def generate_with_gemini(prompt, style='professional'):
         return cleaned_text
     except Exception as e:
         print(f"❌ Gemini generation error: {e}")
+        metrics.inc('errors_total', stage='gemini_generate')
         return None
 
-def generate_linkedin_post(context, style='professional', patterns=None):
+def finish_post(context, style, patterns, generated_text):
+    """
+    Fall back to a template post if generation failed and build the result.
+    
+    Args:
+        context (str): Topic or context for the post
+        style (str): Writing style
+        patterns (dict): Patterns used for the prompt
+        generated_text (str): Gemini output, or None if it failed
+    
+    Returns:
+        dict: Generated LinkedIn post dictionary
+    """
+    used_gemini = bool(generated_text)
+    
+    # Fallback to template if Gemini fails
+    if not used_gemini:
+        print("   ⚠️ Using template generation (Gemini unavailable)")
+        metrics.inc('fallbacks_total', kind='template')
+        with metrics.timer('template_fallback'):
+            generated_text = generate_template_post(context, style, patterns)
+        # Add boardy CTA for template posts too
+        generated_text = add_boardy_cta(generated_text, style)
+    else:
+        print("   ✅ Generated with Gemini AI")
+    
+    return {
+        "platform": "LinkedIn",
+        "style": style,
+        "full_text": generated_text.strip(),
+        "context": context,
+        "used_patterns": bool(patterns),
+        "generator": "gemini" if used_gemini else "template"
+    }
+
+def lookup_cached_post(context, style, patterns, use_cache=True):
+    """
+    Check the response cache for an identical request.
+    
+    Args:
+        context (str): Topic or context for the post
+        style (str): Writing style
+        patterns (dict): Patterns the prompt is built from
+        use_cache (bool): False to skip the lookup (a fresh post is still stored)
+    
+    Returns:
+        tuple: (cached post or None, cache key or None)
+    """
+    cache = responsecache.get_cache()
+    if cache is None:
+        return None, None
+    key = responsecache.make_key(context, style, patterns)
+    if not use_cache:
+        return None, key
+    post = cache.get(key)
+    metrics.cache_result('responses', post is not None)
+    if post is not None:
+        print(f"   ⚡ Served {style} post from response cache")
+        return dict(post, cached=True), key
+    return None, key
+
+def store_cached_post(key, post):
+    """Cache a freshly generated post (template fallbacks are not cached)"""
+    if key is not None and post["generator"] == "gemini":
+        responsecache.get_cache().set(key, post)
+
+def generate_linkedin_post(context, style='professional', patterns=None, use_cache=True):
     """
     Generate a LinkedIn post using extracted patterns and Gemini AI.
 
@@ -345,6 +462,7 @@ def generate_linkedin_post(context, style='professional', patterns=None):
         context (str): Topic or context for the post
         style (str): Writing style (performative, serious, cluely, boardy)
         patterns (dict): Optional pre-loaded patterns
+        use_cache (bool): False to bypass the response cache for a fresh post
 
     Returns:
         dict: Generated LinkedIn post dictionary
@@ -353,31 +471,229 @@ def generate_linkedin_post(context, style='professional', patterns=None):
     if patterns is None:
         patterns = load_patterns(style)
     
+    cached, cache_key = lookup_cached_post(context, style, patterns, use_cache)
+    if cached is not None:
+        return cached
+    
     # Build prompt using patterns
-    prompt = build_gemini_prompt(context, style, patterns)
+    with metrics.timer('prompt_build'):
+        prompt = build_gemini_prompt(context, style, patterns)
     
     print(f"\n🎨 [GENERATION] Generating {style} post about: {context[:50]}...")
     
     # Try to generate with Gemini
     generated_text = generate_with_gemini(prompt, style)
     
-    # Fallback to template if Gemini fails
-    if not generated_text:
-        print("   ⚠️ Using template generation (Gemini unavailable)")
-        generated_text = generate_template_post(context, style, patterns)
-        # Add boardy CTA for template posts too
-        generated_text = add_boardy_cta(generated_text, style)
-    else:
-        print("   ✅ Generated with Gemini AI")
+    post = finish_post(context, style, patterns, generated_text)
+    store_cached_post(cache_key, post)
+    return post
+
+_io_executor = None
+_io_executor_lock = threading.Lock()
+
+async def run_blocking(func, *args):
+    """
+    Run a blocking call (pattern and example-post loads, response cache reads
+    and writes) off the event loop. Uses its own small pool rather than the
+    loop's default executor, which REST model calls can fill up.
+    """
+    global _io_executor
+    if _io_executor is None:
+        with _io_executor_lock:
+            if _io_executor is None:
+                _io_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix='generator-io')
+    return await asyncio.get_running_loop().run_in_executor(_io_executor, func, *args)
+
+async def apolish_with_gemini(text, style='professional', timeout=None):
+    """
+    Async polish_with_gemini: grammar check without blocking the event loop.
     
-    return {
-        "platform": "LinkedIn",
-        "style": style,
-        "full_text": generated_text.strip(),
-        "context": context,
-        "used_patterns": bool(patterns),
-        "generator": "gemini" if generated_text and GEMINI_AVAILABLE else "template"
-    }
+    Args:
+        text (str): Draft post text
+        style (str): Post style (for boardy CTA)
+        timeout (float): Seconds before the call is cancelled (default llm.POLISH_TIMEOUT)
+    
+    Returns:
+        str: Polished post text (the draft if the call fails or times out)
+    """
+    model = llm.get_async_model()
+    if model is None:
+        return add_boardy_cta(text, style)
+    
+    try:
+        with metrics.timer('gemini_polish'):
+            response = await asyncio.wait_for(
+                model.generate_content_async(build_polish_prompt(text)),
+                timeout or llm.POLISH_TIMEOUT
+            )
+        return finish_polish(text, response.text, style)
+    except asyncio.TimeoutError:
+        print(f"   ⚠️ Grammar check timed out, using original")
+        metrics.inc('errors_total', stage='gemini_polish')
+        return add_boardy_cta(text, style)
+    except Exception as e:
+        print(f"   ⚠️ Grammar check failed: {e}, using original")
+        metrics.inc('errors_total', stage='gemini_polish')
+        return add_boardy_cta(text, style)
+
+async def agenerate_with_gemini(prompt, style='professional', generate_timeout=None, polish_timeout=None):
+    """
+    Async generate_with_gemini: generate, then polish, each stage with its own timeout.
+    
+    Args:
+        prompt (str): The prompt for generation
+        style (str): Post style (for boardy CTA)
+        generate_timeout (float): Seconds for the generate call (default llm.GENERATE_TIMEOUT)
+        polish_timeout (float): Seconds for the polish call (default llm.POLISH_TIMEOUT)
+    
+    Returns:
+        str: Generated post text, or None if generation failed or timed out
+    """
+    model = llm.get_async_model()
+    if model is None:
+        return None
+    
+    try:
+        with metrics.timer('gemini_generate'):
+            response = await asyncio.wait_for(
+                model.generate_content_async(prompt),
+                generate_timeout or llm.GENERATE_TIMEOUT
+            )
+        cleaned_text = clean_gemini_output(response.text)
+    except asyncio.TimeoutError:
+        print(f"❌ Gemini generation timed out")
+        metrics.inc('errors_total', stage='gemini_generate')
+        return None
+    except Exception as e:
+        print(f"❌ Gemini generation error: {e}")
+        metrics.inc('errors_total', stage='gemini_generate')
+        return None
+    
+    if cleaned_text:
+        return await apolish_with_gemini(cleaned_text, style, polish_timeout)
+    return cleaned_text
+
+async def agenerate_linkedin_post(context, style='professional', patterns=None,
+                                  generate_timeout=None, polish_timeout=None, use_cache=True):
+    """
+    Async generate_linkedin_post for running many generations on one event loop.
+    
+    Each Gemini stage is awaited with its own timeout; cancelling the task
+    cancels the in-flight call. Disk and response cache access runs in
+    run_blocking() so the event loop never waits on I/O. Falls back to a
+    template post like the sync version.
+
+    Args:
+        context (str): Topic or context for the post
+        style (str): Writing style (performative, serious, cluely, boardy)
+        patterns (dict): Optional pre-loaded patterns
+        generate_timeout (float): Seconds for the generate call
+        polish_timeout (float): Seconds for the polish call
+        use_cache (bool): False to bypass the response cache for a fresh post
+
+    Returns:
+        dict: Generated LinkedIn post dictionary
+    """
+    if patterns is None:
+        patterns = await run_blocking(load_patterns, style)
+    
+    cached, cache_key = await run_blocking(lookup_cached_post, context, style, patterns, use_cache)
+    if cached is not None:
+        return cached
+    
+    with metrics.timer('prompt_build'):
+        prompt = await run_blocking(build_gemini_prompt, context, style, patterns)
+    
+    print(f"\n🎨 [GENERATION] Generating {style} post about: {context[:50]}...")
+    
+    generated_text = await agenerate_with_gemini(prompt, style, generate_timeout, polish_timeout)
+    
+    post = finish_post(context, style, patterns, generated_text)
+    await run_blocking(store_cached_post, cache_key, post)
+    return post
+
+async def agenerate_linkedin_posts_batch(items, concurrency=4, generate_timeout=None, polish_timeout=None,
+                                         use_cache=True, patterns_by_style=None):
+    """
+    Generate many posts concurrently, yielding each one as it completes.
+    
+    Patterns are loaded once per style for the whole batch and at most
+    `concurrency` generations are in flight at a time.
+    
+    Args:
+        items (list[dict]): Requests with "context" and optional "style"
+        concurrency (int): Maximum generations running at once
+        generate_timeout (float): Seconds for each generate call
+        polish_timeout (float): Seconds for each polish call
+        use_cache (bool): False to bypass the response cache
+        patterns_by_style (dict): Optional style -> pre-loaded patterns
+    
+    Yields:
+        dict: {"index", "context", "style", "post"} or {"index", ..., "error"}
+    """
+    patterns_by_style = dict(patterns_by_style or {})
+    for item in items:
+        style = item.get('style') or 'professional'
+        if style not in patterns_by_style:
+            patterns_by_style[style] = await run_blocking(load_patterns, style) or {}
+    
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    
+    async def run(index, item):
+        context = item.get('context', '')
+        style = item.get('style') or 'professional'
+        result = {"index": index, "context": context, "style": style}
+        async with semaphore:
+            try:
+                result["post"] = await agenerate_linkedin_post(
+                    context, style, patterns_by_style[style], generate_timeout, polish_timeout, use_cache
+                )
+            except Exception as e:
+                result["error"] = str(e)
+        return result
+    
+    tasks = [asyncio.ensure_future(run(index, item)) for index, item in enumerate(items)]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            yield await next_done
+    finally:
+        # Stop outstanding generations if the consumer goes away
+        for task in tasks:
+            task.cancel()
+
+def generate_linkedin_posts_batch(items, concurrency=4, generate_timeout=None, polish_timeout=None,
+                                  use_cache=True, patterns_by_style=None):
+    """
+    Sync version of agenerate_linkedin_posts_batch for request threads.
+    
+    The batch runs on llm's shared event loop; results are handed back as
+    they complete. Closing the generator early cancels the remaining posts.
+    
+    Yields:
+        dict: One result per item, in completion order
+    """
+    results = queue.Queue()
+    done = object()
+    
+    async def drive():
+        try:
+            async for result in agenerate_linkedin_posts_batch(
+                    items, concurrency, generate_timeout, polish_timeout, use_cache, patterns_by_style):
+                results.put(result)
+        finally:
+            results.put(done)
+    
+    future = llm.run_async(drive())
+    try:
+        while True:
+            result = results.get()
+            if result is done:
+                break
+            yield result
+        # Surface errors raised outside the per-item handling
+        future.result()
+    finally:
+        future.cancel()
 
 def generate_template_post(context, style, patterns):
     """
@@ -394,62 +710,26 @@ def generate_template_post(context, style, patterns):
     if not patterns:
         return f"I've been reflecting on {context} lately, and it's shifted my perspective in unexpected ways.\n\nIt's easy to overlook the impact this has on how we approach our daily work, but the more I dive into it, the more I realize how fundamental it is.\n\nThe real breakthrough comes when you stop treating it as just another task and start seeing it as an opportunity to grow.\n\nWhat's your experience with this? I'd love to hear your thoughts."
     
-    # Use patterns to create a styled post
-    openings = patterns.get('opening_patterns', [])
-    phrases = patterns.get('common_phrases', [])
-    structure = patterns.get('structure', {})
-    tone = patterns.get('tone_indicators', {})
-    
-    # Select an appropriate opening
-    opening = random.choice(openings) if openings else f"Let's talk about {context}"
-    
-    # Keep opening concise but natural
-    if len(opening) > 150:
-        # Take first sentence or two
-        sentences = opening.split('.')[:2]
-        opening = '. '.join(sentences) + '.'
-    
-    # Build body paragraphs
-    paragraphs = []
-    
-    # Paragraph 1: Expand on context
-    para1 = f"{context} has been on my mind recently."
-    if tone.get('first_person', 0) > 10:
-        para1 += f" I've realized that the way we approach this can make all the difference in our outcomes."
-    else:
-        para1 += f" It's something that affects more of us than we might think."
-    paragraphs.append(para1)
-    
-    # Paragraph 2: Add depth with common phrases
-    if phrases and len(phrases) > 5:
-        common_phrase = random.choice(phrases[:5])[0]
-        para2 = f"Here's what I've learned: {common_phrase} isn't just a nice idea - it's essential. "
-        
-        if tone.get('questions', 0) > 5:
-            para2 += f"What happens when we ignore this? We miss opportunities that could transform everything."
-        else:
-            para2 += f"When we truly understand this, our entire perspective shifts."
-        paragraphs.append(para2)
-    
-    # Paragraph 3: Personal reflection or call to action
-    if tone.get('direct_address', 0) > 20:
-        para3 = f"If you're working on {context}, you know how challenging it can be. "
-        para3 += "But that challenge is exactly what makes the breakthrough so rewarding."
-    else:
-        para3 = f"The journey with {context} continues to surprise and teach. "
-        para3 += "Every step forward reveals new insights worth sharing."
-    paragraphs.append(para3)
-    
-    # Closing with engagement
-    if tone.get('questions', 0) > 10:
-        closing = f"What's your experience with this? How has {context} impacted your work?"
-    else:
-        closing = "Looking forward to hearing different perspectives on this."
+    return get_template_tables(style, patterns).render(context)
+
+_template_tables = {}
+
+def get_template_tables(style, patterns):
+    """
+    Sampling tables for a style, rebuilt only when its patterns change.
     
-    # Combine all parts
-    full_post = f"{opening}\n\n" + "\n\n".join(paragraphs) + f"\n\n{closing}"
+    patterncache hands out the same patterns object until the file changes,
+    so the object itself identifies the patterns version. The cache entry
+    keeps a reference to it, so its identity cannot be reused.
     
-    return full_post
+    Returns:
+        sampling.TemplateTables: Tables for these patterns
+    """
+    entry = _template_tables.get(style)
+    if entry is None or entry[0] is not patterns:
+        entry = (patterns, sampling.TemplateTables(patterns))
+        _remember(_template_tables, style, entry)
+    return entry[1]
 
 if __name__ == "__main__":
     # Load the context JSON generated by your parser
@@ -0,0 +1,109 @@
+"""
+Production server settings for the Flask apps (gunicorn).
+
+    cd backend && gunicorn -c gunicorn.conf.py app:app
+    cd backend/content && gunicorn -c ../gunicorn.conf.py server:app
+
+Each worker is a separate process with its own thread pool, caches, Gemini
+client, analysis queue and Node analyzers, so throughput scales across
+cores. At boot a worker calls the app module's start_warm_up() (warm-up runs
+in the background and /health answers 503 until it is done) or, failing
+that, warm_up(); on shutdown it stops taking
+connections, lets in-flight requests finish, then calls shutdown() so queued
+video analyses drain. `kill -HUP <master pid>` restarts workers gracefully
+(and re-reads .env); `kill -TERM` drains and stops.
+
+Settings come from the environment:
+    PORT / BIND          listen address (default 0.0.0.0:5001)
+    WEB_CONCURRENCY      worker processes (default: CPU count)
+    WEB_THREADS          request threads per worker (default 8; SSE streams hold one each)
+    WEB_TIMEOUT          seconds before a silent worker is restarted (default 60)
+    GRACEFUL_TIMEOUT     seconds a stopping worker gets to drain (default 90)
+    MAX_REQUESTS         recycle workers after this many requests (default 0 = never)
+    GUNICORN_PRELOAD     import the app (and the Gemini SDK) once in the master before forking (default off)
+    ACCESS_LOG / PIDFILE access log path ('-' = stdout) and pid file
+"""
+import os
+import signal
+import sys
+import time
+
+bind = os.getenv('BIND', f"0.0.0.0:{os.getenv('PORT', '5001')}")
+workers = int(os.getenv('WEB_CONCURRENCY', os.cpu_count() or 1))
+worker_class = 'gthread'
+threads = int(os.getenv('WEB_THREADS', '8'))
+timeout = int(os.getenv('WEB_TIMEOUT', '60'))
+graceful_timeout = int(os.getenv('GRACEFUL_TIMEOUT', '90'))
+keepalive = 5
+max_requests = int(os.getenv('MAX_REQUESTS', '0'))
+max_requests_jitter = max_requests // 10
+# Preloading shares imported code between workers, but anything the app
+# starts at import (e.g. the MODEL_BACKEND=stub server thread) stays in the master
+preload_app = os.getenv('GUNICORN_PRELOAD', '').lower() in ('1', 'true', 'yes')
+accesslog = os.getenv('ACCESS_LOG') or None
+errorlog = '-'
+pidfile = os.getenv('PIDFILE') or None
+
+# Seconds of graceful_timeout kept back for the analyzer and pool shutdown
+_SHUTDOWN_MARGIN = 5
+
+
+def _app_module(worker):
+    """The module holding the WSGI app (e.g. 'app' for app:app)"""
+    return sys.modules.get(worker.app.app_uri.split(':', 1)[0])
+
+
+def when_ready(server):
+    # With preload_app the master has imported the app: load its lazily
+    # imported dependencies here too, so every worker forks with them
+    if preload_app:
+        preload = getattr(sys.modules.get(server.app.app_uri.split(':', 1)[0]), 'preload', None)
+        if preload is not None:
+            preload()
+
+
+def _record_shutdown_start(worker):
+    """
+    Note when the master asks the worker to stop: it SIGKILLs the worker
+    graceful_timeout after that, however long the in-flight requests took
+    """
+    handle_exit = signal.getsignal(signal.SIGTERM)
+
+    def on_term(signum, frame):
+        if getattr(worker, 'shutdown_started', None) is None:
+            worker.shutdown_started = time.monotonic()
+        handle_exit(signum, frame)
+
+    signal.signal(signal.SIGTERM, on_term)
+
+
+def post_worker_init(worker):
+    _record_shutdown_start(worker)
+    module = _app_module(worker)
+    start_warm_up = getattr(module, 'start_warm_up', None)
+    if start_warm_up is not None:
+        start_warm_up()
+        return
+    warm_up = getattr(module, 'warm_up', None)
+    if warm_up is None:
+        return
+    started = time.perf_counter()
+    try:
+        warm_up()
+    except Exception as e:
+        # A worker without warm caches still serves; it just loads lazily
+        worker.log.warning("Warm-up failed: %s", e)
+    worker.log.info("Worker %s warmed up in %.2fs", worker.pid, time.perf_counter() - started)
+
+
+def worker_exit(server, worker):
+    module = _app_module(worker)
+    shutdown = getattr(module, 'shutdown', None)
+    if shutdown is None:
+        return
+    # Whatever the request drain left of the graceful window (all of it when
+    # the worker stops on its own, e.g. after MAX_REQUESTS)
+    started = getattr(worker, 'shutdown_started', None) or time.monotonic()
+    remaining = max(started + graceful_timeout - _SHUTDOWN_MARGIN - time.monotonic(), 0)
+    worker.log.info("Worker %s: %.1fs left to drain jobs", worker.pid, remaining)
+    shutdown(timeout=remaining)
@@ -0,0 +1,245 @@
+"""
+Background job queue for slow work (video analysis).
+
+A fixed pool of worker threads takes jobs from a bounded queue, so request
+threads only enqueue and return a job id. Every state change is written to
+<folder>/<job id>.json, so finished results survive a restart, and wakes
+anyone waiting on the job (polling or server-sent events).
+
+Job states: queued -> running -> succeeded | failed
+
+With several server processes, each runs its own queue; a job's record names
+its owner (host:pid), so any process can report on it and wait for it by
+polling the file while the owner is alive.
+"""
+import json
+import os
+import queue
+import socket
+import threading
+import time
+import traceback
+import uuid
+from collections import OrderedDict
+from pathlib import Path
+
+TERMINAL_STATES = ('succeeded', 'failed')
+# Seconds between reads of a job record owned by another process
+POLL_INTERVAL = 0.5
+
+
+def _owner():
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def _owner_alive(owner):
+    """True if owner ("host:pid") is another live process on this host"""
+    host, _, pid = str(owner).rpartition(':')
+    if host != socket.gethostname() or not pid.isdigit() or int(pid) == os.getpid():
+        return False
+    try:
+        os.kill(int(pid), 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+class QueueFull(Exception):
+    """Raised by JobQueue.submit when max_pending jobs are already waiting"""
+
+
+class JobQueue:
+    """
+    Bounded worker pool with persisted job records.
+
+    Args:
+        folder (Path): Where job records are written
+        workers (int): Jobs run at the same time
+        max_pending (int): Queued (not yet running) jobs accepted before QueueFull
+        timeout (float): Default per-job timeout, passed to the job function
+        keep (int): Finished jobs kept in memory (older ones are read from disk)
+    """
+
+    def __init__(self, folder, workers=2, max_pending=20, timeout=300, keep=500):
+        self.folder = Path(folder)
+        self.folder.mkdir(parents=True, exist_ok=True)
+        self.workers = workers
+        self.timeout = timeout
+        self.keep = keep
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._jobs = OrderedDict()
+        self._changed = threading.Condition()
+        self._threads = []
+        self._closing = False
+
+    def _start(self):
+        """Start the worker threads on first use"""
+        if self._threads:
+            return
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._work, name=f'job-worker-{i}', daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def submit(self, func, *args, kind='job', timeout=None):
+        """
+        Queue func(*args, timeout=...) and return its job record right away.
+
+        The function must honour the timeout it is given and return a
+        JSON-serializable result; a dict with an "error" key marks the job
+        failed.
+
+        Returns:
+            dict: Job record (copy)
+
+        Raises:
+            QueueFull: If max_pending jobs are already waiting or the queue is draining
+        """
+        job = {
+            "id": uuid.uuid4().hex,
+            "kind": kind,
+            "status": "queued",
+            "owner": _owner(),
+            "created_at": time.time(),
+            "started_at": None,
+            "finished_at": None,
+            "timeout": timeout or self.timeout,
+            "result": None,
+            "error": None,
+        }
+        with self._changed:
+            if self._closing:
+                raise QueueFull("Server is shutting down")
+            self._start()
+            try:
+                self._queue.put_nowait((job["id"], func, args))
+            except queue.Full:
+                raise QueueFull(f"Job queue is full ({self._queue.maxsize} pending)") from None
+            self._jobs[job["id"]] = job
+            self._persist(job)
+            return dict(job)
+
+    def _work(self):
+        while True:
+            job_id, func, args = self._queue.get()
+            self._update(job_id, status="running", started_at=time.time())
+            job = self._jobs[job_id]
+            try:
+                result = func(*args, timeout=job["timeout"])
+            except Exception as e:
+                traceback.print_exc()
+                result = {"error": f"{type(e).__name__}: {e}"}
+            failed = isinstance(result, dict) and "error" in result
+            self._update(
+                job_id,
+                status="failed" if failed else "succeeded",
+                finished_at=time.time(),
+                result=result,
+                error=result["error"] if failed else None,
+            )
+            self._queue.task_done()
+
+    def _update(self, job_id, **changes):
+        with self._changed:
+            job = self._jobs[job_id]
+            job.update(changes)
+            self._persist(job)
+            if job["status"] in TERMINAL_STATES:
+                self._forget_old()
+            self._changed.notify_all()
+
+    def _forget_old(self):
+        """Drop the oldest finished jobs from memory beyond `keep`; caller holds the lock"""
+        finished = [job_id for job_id, job in self._jobs.items() if job["status"] in TERMINAL_STATES]
+        for job_id in finished[:max(0, len(finished) - self.keep)]:
+            del self._jobs[job_id]
+
+    def _path(self, job_id):
+        return self.folder / f"{job_id}.json"
+
+    def _persist(self, job):
+        path = self._path(job["id"])
+        tmp_path = path.with_name(f"{path.name}.{uuid.uuid4().hex}.tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(job, f, indent=2, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+    def get(self, job_id):
+        """
+        Current record of a job, from memory or from disk.
+
+        Jobs found on disk in a non-terminal state are reported as failed
+        unless the process that owns them is still running.
+
+        Returns:
+            dict: Job record (copy), or None if unknown
+        """
+        with self._changed:
+            job = self._jobs.get(job_id)
+            if job is not None:
+                return dict(job)
+        if not job_id.isalnum():
+            return None
+        try:
+            with open(self._path(job_id), 'r', encoding='utf-8') as f:
+                job = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if job.get("status") not in TERMINAL_STATES and not _owner_alive(job.get("owner")):
+            job.update(status="failed", error="Interrupted by a server restart")
+        return job
+
+    def wait(self, job_id, last_status=None, timeout=None):
+        """
+        Block until a job's status differs from last_status (or timeout).
+
+        Returns:
+            dict: Job record (copy), or None if unknown
+        """
+        with self._changed:
+            if job_id in self._jobs:
+                self._changed.wait_for(
+                    lambda: job_id not in self._jobs or self._jobs[job_id]["status"] != last_status,
+                    timeout=timeout,
+                )
+                return self.get(job_id)
+
+        # Not ours: poll the record another process keeps up to date
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            job = self.get(job_id)
+            if job is None or job["status"] != last_status:
+                return job
+            remaining = POLL_INTERVAL if deadline is None else deadline - time.monotonic()
+            if remaining <= 0:
+                return job
+            time.sleep(min(POLL_INTERVAL, remaining))
+
+    def drain(self, timeout=None):
+        """
+        Stop accepting jobs and wait for queued and running ones to finish.
+
+        Returns:
+            bool: True if every job finished within timeout
+        """
+        with self._changed:
+            self._closing = True
+            return self._changed.wait_for(
+                lambda: all(job["status"] in TERMINAL_STATES for job in self._jobs.values()),
+                timeout=timeout,
+            )
+
+    def stats(self):
+        """Queue depth and job counts by state"""
+        with self._changed:
+            counts = {}
+            for job in self._jobs.values():
+                counts[job["status"]] = counts.get(job["status"], 0) + 1
+            return {
+                "workers": self.workers,
+                "pending": self._queue.qsize(),
+                "max_pending": self._queue.maxsize,
+                "jobs": counts,
+            }
@@ -0,0 +1,262 @@
+"""
+Shared Gemini client for the process.
+
+genai.configure() replaces the SDK's global clients, so calling it per
+request throws away the open channel and pays a new TLS handshake each time.
+Here it is configured once, lazily, and the resulting GenerativeModel is
+reused by every request thread until the API key changes.
+
+MODEL_BACKEND=stub swaps Gemini for modelstub.StubModel (no key, no network),
+and GEMINI_BASE_URL points the real SDK at another endpoint, such as the
+modelstub stand-in server.
+
+The SDK itself is imported on first use: it accounts for most of the
+server's import time, and processes that never call Gemini (extraction
+workers, stub-backed load tests, requests served from cache) skip it.
+"""
+import asyncio
+import importlib.util
+import os
+import threading
+import weakref
+
+
+def _sdk_installed():
+    try:
+        return importlib.util.find_spec('google.generativeai') is not None
+    except ImportError:
+        return False
+
+
+GEMINI_AVAILABLE = _sdk_installed()
+if not GEMINI_AVAILABLE:
+    print("⚠️ google-generativeai not installed. Using template generation.")
+
+# google.generativeai, set by load_sdk()
+genai = None
+
+MODEL_NAME = os.getenv('GEMINI_MODEL', 'gemini-pro')
+# 'gemini' (default) or 'stub' (in-process modelstub.StubModel)
+MODEL_BACKEND = os.getenv('MODEL_BACKEND', 'gemini').lower()
+# Alternative API endpoint, e.g. http://127.0.0.1:8090 (uses the REST transport)
+GEMINI_BASE_URL = os.getenv('GEMINI_BASE_URL') or None
+# None lets the SDK pick (gRPC: one HTTP/2 channel multiplexes all requests)
+GEMINI_TRANSPORT = os.getenv('GEMINI_TRANSPORT') or None
+# Connections kept open per host with the 'rest' transport; match worker threads
+GEMINI_POOL_SIZE = int(os.getenv('GEMINI_POOL_SIZE', '16'))
+
+# Per-stage timeouts (seconds) for the async pipeline
+GENERATE_TIMEOUT = float(os.getenv('GEMINI_GENERATE_TIMEOUT', '60'))
+POLISH_TIMEOUT = float(os.getenv('GEMINI_POLISH_TIMEOUT', '30'))
+
+_lock = threading.Lock()
+_model = None
+_configured_key = None
+# Async gRPC channels belong to one event loop, so async models are per loop
+_async_models = weakref.WeakKeyDictionary()
+# Model used instead of Gemini (MODEL_BACKEND=stub or use_model())
+_override = None
+# Shared loop (on a daemon thread) for async work started from sync code
+_loop = None
+
+
+def get_model():
+    """
+    Shared GenerativeModel for the current GEMINI_API_KEY (or the stub
+    model with MODEL_BACKEND=stub).
+
+    Returns:
+        GenerativeModel: Configured model, or None if the SDK or key is missing
+    """
+    global _override
+    if _override is not None:
+        return _override
+    if MODEL_BACKEND == 'stub':
+        with _lock:
+            if _override is None:
+                _override = _stub_from_env()
+            return _override
+    if not GEMINI_AVAILABLE:
+        return None
+    api_key = os.getenv('GEMINI_API_KEY')
+    if not api_key:
+        return None
+
+    model = _model
+    if model is not None and api_key == _configured_key:
+        return model
+    with _lock:
+        if _model is None or api_key != _configured_key:
+            _configure(api_key)
+        return _model
+
+
+def get_async_model():
+    """
+    GenerativeModel for generate_content_async on the running event loop.
+
+    Returns:
+        GenerativeModel: Model with an async client bound to this loop, or None
+    """
+    model = get_model()
+    if model is None or model is _override:
+        return model
+    if GEMINI_BASE_URL:
+        return _RestAsyncModel(model)
+    loop = asyncio.get_running_loop()
+    with _lock:
+        entry = _async_models.get(loop)
+        if entry is None or entry[0] != _configured_key:
+            from google.generativeai import client as genai_client
+            import google.ai.generativelanguage as glm
+
+            # The SDK caches one async client process-wide; give this loop its
+            # own (async calls only support the grpc_asyncio transport). This
+            # relies on _client_manager.client_config and
+            # GenerativeModel._async_client, private to google-generativeai
+            # 0.3.2 (pinned in requirements.txt); without them the sync call
+            # runs in the loop's executor instead.
+            config = getattr(getattr(genai_client, '_client_manager', None), 'client_config', None)
+            async_model = genai.GenerativeModel(MODEL_NAME)
+            if config is None or not hasattr(async_model, '_async_client'):
+                print("⚠️ Unexpected google-generativeai internals; async calls run in an executor")
+                async_model = _RestAsyncModel(model)
+            else:
+                config = dict(config)
+                config.pop('transport', None)
+                async_model._async_client = glm.GenerativeServiceAsyncClient(**config)
+            entry = (_configured_key, async_model)
+            _async_models[loop] = entry
+        return entry[1]
+
+
+class _RestAsyncModel:
+    """
+    generate_content_async for a REST-configured model (the SDK's async
+    client is gRPC only) or an SDK whose async client cannot be set per
+    loop: the sync call runs in the loop's executor.
+    """
+
+    def __init__(self, model):
+        self._model = model
+
+    async def generate_content_async(self, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, lambda: self._model.generate_content(*args, **kwargs))
+
+
+def _stub_from_env():
+    import modelstub
+    return modelstub.StubModel.from_env()
+
+
+def use_model(model):
+    """
+    Serve every get_model()/get_async_model() call with `model` (anything
+    with generate_content and generate_content_async), e.g. a
+    modelstub.StubModel in benchmarks. None goes back to MODEL_BACKEND.
+
+    Returns:
+        The model passed in
+    """
+    global _override
+    with _lock:
+        _override = model
+    return model
+
+
+def run_async(coro):
+    """
+    Schedule a coroutine on the process-wide background event loop.
+
+    Lets sync code (Flask request threads) multiplex many async LLM calls
+    over one loop and one async channel.
+
+    Returns:
+        concurrent.futures.Future: Result of the coroutine; cancel() cancels it
+    """
+    global _loop
+    with _lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            threading.Thread(target=_loop.run_forever, name='llm-event-loop', daemon=True).start()
+        loop = _loop
+    return asyncio.run_coroutine_threadsafe(coro, loop)
+
+
+def _reset_after_fork():
+    """Forked workers must not reuse the parent's channels or loop thread"""
+    global _model, _configured_key, _loop, _lock
+    _lock = threading.Lock()
+    _model = None
+    _configured_key = None
+    _loop = None
+    _async_models.clear()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def load_sdk():
+    """
+    Import google.generativeai (done on first use; call it ahead of time to
+    move the cost, e.g. before forking workers).
+
+    Returns:
+        module: google.generativeai
+    """
+    global genai
+    if genai is None:
+        import google.generativeai
+        genai = google.generativeai
+    return genai
+
+
+def _configure(api_key):
+    """(Re)build the SDK clients and the shared model; caller holds _lock"""
+    global _model, _configured_key
+    load_sdk()
+    if GEMINI_BASE_URL:
+        transport = 'rest'
+        genai.configure(api_key=api_key, transport=transport, client_options={'api_endpoint': GEMINI_BASE_URL})
+    else:
+        transport = GEMINI_TRANSPORT
+        genai.configure(api_key=api_key, transport=transport)
+    model = genai.GenerativeModel(MODEL_NAME)
+    if transport == 'rest':
+        _size_rest_pool(model)
+    _model = model
+    _configured_key = api_key
+    print(f"🔑 Gemini client configured ({MODEL_NAME}, transport: {transport or 'default'}"
+          f"{', endpoint: ' + GEMINI_BASE_URL if GEMINI_BASE_URL else ''})")
+
+
+def _size_rest_pool(model):
+    """Give the REST transport's HTTP session a pool sized for our workers"""
+    from google.generativeai import client as genai_client
+    from requests.adapters import HTTPAdapter
+
+    model._client = genai_client.get_default_generative_client()
+    session = getattr(model._client._transport, '_session', None)
+    if session is not None:
+        # http:// too: GEMINI_BASE_URL may be a local stand-in server
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=GEMINI_POOL_SIZE)
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+
+
+def rotate_api_key(api_key=None):
+    """
+    Switch to a new API key without restarting.
+
+    In-flight calls finish on the old client; the next get_model() call
+    configures a fresh one. With no argument, GEMINI_API_KEY is re-read.
+    """
+    global _model, _configured_key
+    with _lock:
+        if api_key:
+            os.environ['GEMINI_API_KEY'] = api_key
+        _model = None
+        _configured_key = None
+        _async_models.clear()
@@ -0,0 +1,171 @@
+"""
+Process-wide timings and counters, exposed as Prometheus text on /metrics.
+
+    with metrics.timer('gemini_generate'):
+        ...
+    metrics.inc('cache_requests_total', cache='patterns', result='hit')
+
+Stage timings go to one histogram, <namespace>_stage_seconds{stage=...}.
+METRICS_MODE picks the cost:
+
+    full     histograms with buckets (default)
+    summary  only _sum and _count per stage: no bucket search, one lock
+    off      everything is a no-op
+
+Values are per process; with several server workers, scrape each one or
+aggregate in Prometheus.
+"""
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import nullcontext
+
+METRICS_MODE = os.getenv('METRICS_MODE', 'full').lower()
+NAMESPACE = os.getenv('METRICS_NAMESPACE', 'hackortreat')
+
+# Seconds; spans cache hits (sub-ms) to video analysis (minutes)
+BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+
+HELP = {
+    'stage_seconds': 'Time spent per processing stage',
+    'http_request_seconds': 'Time to handle an HTTP request, by endpoint',
+    'cache_requests_total': 'Cache lookups by cache and result',
+    'fallbacks_total': 'Requests served by a fallback path',
+    'errors_total': 'Failed stages',
+}
+
+_lock = threading.Lock()
+# (name, labels tuple) -> [bucket counts..., +Inf count, sum]
+_histograms = {}
+# (name, labels tuple) -> value
+_counters = {}
+
+
+def _labels(labels):
+    return tuple(sorted(labels.items()))
+
+
+def observe(name, seconds, **labels):
+    """Record one duration in histogram `name`"""
+    if METRICS_MODE != 'off':
+        _observe((name, _labels(labels)), seconds)
+
+
+def _observe(key, seconds):
+    if METRICS_MODE == 'summary':
+        with _lock:
+            entry = _histograms.get(key)
+            if entry is None:
+                entry = _histograms[key] = [0, 0.0]
+            entry[0] += 1
+            entry[1] += seconds
+        return
+    index = bisect_left(BUCKETS, seconds)
+    with _lock:
+        entry = _histograms.get(key)
+        if entry is None:
+            entry = _histograms[key] = [0] * (len(BUCKETS) + 1) + [0.0]
+        entry[index] += 1
+        entry[-1] += seconds
+
+
+class _Timer:
+    __slots__ = ('key', 'started')
+
+    def __init__(self, stage):
+        self.key = ('stage_seconds', (('stage', stage),))
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        _observe(self.key, time.perf_counter() - self.started)
+
+
+_null_timer = nullcontext()
+
+
+def timer(stage):
+    """Time the with-block as `stage` (recorded even if it raises)"""
+    if METRICS_MODE == 'off':
+        return _null_timer
+    return _Timer(stage)
+
+
+def inc(name, amount=1, **labels):
+    """Add to counter `name`"""
+    if METRICS_MODE == 'off':
+        return
+    key = (name, _labels(labels))
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + amount
+
+
+def cache_result(cache, hit):
+    inc('cache_requests_total', cache=cache, result='hit' if hit else 'miss')
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(labels, extra=()):
+    pairs = list(labels) + list(extra)
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{key}="{_escape(value)}"' for key, value in pairs) + '}'
+
+
+def _number(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def render():
+    """
+    All metrics in the Prometheus text exposition format (version 0.0.4).
+
+    Returns:
+        str: Exposition text
+    """
+    with _lock:
+        histograms = {key: list(entry) for key, entry in _histograms.items()}
+        counters = dict(_counters)
+
+    lines = []
+    for name in sorted({key[0] for key in counters}):
+        full_name = f"{NAMESPACE}_{name}"
+        lines.append(f"# HELP {full_name} {HELP.get(name, name)}")
+        lines.append(f"# TYPE {full_name} counter")
+        for (metric, labels), value in sorted(counters.items()):
+            if metric == name:
+                lines.append(f"{full_name}{_format_labels(labels)} {_number(value)}")
+
+    for name in sorted({key[0] for key in histograms}):
+        full_name = f"{NAMESPACE}_{name}"
+        kind = 'summary' if METRICS_MODE == 'summary' else 'histogram'
+        lines.append(f"# HELP {full_name} {HELP.get(name, name)}")
+        lines.append(f"# TYPE {full_name} {kind}")
+        for (metric, labels), entry in sorted(histograms.items()):
+            if metric != name:
+                continue
+            if kind == 'summary':
+                count, total = entry
+            else:
+                cumulative = 0
+                for bound, bucket_count in zip(BUCKETS + ('+Inf',), entry[:-1]):
+                    cumulative += bucket_count
+                    le = bound if bound == '+Inf' else repr(bound)
+                    lines.append(f"{full_name}_bucket{_format_labels(labels, [('le', le)])} {cumulative}")
+                count, total = cumulative, entry[-1]
+            lines.append(f"{full_name}_sum{_format_labels(labels)} {_number(total)}")
+            lines.append(f"{full_name}_count{_format_labels(labels)} {count}")
+    return '\n'.join(lines) + '\n'
+
+
+def reset():
+    """Drop all recorded values"""
+    with _lock:
+        _histograms.clear()
+        _counters.clear()
@@ -0,0 +1,330 @@
+"""
+Local stand-in for the Gemini API, for load tests and benchmarks.
+
+StubModel mimics GenerativeModel.generate_content(_async) in process;
+serve() exposes the same model over the Gemini REST API
+(POST /v1beta/models/<model>:generateContent), so the real Python and Node
+SDKs can be pointed at it with GEMINI_BASE_URL. Nothing leaves the machine
+and no quota is used.
+
+Each call waits for a sampled time-to-first-token plus output tokens at a
+fixed throughput, and fails with a 429/500/503 at a configurable rate:
+
+    MODEL_STUB_LATENCY         distribution of the base latency (default lognormal:0.8:0.5)
+    MODEL_STUB_ERROR_RATE      fraction of calls that fail (default 0)
+    MODEL_STUB_TOKENS_PER_SEC  output throughput, 0 = instant (default 0)
+    MODEL_STUB_SEED            seed for latency and errors (default random)
+
+Latency specs, in seconds: "0.5" or "const:0.5", "uniform:LOW:HIGH",
+"normal:MEAN:STDDEV", "lognormal:MEDIAN:SIGMA", "exp:MEAN".
+
+Run the stand-in server:
+    python modelstub.py --port 8090 --latency lognormal:0.8:0.5 --error-rate 0.01
+    GEMINI_BASE_URL=http://127.0.0.1:8090 python app.py
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+DEFAULT_LATENCY = 'lognormal:0.8:0.5'
+# (HTTP status, Google RPC status, message) for injected failures
+ERRORS = (
+    (429, 'RESOURCE_EXHAUSTED', 'Resource has been exhausted (e.g. check quota).'),
+    (500, 'INTERNAL', 'An internal error has occurred.'),
+    (503, 'UNAVAILABLE', 'The model is overloaded. Please try again later.'),
+)
+# Rough English average, as in Gemini's own docs
+CHARS_PER_TOKEN = 4
+
+_CONTEXT = re.compile(r'CONTEXT/TOPIC: (.*?)\n\nIMPORTANT INSTRUCTIONS:', re.DOTALL)
+_DRAFT = re.compile(r'Text to fix:\n(.*)\n\nOutput the corrected text only:', re.DOTALL)
+
+
+def parse_latency(spec):
+    """
+    Parse a latency distribution spec.
+
+    Returns:
+        callable: rng -> seconds (never negative)
+    """
+    kind, _, rest = str(spec).strip().partition(':')
+    try:
+        if not rest:
+            value = float(kind)
+            return lambda rng: value
+        params = [float(part) for part in rest.split(':')]
+        if kind == 'const' and len(params) == 1:
+            return lambda rng: params[0]
+        if kind == 'uniform' and len(params) == 2:
+            return lambda rng: rng.uniform(*params)
+        if kind == 'normal' and len(params) == 2:
+            return lambda rng: max(0.0, rng.gauss(*params))
+        if kind == 'lognormal' and len(params) == 2:
+            mu = math.log(params[0])
+            return lambda rng: rng.lognormvariate(mu, params[1])
+        if kind == 'exp' and len(params) == 1:
+            return lambda rng: rng.expovariate(1 / params[0])
+    except ValueError:
+        pass
+    raise ValueError(f"Invalid latency spec: {spec!r}")
+
+
+class StubError(Exception):
+    """An injected model failure (shaped like a Google API error)"""
+
+    def __init__(self, code, status, message):
+        super().__init__(f"{code} {message} (stub)")
+        self.code = code
+        self.status = status
+
+
+class StubResponse:
+    """The parts of GenerateContentResponse our code reads"""
+
+    def __init__(self, text, prompt_tokens):
+        self.text = text
+        self.usage_metadata = {
+            "prompt_token_count": prompt_tokens,
+            "candidates_token_count": count_tokens(text),
+            "total_token_count": prompt_tokens + count_tokens(text),
+        }
+
+
+def count_tokens(text):
+    return max(1, len(text) // CHARS_PER_TOKEN)
+
+
+def prompt_text(contents):
+    """Text of a prompt given as a string, a list of parts or REST "contents" """
+    if isinstance(contents, str):
+        return contents
+    if isinstance(contents, dict):
+        if 'parts' in contents:
+            return prompt_text(contents['parts'])
+        return contents.get('text', '')
+    if isinstance(contents, (list, tuple)):
+        return '\n'.join(prompt_text(part) for part in contents)
+    return ''
+
+
+def respond(prompt):
+    """Canned answer shaped like what Gemini returns for each of our prompts"""
+    draft = _DRAFT.search(prompt)
+    if draft:
+        return draft.group(1)
+    if 'Analyze this video' in prompt:
+        return "```json\n" + json.dumps({
+            "outfit": {"description": "Navy blazer over a white t-shirt", "items": ["blazer", "t-shirt"],
+                       "colors": ["navy", "white"]},
+            "activity": {"description": "Talking to the camera", "actions": ["talking", "gesturing"],
+                         "intensity": "low"},
+            "background": {"description": "Home office", "location_type": "indoor",
+                           "environment": "Desk with a laptop and a plant", "lighting": "Soft daylight"},
+            "summary": "A person talks to the camera from a home office.",
+        }, indent=2) + "\n```"
+    match = _CONTEXT.search(prompt)
+    context = match.group(1).strip() if match else "this"
+    return (
+        f"I've been thinking a lot about {context} lately.\n\n"
+        f"When I started, I thought {context} was just another task on the list. "
+        "It turned out to change how our whole team works, and how I think about my own role in it.\n\n"
+        "The biggest lesson? The small, boring habits compound. Nobody notices them for months, "
+        "and then suddenly everyone asks how you did it.\n\n"
+        "What has your experience been?"
+    )
+
+
+class StubModel:
+    """
+    Drop-in for GenerativeModel.generate_content / generate_content_async.
+
+    Args:
+        latency (str): Latency spec for the time to first token
+        error_rate (float): Fraction of calls that raise StubError
+        tokens_per_sec (float): Output throughput (0 = no token time)
+        seed (int): Seed for latency and error draws (None = random)
+    """
+
+    def __init__(self, latency=DEFAULT_LATENCY, error_rate=0.0, tokens_per_sec=0.0, seed=None):
+        self.latency = latency
+        self.error_rate = error_rate
+        self.tokens_per_sec = tokens_per_sec
+        self._draw_latency = parse_latency(latency)
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.errors = 0
+
+    @classmethod
+    def from_env(cls):
+        seed = os.getenv('MODEL_STUB_SEED')
+        return cls(
+            latency=os.getenv('MODEL_STUB_LATENCY', DEFAULT_LATENCY),
+            error_rate=float(os.getenv('MODEL_STUB_ERROR_RATE', '0')),
+            tokens_per_sec=float(os.getenv('MODEL_STUB_TOKENS_PER_SEC', '0')),
+            seed=int(seed) if seed else None,
+        )
+
+    def plan(self, contents):
+        """
+        Decide the outcome of one call.
+
+        Returns:
+            tuple: (seconds to wait, StubResponse or StubError)
+        """
+        prompt = prompt_text(contents)
+        with self._lock:
+            self.calls += 1
+            delay = self._draw_latency(self._rng)
+            failed = self._rng.random() < self.error_rate
+            error = self._rng.choice(ERRORS) if failed else None
+            if failed:
+                self.errors += 1
+        if error:
+            return delay, StubError(*error)
+        response = StubResponse(respond(prompt), count_tokens(prompt))
+        if self.tokens_per_sec > 0:
+            delay += response.usage_metadata["candidates_token_count"] / self.tokens_per_sec
+        return delay, response
+
+    def generate_content(self, contents, **kwargs):
+        delay, outcome = self.plan(contents)
+        time.sleep(delay)
+        if isinstance(outcome, StubError):
+            raise outcome
+        return outcome
+
+    async def generate_content_async(self, contents, **kwargs):
+        delay, outcome = self.plan(contents)
+        await asyncio.sleep(delay)
+        if isinstance(outcome, StubError):
+            raise outcome
+        return outcome
+
+    def stats(self):
+        return {
+            "latency": self.latency,
+            "error_rate": self.error_rate,
+            "tokens_per_sec": self.tokens_per_sec,
+            "calls": self.calls,
+            "errors": self.errors,
+        }
+
+
+_GENERATE_PATH = re.compile(r'^/v1(?:beta)?/models/([^/:]+):generateContent$')
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Gemini REST generateContent backed by the server's StubModel"""
+
+    protocol_version = 'HTTP/1.1'
+
+    def _send_json(self, status, body):
+        data = json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=UTF-8')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        if self.path == '/stats':
+            self._send_json(200, self.server.model.stats())
+        else:
+            self._send_json(404, {"error": {"code": 404, "message": "Not found", "status": "NOT_FOUND"}})
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        body = self.rfile.read(length)
+        if not _GENERATE_PATH.match(self.path.split('?', 1)[0]):
+            self._send_json(404, {"error": {"code": 404, "message": "Not found", "status": "NOT_FOUND"}})
+            return
+        try:
+            request = json.loads(body or b'{}')
+        except ValueError:
+            self._send_json(400, {"error": {"code": 400, "message": "Invalid JSON", "status": "INVALID_ARGUMENT"}})
+            return
+
+        delay, outcome = self.server.model.plan(request.get('contents', []))
+        time.sleep(delay)
+        if isinstance(outcome, StubError):
+            self._send_json(outcome.code, {"error": {
+                "code": outcome.code, "message": str(outcome), "status": outcome.status
+            }})
+            return
+        usage = outcome.usage_metadata
+        self._send_json(200, {
+            "candidates": [{
+                "content": {"parts": [{"text": outcome.text}], "role": "model"},
+                "finishReason": "STOP",
+                "index": 0,
+                "safetyRatings": [],
+            }],
+            "usageMetadata": {
+                "promptTokenCount": usage["prompt_token_count"],
+                "candidatesTokenCount": usage["candidates_token_count"],
+                "totalTokenCount": usage["total_token_count"],
+            },
+        })
+
+    def log_message(self, format, *args):
+        pass
+
+
+def make_server(model, host='127.0.0.1', port=8090):
+    """
+    Build (but do not start) a stand-in server; port 0 picks a free port.
+
+    Returns:
+        ThreadingHTTPServer: Serve with serve_forever(); base URL is
+        f"http://{host}:{server.server_address[1]}"
+    """
+    server = ThreadingHTTPServer((host, port), StubHandler)
+    server.daemon_threads = True
+    server.model = model
+    return server
+
+
+def start_server(model, host='127.0.0.1', port=0):
+    """
+    Serve `model` on a background thread.
+
+    Returns:
+        str: Base URL for GEMINI_BASE_URL
+    """
+    server = make_server(model, host, port)
+    threading.Thread(target=server.serve_forever, name='model-stub-server', daemon=True).start()
+    return f"http://{host}:{server.server_address[1]}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local Gemini stand-in server")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8090)
+    parser.add_argument('--latency', default=os.getenv('MODEL_STUB_LATENCY', DEFAULT_LATENCY))
+    parser.add_argument('--error-rate', type=float, default=float(os.getenv('MODEL_STUB_ERROR_RATE', '0')))
+    parser.add_argument('--tokens-per-sec', type=float, default=float(os.getenv('MODEL_STUB_TOKENS_PER_SEC', '0')))
+    parser.add_argument('--seed', type=int, default=None)
+    args = parser.parse_args()
+
+    model = StubModel(args.latency, args.error_rate, args.tokens_per_sec, args.seed)
+    server = make_server(model, args.host, args.port)
+    print(f"🧪 Gemini stand-in on http://{args.host}:{server.server_address[1]} "
+          f"(latency {args.latency}, errors {args.error_rate:.1%}, {args.tokens_per_sec or '∞'} tokens/s)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
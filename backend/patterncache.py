@@ -0,0 +1,166 @@
+"""
+Process-wide cache of parsed patterns and example posts, keyed by style.
+
+Entries are tagged with the (mtime, size) of the file they were parsed from
+and reloaded when that changes, so edits to data/ are picked up without a
+restart while repeat requests skip the JSON parse. Cached values are shared
+between callers and must be treated as read-only.
+"""
+import json
+import os
+import re
+import threading
+from pathlib import Path
+
+import metrics
+from extractpatterns import iter_posts, post_text
+
+DATA_FOLDER = Path(__file__).parent.parent / 'data'
+
+_lock = threading.Lock()
+_entries = {}
+_stats = {'patterns': {'hits': 0, 'misses': 0}, 'examples': {'hits': 0, 'misses': 0}}
+
+# Styles that read another style's dataset
+STYLE_ALIASES = {'serious': 'professional'}
+# Dataset names are file stems in data/raw/; anything else is never looked up
+_DATASET_NAME = re.compile(r'^[A-Za-z0-9_-]+$')
+# Returned for styles without a dataset; read-only like every cached value
+_NO_EXAMPLES = []
+
+
+def resolve_dataset(style):
+    """Dataset name for a style ('serious' posts use the professional dataset)"""
+    return STYLE_ALIASES.get(style, style)
+
+
+def styles_for(dataset_name):
+    """Styles served from a dataset: its own name plus any aliases"""
+    return [dataset_name] + [alias for alias, name in STYLE_ALIASES.items() if name == dataset_name]
+
+
+def patterns_path(style):
+    """Path of the extracted patterns file for a style"""
+    return DATA_FOLDER / 'processed' / f'patterns_{resolve_dataset(style)}.json'
+
+
+def dataset_path(style):
+    """Path of the raw posts dataset for a style"""
+    return DATA_FOLDER / 'raw' / f'{resolve_dataset(style)}.json'
+
+
+def dataset_names():
+    """Names of the datasets in data/raw/ (what /api/datasets lists)"""
+    return [f.stem for f in (DATA_FOLDER / 'raw').glob('*.json')]
+
+
+def _signature(path):
+    """(mtime, size) of a file, or None if it does not exist"""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+def _get(kind, style, path, load, variant=None):
+    """
+    Return the cached value for (kind, style, variant), reloading if path changed.
+    Styles come from requests, so only existing files get an entry (the
+    cache is bounded by what is in data/).
+    """
+    dataset = resolve_dataset(style)
+    if not _DATASET_NAME.match(dataset):
+        return None
+    key = (kind, dataset, variant)
+    signature = _signature(path)
+    with _lock:
+        entry = _entries.get(key)
+        if entry is not None and entry[0] == signature:
+            _stats[kind]['hits'] += 1
+            hit = True
+        else:
+            _stats[kind]['misses'] += 1
+            hit = False
+    metrics.cache_result(kind, hit)
+    if hit:
+        return entry[1]
+
+    if signature is None:
+        with _lock:
+            _entries.pop(key, None)
+        return None
+    value = load(path)
+    with _lock:
+        _entries[key] = (signature, value)
+    return value
+
+
+def _load_patterns(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def get_patterns(style):
+    """
+    Parsed patterns for a style.
+
+    Returns:
+        dict: Patterns dictionary or None if not extracted yet
+    """
+    with metrics.timer('pattern_load'):
+        return _get('patterns', style, patterns_path(style), _load_patterns)
+
+
+def set_patterns(style, patterns):
+    """Store freshly extracted patterns (e.g. after /api/extract-patterns)"""
+    signature = _signature(patterns_path(style))
+    with _lock:
+        _entries[('patterns', resolve_dataset(style), None)] = (signature, patterns)
+
+
+def get_example_posts(style, count=2):
+    """
+    Texts of the first `count` posts of a style's dataset (posts without text
+    are skipped). Only the start of the dataset is read.
+
+    Returns:
+        list[str]: Example post texts, possibly empty
+    """
+    def load(path):
+        texts = []
+        try:
+            for i, post in enumerate(iter_posts(path)):
+                if i >= count:
+                    break
+                text = post_text(post)
+                if text:
+                    texts.append(text)
+        except (OSError, ValueError, AttributeError):
+            return []
+        return texts
+
+    examples = _get('examples', style, dataset_path(style), load, variant=count)
+    # The cached list itself (or one shared empty list), so callers can
+    # compare identities to tell whether the examples changed
+    return examples if examples is not None else _NO_EXAMPLES
+
+
+def invalidate(style=None):
+    """Drop cached entries for one style, or for every style"""
+    with _lock:
+        if style is None:
+            _entries.clear()
+        else:
+            dataset = resolve_dataset(style)
+            for key in [key for key in _entries if key[1] == dataset]:
+                del _entries[key]
+
+
+def stats():
+    """Hit/miss counters per kind of cached data"""
+    with _lock:
+        return {
+            kind: dict(counts, entries=sum(1 for key in _entries if key[0] == kind))
+            for kind, counts in _stats.items()
+        }
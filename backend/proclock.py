@@ -0,0 +1,33 @@
+"""
+Exclusive locks shared between server worker processes.
+
+Under gunicorn every worker is its own process, so threading locks only
+serialize requests that land on the same worker. file_lock() takes an
+flock on a lock file next to the data it protects:
+
+    with file_lock(output_path.with_suffix('.lock')):
+        ...
+
+Without fcntl (Windows) it is a no-op and only the caller's threading
+locks apply.
+"""
+import contextlib
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+
+@contextlib.contextmanager
+def file_lock(path):
+    """Exclusive lock on `path` shared with the other server worker processes"""
+    if fcntl is None:
+        yield
+        return
+    with open(path, 'a') as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
@@ -0,0 +1,223 @@
+"""
+Optional cache of generated posts, keyed by (normalized context, style,
+patterns content hash).
+
+Identical /api/generate-post requests (client retries, dashboards) can then
+be answered without two fresh Gemini calls. Disabled unless POST_CACHE_BACKEND
+is set:
+
+    POST_CACHE_BACKEND=memory   # per-process LRU
+    POST_CACHE_BACKEND=sqlite   # shared on-disk cache (POST_CACHE_PATH)
+
+Entries expire after POST_CACHE_TTL seconds and the least recently used are
+evicted beyond POST_CACHE_MAX_ENTRIES.
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+POST_CACHE_BACKEND = os.getenv('POST_CACHE_BACKEND', 'off').lower()
+POST_CACHE_TTL = float(os.getenv('POST_CACHE_TTL', '3600'))
+POST_CACHE_MAX_ENTRIES = int(os.getenv('POST_CACHE_MAX_ENTRIES', '1000'))
+POST_CACHE_PATH = os.getenv(
+    'POST_CACHE_PATH', str(Path(__file__).parent.parent / 'data' / 'cache' / 'posts.sqlite3')
+)
+
+# Bump when the prompt or post format changes so old entries stop matching
+CACHE_VERSION = 1
+
+
+class MemoryCache:
+    """In-process LRU cache with a TTL"""
+
+    def __init__(self, ttl=POST_CACHE_TTL, max_entries=POST_CACHE_MAX_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        """Cached value for key, or None if missing or expired"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.time():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key, value):
+        """Store value under key, evicting the least recently used entries"""
+        with self._lock:
+            self._entries[key] = (time.time() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            return {"backend": "memory", "entries": len(self._entries), "hits": self.hits,
+                    "misses": self.misses, "evictions": self.evictions}
+
+
+class SQLiteCache:
+    """On-disk LRU cache with a TTL, shared by every worker process on the host"""
+
+    def __init__(self, path=POST_CACHE_PATH, ttl=POST_CACHE_TTL, max_entries=POST_CACHE_MAX_ENTRIES):
+        self.path = str(path)
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as db:
+            db.execute("""CREATE TABLE IF NOT EXISTS posts (
+                              key TEXT PRIMARY KEY,
+                              value TEXT NOT NULL,
+                              expires REAL NOT NULL,
+                              accessed REAL NOT NULL)""")
+            db.execute("CREATE INDEX IF NOT EXISTS posts_accessed ON posts (accessed)")
+
+    def _connect(self):
+        """One connection per thread"""
+        db = getattr(self._local, 'db', None)
+        if db is None:
+            db = sqlite3.connect(self.path, timeout=5)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            self._local.db = db
+        return db
+
+    def get(self, key):
+        """Cached value for key, or None if missing or expired"""
+        db = self._connect()
+        now = time.time()
+        row = db.execute("SELECT value, expires FROM posts WHERE key = ?", (key,)).fetchone()
+        if row is None or row[1] < now:
+            with self._lock:
+                self.misses += 1
+            return None
+        with db:
+            db.execute("UPDATE posts SET accessed = ? WHERE key = ?", (now, key))
+        with self._lock:
+            self.hits += 1
+        return json.loads(row[0])
+
+    def set(self, key, value):
+        """Store value under key, evicting expired and least recently used entries"""
+        db = self._connect()
+        now = time.time()
+        with db:
+            db.execute("INSERT OR REPLACE INTO posts (key, value, expires, accessed) VALUES (?, ?, ?, ?)",
+                       (key, json.dumps(value), now + self.ttl, now))
+            evicted = db.execute("DELETE FROM posts WHERE expires < ?", (now,)).rowcount
+            overflow = db.execute("SELECT COUNT(*) FROM posts").fetchone()[0] - self.max_entries
+            if overflow > 0:
+                evicted += db.execute(
+                    "DELETE FROM posts WHERE key IN (SELECT key FROM posts ORDER BY accessed LIMIT ?)",
+                    (overflow,)).rowcount
+        with self._lock:
+            self.evictions += evicted
+
+    def clear(self):
+        db = self._connect()
+        with db:
+            db.execute("DELETE FROM posts")
+
+    def stats(self):
+        entries = self._connect().execute("SELECT COUNT(*) FROM posts").fetchone()[0]
+        with self._lock:
+            return {"backend": "sqlite", "entries": entries, "hits": self.hits,
+                    "misses": self.misses, "evictions": self.evictions}
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_cache():
+    """
+    The configured response cache.
+
+    Returns:
+        MemoryCache | SQLiteCache: Cache instance, or None if caching is off
+    """
+    global _cache
+    if POST_CACHE_BACKEND not in ('memory', 'sqlite'):
+        return None
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = SQLiteCache() if POST_CACHE_BACKEND == 'sqlite' else MemoryCache()
+    return _cache
+
+
+def normalize_context(context):
+    """Case- and whitespace-insensitive form of a context"""
+    return ' '.join(context.split()).casefold()
+
+
+# id(patterns) -> (patterns, digest). patterncache hands out one patterns
+# object per file version, so each version is serialized and hashed once; the
+# entry keeps a reference so the id cannot be reused while it is cached.
+_patterns_digests = {}
+_MAX_PATTERNS_DIGESTS = 64
+_EMPTY_PATTERNS_DIGEST = hashlib.sha256(b'{}').hexdigest()
+
+
+def patterns_digest(patterns):
+    """SHA-256 of a patterns dict, computed once per patterns object"""
+    if not patterns:
+        return _EMPTY_PATTERNS_DIGEST
+    entry = _patterns_digests.get(id(patterns))
+    if entry is None or entry[0] is not patterns:
+        digest = hashlib.sha256(
+            json.dumps(patterns, sort_keys=True, ensure_ascii=False).encode('utf-8')
+        ).hexdigest()
+        entry = (patterns, digest)
+        with _cache_lock:
+            if len(_patterns_digests) >= _MAX_PATTERNS_DIGESTS:
+                _patterns_digests.clear()
+            _patterns_digests[id(patterns)] = entry
+    return entry[1]
+
+
+def make_key(context, style, patterns):
+    """
+    Cache key for a post request.
+
+    Args:
+        context (str): Topic/context (normalized before hashing)
+        style (str): Writing style
+        patterns (dict): Patterns the prompt is built from
+
+    Returns:
+        str: Hex digest
+    """
+    material = json.dumps([CACHE_VERSION, normalize_context(context), style, patterns_digest(patterns)])
+    return hashlib.sha256(material.encode('utf-8')).hexdigest()
+
+
+def stats():
+    """Counters of the configured cache, or {"backend": "off"}"""
+    cache = get_cache()
+    return cache.stats() if cache is not None else {"backend": "off"}
@@ -0,0 +1,139 @@
+"""
+Precomputed sampling tables for template (non-Gemini) post generation.
+
+TemplateTables is built once per style and patterns version: frequency
+weighted alias tables over opening_patterns and common_phrases, plus the
+template with every tone_indicators branch already decided. Generating a
+post is then a constant number of random draws and one join, whatever the
+size of the patterns.
+"""
+import random
+
+# Only the most frequent phrases read naturally in the template
+PHRASE_POOL = 5
+
+
+class AliasTable:
+    """
+    Walker/Vose alias table: O(n) to build, O(1) per weighted draw.
+
+    Args:
+        items (list): Values to sample
+        weights (list): Relative weights (all equal if omitted)
+    """
+
+    def __init__(self, items, weights=None):
+        self.items = list(items)
+        n = len(self.items)
+        if not n:
+            raise ValueError("AliasTable needs at least one item")
+        if weights is None or len(set(weights)) <= 1:
+            self.prob = None  # uniform: plain random.choice
+            self.alias = None
+            return
+
+        total = float(sum(weights))
+        scaled = [w * n / total for w in weights]
+        prob = [1.0] * n
+        alias = list(range(n))
+        small = [i for i, p in enumerate(scaled) if p < 1.0]
+        large = [i for i, p in enumerate(scaled) if p >= 1.0]
+        while small and large:
+            s, l = small.pop(), large.pop()
+            prob[s] = scaled[s]
+            alias[s] = l
+            scaled[l] -= 1.0 - scaled[s]
+            (small if scaled[l] < 1.0 else large).append(l)
+        # Leftovers are 1.0 up to rounding
+        self.prob = prob
+        self.alias = alias
+
+    def sample(self, rng=random):
+        if self.prob is None:
+            return rng.choice(self.items)
+        i = rng.randrange(len(self.items))
+        return self.items[i] if rng.random() < self.prob[i] else self.items[self.alias[i]]
+
+    def __len__(self):
+        return len(self.items)
+
+
+def _trim_opening(opening):
+    """Keep long openings to their first two sentences"""
+    if len(opening) > 150:
+        sentences = opening.split('.')[:2]
+        opening = '. '.join(sentences) + '.'
+    return opening
+
+
+def _counted(entries, limit=None):
+    """(items, weights) from [[text, count], ...] lists in patterns"""
+    entries = [entry for entry in entries if isinstance(entry, (list, tuple)) and entry][:limit]
+    return [entry[0] for entry in entries], [entry[1] if len(entry) > 1 else 1 for entry in entries]
+
+
+class TemplateTables:
+    """
+    Sampling tables and the tone-resolved template for one style's patterns.
+
+    Args:
+        patterns (dict): Extracted patterns (non-empty)
+    """
+
+    def __init__(self, patterns):
+        openings = [_trim_opening(opening) for opening in patterns.get('opening_patterns', []) if opening]
+        self.openings = AliasTable(openings) if openings else None
+
+        phrases = patterns.get('common_phrases', [])
+        # Same rule as before: the phrase paragraph needs more than 5 phrases
+        self.phrases = AliasTable(*_counted(phrases, PHRASE_POOL)) if len(phrases) > 5 else None
+
+        self.segments = self._resolve_template(patterns.get('tone_indicators', {}))
+
+    def _resolve_template(self, tone):
+        """
+        The post as (literal, slot) pairs with tone decisions already made;
+        slot is 'opening', 'context', 'phrase' or None
+        """
+        segments = [("", 'opening'), ("\n\n", 'context'), (" has been on my mind recently.", None)]
+        if tone.get('first_person', 0) > 10:
+            segments.append((" I've realized that the way we approach this can make all the difference in our outcomes.", None))
+        else:
+            segments.append((" It's something that affects more of us than we might think.", None))
+
+        if self.phrases is not None:
+            segments.append(("\n\nHere's what I've learned: ", 'phrase'))
+            segments.append((" isn't just a nice idea - it's essential. ", None))
+            if tone.get('questions', 0) > 5:
+                segments.append(("What happens when we ignore this? We miss opportunities that could transform everything.", None))
+            else:
+                segments.append(("When we truly understand this, our entire perspective shifts.", None))
+
+        if tone.get('direct_address', 0) > 20:
+            segments.append(("\n\nIf you're working on ", 'context'))
+            segments.append((", you know how challenging it can be. But that challenge is exactly what makes the breakthrough so rewarding.", None))
+        else:
+            segments.append(("\n\nThe journey with ", 'context'))
+            segments.append((" continues to surprise and teach. Every step forward reveals new insights worth sharing.", None))
+
+        if tone.get('questions', 0) > 10:
+            segments.append(("\n\nWhat's your experience with this? How has ", 'context'))
+            segments.append((" impacted your work?", None))
+        else:
+            segments.append(("\n\nLooking forward to hearing different perspectives on this.", None))
+        return tuple(segments)
+
+    def opening(self, context, rng=random):
+        if self.openings is None:
+            return _trim_opening(f"Let's talk about {context}")
+        return self.openings.sample(rng)
+
+    def render(self, context, rng=random):
+        """One post for context; each slot is a single O(1) draw"""
+        values = {'opening': self.opening(context, rng), 'context': context}
+        if self.phrases is not None:
+            values['phrase'] = self.phrases.sample(rng)
+        return ''.join([
+            literal + values[slot] if slot is not None else literal
+            for literal, slot in self.segments
+        ])
@@ -0,0 +1,97 @@
+import importlib.util
+import json
+import os
+import random
+from pathlib import Path
+
+import pytest
+
+import content_baseline
+
+CONTENT_DIR = Path(__file__).resolve().parent.parent / 'content'
+
+# content/generator.py is imported as `generator` by the content server; load
+# it under another name so it does not clash with backend/generator.py
+_spec = importlib.util.spec_from_file_location('content_generator', CONTENT_DIR / 'generator.py')
+content_generator = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(content_generator)
+
+BASELINE = {
+    'cluely': content_baseline.generate_cluely_post,
+    'boardy': content_baseline.generate_boardy_post,
+    'performative': content_baseline.generate_performative_post,
+    'serious': content_baseline.generate_serious_post,
+}
+# Values with braces show that inserted text is never parsed as a template
+TOPIC, DETAILS = "AI {hook} agents", "We shipped {topic} in {details} 3 weeks — 100% 🚀"
+
+
+def all_outputs(func, *args):
+    """Every output func can return, following each branch of random.choice"""
+    outputs = set()
+    pending = [()]
+    original = random.choice
+    try:
+        while pending:
+            script = pending.pop()
+            taken = []
+
+            def choice(seq):
+                if len(taken) < len(script):
+                    index = script[len(taken)]
+                else:
+                    index = 0
+                    pending.extend(tuple(taken) + (other,) for other in range(1, len(seq)))
+                taken.append(index)
+                return seq[index]
+
+            random.choice = choice
+            outputs.add(func(*args))
+    finally:
+        random.choice = original
+    return outputs
+
+
+@pytest.mark.parametrize("style", sorted(BASELINE))
+def test_compiled_templates_match_the_old_f_strings(style):
+    registry = content_generator.TemplateRegistry(CONTENT_DIR / 'templates.json')
+    expected = all_outputs(BASELINE[style], TOPIC, DETAILS)
+    assert all_outputs(registry.render, style, TOPIC, DETAILS) == expected
+    assert all_outputs(registry.render, style.upper(), TOPIC, DETAILS) == expected
+
+
+def test_aliases_and_unknown_styles_use_the_old_fallback():
+    registry = content_generator.TemplateRegistry(CONTENT_DIR / 'templates.json')
+    performative = all_outputs(content_baseline.generate_performative_post, TOPIC, DETAILS)
+    assert all_outputs(registry.render, 'professional', TOPIC, DETAILS) == performative
+    assert all_outputs(registry.render, 'no-such-style', TOPIC, DETAILS) == performative
+    assert sorted(registry.styles()) == sorted(BASELINE)
+
+
+def write_templates(path, template, mtime_ns):
+    path.write_text(json.dumps({"styles": {"plain": {"templates": [template]}}}), encoding='utf-8')
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+def test_templates_reload_when_the_file_changes(tmp_path):
+    path = tmp_path / 'templates.json'
+    write_templates(path, "Old {topic}", 1_000_000_000)
+    registry = content_generator.TemplateRegistry(path, reload_interval=0)
+    assert registry.render('plain', 'x', 'y') == "Old x"
+
+    # Same size, only the mtime differs
+    write_templates(path, "New {topic}", 2_000_000_000)
+    assert registry.render('plain', 'x', 'y') == "New x"
+
+    # A broken file keeps the last good templates
+    path.write_text("{not json", encoding='utf-8')
+    assert registry.render('plain', 'x', 'y') == "New x"
+
+
+def test_reload_interval_limits_file_checks(tmp_path):
+    path = tmp_path / 'templates.json'
+    write_templates(path, "Old {topic}", 1_000_000_000)
+    registry = content_generator.TemplateRegistry(path, reload_interval=3600)
+    assert registry.render('plain', 'x', 'y') == "Old x"
+    write_templates(path, "New {topic}", 2_000_000_000)
+    assert registry.render('plain', 'x', 'y') == "Old x"
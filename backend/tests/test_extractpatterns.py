@@ -0,0 +1,233 @@
+import json
+import re
+from collections import Counter
+from pathlib import Path
+
+import pytest
+
+import extractpatterns
+
+RAW_DATASETS = sorted((Path(__file__).resolve().parents[2] / 'data' / 'raw').glob('*.json'))
+
+EDGE_POSTS = [
+    {"generated_post_text": ""},
+    {},
+    {"full_post_text": "→ • ✓ ✅ ❌"},
+    {"generated_post_text": "!!! ... ???\n\n---"},
+    {"generated_post_text": "\n\n\n\n"},
+    # Either side of the ord(c) > 127000 emoji test
+    {"generated_post_text": "Edge \U0001F018 case.\nNext \U0001F019 line!\n🚀🚀 launch 🚀"},
+    {"generated_post_text": "𝗯𝗼𝗹𝗱 opening line. Then you and I ask: why?\n\nWe did it. #growth #startup"},
+    {"full_post_text": "I I I you you we. Are you in? Because I am.\n• one\n• two\n1. first"},
+]
+
+
+# Baseline implementations of the two extractors later rewritten on Counter
+def baseline_common_phrases(posts, top_n=50):
+    phrases = []
+    for post in posts:
+        text = post.get('generated_post_text') or post.get('full_post_text') or ''
+        if text:
+            words = re.findall(r'\b\w+\b', text.lower())
+            for i in range(len(words) - 1):
+                if len(words[i]) > 2 or len(words[i+1]) > 2:
+                    phrases.append(f"{words[i]} {words[i+1]}")
+            for i in range(len(words) - 2):
+                phrases.append(f"{words[i]} {words[i+1]} {words[i+2]}")
+    return Counter(phrases).most_common(top_n)
+
+
+def baseline_key_vocabulary(posts, top_n=30):
+    words = []
+    for post in posts:
+        text = post.get('generated_post_text') or post.get('full_post_text') or ''
+        if text:
+            words.extend(word for word in re.findall(r'\b\w+\b', text.lower())
+                         if word not in extractpatterns.STOPWORDS and len(word) > 3)
+    return Counter(words).most_common(top_n)
+
+
+def baseline_patterns(posts):
+    """What the baseline extract_patterns_from_file wrote, key for key"""
+    return {
+        'opening_patterns': extractpatterns.extract_openings(posts),
+        'top_sentence_starters': extractpatterns.extract_sentence_starters(posts),
+        'common_phrases': baseline_common_phrases(posts),
+        'formatting_patterns': extractpatterns.detect_formatting_patterns(posts),
+        'tone_indicators': extractpatterns.detect_tone_indicators(posts),
+        'structure': extractpatterns.analyze_structure(posts),
+        'vocabulary': baseline_key_vocabulary(posts),
+    }
+
+
+def dumps(patterns):
+    return json.dumps(patterns, indent=2, ensure_ascii=False)
+
+
+def load(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+@pytest.mark.parametrize("dataset", RAW_DATASETS, ids=lambda path: path.stem)
+def test_single_pass_matches_baseline_extractors(dataset, tmp_path):
+    posts = load(dataset)
+    expected = dumps(baseline_patterns(posts))
+
+    assert dumps(extractpatterns.analyze_posts(posts).patterns()) == expected
+    output = tmp_path / 'patterns.json'
+    extractpatterns.extract_patterns_from_file(str(dataset), str(output))
+    assert output.read_text(encoding='utf-8') == expected
+
+
+@pytest.mark.parametrize("posts", [
+    EDGE_POSTS,
+    [EDGE_POSTS[0]],
+    [EDGE_POSTS[2], EDGE_POSTS[3]],
+    [EDGE_POSTS[5]],
+], ids=['all', 'empty', 'special-characters-only', 'emoji-boundary'])
+def test_edge_texts_match_baseline_extractors(posts):
+    assert dumps(extractpatterns.analyze_posts(posts).patterns()) == dumps(baseline_patterns(posts))
+
+
+def test_edge_texts_mixed_into_a_dataset_match_baseline():
+    posts = load(RAW_DATASETS[0]) + EDGE_POSTS
+    assert dumps(extractpatterns.analyze_posts(posts).patterns()) == dumps(baseline_patterns(posts))
+
+
+STREAM_POSTS = [
+    {"post_id": "a", "generated_post_text": "Short."},
+    {"post_id": "b", "generated_post_text": "Ünïcödé → 🚀 spans \"quoted\" bytes", "likes": 12},
+    {"post_id": "c", "full_post_text": "x" * 300, "tags": ["#one", "#two"], "score": 1.5e3},
+    {"post_id": "d", "generated_post_text": "Last one.\n\nWith paragraphs."},
+]
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 7, 64, 1 << 16])
+@pytest.mark.parametrize("indent", [None, 2])
+def test_json_array_split_across_read_chunks(tmp_path, chunk_size, indent):
+    path = tmp_path / 'posts.json'
+    path.write_text(json.dumps(STREAM_POSTS, indent=indent, ensure_ascii=False), encoding='utf-8')
+    assert list(extractpatterns.iter_posts(str(path), chunk_size=chunk_size)) == STREAM_POSTS
+
+
+def test_json_lines_with_blank_and_trailing_lines(tmp_path):
+    path = tmp_path / 'posts.jsonl'
+    lines = [json.dumps(post, ensure_ascii=False) for post in STREAM_POSTS]
+    path.write_text("\n" + lines[0] + "\n\n" + "\n".join(lines[1:]) + "\n  \n\n", encoding='utf-8')
+    reader = extractpatterns.PostReader(str(path), chunk_size=4)
+    assert list(reader) == STREAM_POSTS
+    assert reader.format == 'jsonl'
+
+
+@pytest.mark.parametrize("fmt", ['array', 'jsonl'])
+@pytest.mark.parametrize("chunk_size", [3, 1 << 16])
+def test_offset_resumes_after_a_partial_read(tmp_path, fmt, chunk_size):
+    path = tmp_path / 'posts.json'
+    if fmt == 'array':
+        path.write_text(json.dumps(STREAM_POSTS, indent=2, ensure_ascii=False), encoding='utf-8')
+    else:
+        path.write_text("\n".join(json.dumps(post, ensure_ascii=False) for post in STREAM_POSTS) + "\n",
+                        encoding='utf-8')
+
+    for read in range(len(STREAM_POSTS) + 1):
+        reader = extractpatterns.PostReader(str(path), chunk_size=chunk_size)
+        posts = iter(reader)
+        first = [next(posts) for _ in range(read)]
+        offset = reader.offset
+        posts.close()
+
+        resumed = extractpatterns.PostReader(str(path), start=offset, chunk_size=chunk_size)
+        assert first + list(resumed) == STREAM_POSTS
+        assert resumed.format == fmt
+
+
+def all_raw_posts():
+    return [post for dataset in RAW_DATASETS for post in load(dataset)] + EDGE_POSTS
+
+
+@pytest.mark.parametrize("workers, shard_size", [(2, 1), (3, 2), (4, 3)])
+def test_sharded_workers_match_single_process(workers, shard_size):
+    posts = all_raw_posts()
+    assert len(posts) > workers * shard_size * 2  # several shards per worker, all merged
+    single = extractpatterns.analyze_posts(posts)
+    sharded = extractpatterns.analyze_posts(iter(posts), workers=workers, shard_size=shard_size)
+    assert dumps(sharded.patterns()) == dumps(single.patterns())
+    assert sharded.to_state() == single.to_state()
+
+
+def test_merge_is_order_independent_for_every_aggregate():
+    import itertools
+    import random
+
+    posts = all_raw_posts()
+    shards = [extractpatterns.PatternAnalyzer().add_texts(texts)
+              for texts in extractpatterns._iter_shards(posts, 3)]
+    expected = extractpatterns.PatternAnalyzer().add_posts(posts)
+
+    orders = [list(range(len(shards))), list(reversed(range(len(shards))))]
+    orders += [random.Random(seed).sample(range(len(shards)), len(shards)) for seed in range(5)]
+    for order in orders:
+        merged = extractpatterns.PatternAnalyzer()
+        for index in order:
+            merged.merge(extractpatterns.PatternAnalyzer.from_state(shards[index].to_state()))
+        # Counts and totals do not depend on the merge order...
+        for name in extractpatterns.PatternAnalyzer._TOTALS:
+            assert getattr(merged, name) == getattr(expected, name), name
+        for name in ('starters', 'phrases', 'words'):
+            assert getattr(merged, name) == getattr(expected, name), name
+        assert sorted(merged.openings) == sorted(expected.openings)
+    # ...while list order and most_common ties follow it, which is why
+    # analyze_posts merges shards in input order
+    assert list(itertools.chain.from_iterable(shard.openings for shard in shards)) == expected.openings
+
+
+def write_posts(path, posts, fmt):
+    if fmt == 'array':
+        text = json.dumps(posts, indent=2, ensure_ascii=False)
+    else:
+        text = "".join(json.dumps(post, ensure_ascii=False) + "\n" for post in posts)
+    path.write_text(text, encoding='utf-8')
+
+
+def extract(input_path, output_path, incremental):
+    extractpatterns.extract_patterns_from_file(str(input_path), str(output_path), incremental=incremental)
+    return output_path.read_text(encoding='utf-8')
+
+
+@pytest.mark.parametrize("fmt", ['array', 'jsonl'])
+def test_incremental_append_equals_full_rebuild(tmp_path, capsys, fmt):
+    posts = all_raw_posts()
+    dataset, output = tmp_path / 'posts.json', tmp_path / 'patterns.json'
+    write_posts(dataset, posts[:20], fmt)
+    extract(dataset, output, incremental=True)
+
+    for end in (24, len(posts)):
+        write_posts(dataset, posts[:end], fmt)
+        capsys.readouterr()
+        incremental = extract(dataset, output, incremental=True)
+        assert "Folded in" in capsys.readouterr().out
+        assert incremental == extract(dataset, tmp_path / 'full.json', incremental=False)
+        assert incremental == dumps(baseline_patterns(posts[:end]))
+
+
+@pytest.mark.parametrize("fmt", ['array', 'jsonl'])
+@pytest.mark.parametrize("change", ['rewritten', 'truncated'])
+def test_changed_file_falls_back_to_a_full_pass(tmp_path, capsys, fmt, change):
+    posts = all_raw_posts()
+    dataset, output = tmp_path / 'posts.json', tmp_path / 'patterns.json'
+    write_posts(dataset, posts, fmt)
+    extract(dataset, output, incremental=True)
+
+    if change == 'rewritten':
+        # Same posts plus one more, but an earlier post edited
+        changed = [dict(posts[0], generated_post_text="Edited opening. Entirely new text!")] + posts[1:]
+        changed.append({"generated_post_text": "Appended afterwards."})
+    else:
+        changed = posts[:10]
+    write_posts(dataset, changed, fmt)
+    capsys.readouterr()
+    result = extract(dataset, output, incremental=True)
+
+    assert "Folded in" not in capsys.readouterr().out
+    assert result == dumps(baseline_patterns(changed))
@@ -0,0 +1,101 @@
+import json
+
+import pytest
+
+import app as app_module
+import llm
+import patterncache
+from modelstub import StubModel
+
+POSTS = [
+    {"post_id": f"NEW-{i:03d}", "text": f"Post {i}: we shipped the thing.\n\nHere is what I learned. #startup"}
+    for i in range(5)
+]
+
+
+@pytest.fixture
+def new_dataset(tmp_path, monkeypatch):
+    """A dataset in data/raw/ whose patterns have not been extracted yet"""
+    (tmp_path / 'raw').mkdir()
+    (tmp_path / 'processed').mkdir()
+    (tmp_path / 'raw' / 'newstyle.json').write_text(json.dumps(POSTS), encoding='utf-8')
+    monkeypatch.setattr(patterncache, 'DATA_FOLDER', tmp_path)
+    patterncache.invalidate()
+    llm.use_model(StubModel('0'))
+    yield tmp_path
+    llm.use_model(None)
+    patterncache.invalidate()
+
+
+def test_single_and_batch_endpoints_both_extract_missing_patterns(new_dataset):
+    client = app_module.app.test_client()
+
+    response = client.post('/api/generate-posts', json={"contexts": ["Our seed round closed today"],
+                                                         "styles": ["newstyle"], "cache": False})
+    lines = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    assert lines[-1] == {"done": True, "count": 1}
+    assert lines[0]["post"]["used_patterns"] is True
+    assert (new_dataset / 'processed' / 'patterns_newstyle.json').exists()
+
+    (new_dataset / 'processed' / 'patterns_newstyle.json').unlink()
+    patterncache.invalidate()
+    response = client.post('/api/generate-post', json={"context": "Our seed round closed today",
+                                                       "style": "newstyle", "cache": False})
+    assert response.status_code == 200
+    assert response.get_json()["post"]["used_patterns"] is True
+    assert (new_dataset / 'processed' / 'patterns_newstyle.json').exists()
+
+
+def test_prompt_is_cached_prefix_plus_context():
+    import generator
+    import modelstub
+
+    patterns = patterncache.get_patterns('boardy')
+    context = "Why we moved the whole team to a four-day week"
+    prompt = generator.build_gemini_prompt(context, 'boardy', patterns)
+    prefix, _ = generator.get_prompt_prefix('boardy', patterns)
+
+    assert prompt.startswith(prefix)
+    assert context not in prefix
+    assert f'CONTEXT/TOPIC: {context}\n\n' in prompt
+    assert f'- Expand on "{context}" with specific details' in prompt
+    assert prompt.endswith("Now write the LinkedIn post:")
+    assert context in modelstub.respond(prompt)
+
+
+def test_prompt_prefix_is_reused_for_a_style_without_examples(new_dataset, monkeypatch):
+    import generator
+
+    builds = []
+    original = generator.build_prompt_prefix
+    monkeypatch.setattr(generator, 'build_prompt_prefix',
+                        lambda *args: builds.append(args[0]) or original(*args))
+    patterns = {"tone_indicators": {}}
+    for _ in range(3):
+        generator.get_prompt_prefix('nodataset', patterns)
+    assert builds == ['nodataset']
+
+
+@pytest.mark.parametrize("body, error", [
+    ({"contexts": ["a"], "styles": ["boardy"], "concurrency": "abc"}, "concurrency must be an integer"),
+    ({"contexts": ["a"], "styles": ["boardy"], "concurrency": 0}, "concurrency must be at least 1"),
+    ({"items": ["not an object"]}, "items must be a list of objects"),
+    ({"items": {"context": "a"}}, "items must be a list of objects"),
+    ({"items": [{"context": 42}]}, "context must be a string"),
+    ({"items": [{"context": "a", "video_analysis": "x"}]}, "video_analysis must be an object"),
+    ({"contexts": "a", "styles": ["boardy"]}, "contexts must be a list of strings"),
+    ({"contexts": ["a"], "styles": [1]}, "styles must be a list of strings"),
+    ([1, 2], "Expected a JSON object"),
+])
+def test_batch_rejects_malformed_bodies_with_json(body, error):
+    response = app_module.app.test_client().post('/api/generate-posts', json=body)
+    assert response.status_code == 400
+    assert response.get_json() == {"error": error}
+
+
+def test_batch_size_is_checked_before_the_fan_out(monkeypatch):
+    monkeypatch.setattr(app_module, 'MAX_BATCH_SIZE', 4)
+    response = app_module.app.test_client().post(
+        '/api/generate-posts', json={"contexts": ["a", "b", "c"], "styles": ["boardy", "cluely"]})
+    assert response.status_code == 400
+    assert response.get_json() == {"error": "At most 4 posts per batch"}
@@ -0,0 +1,45 @@
+import threading
+
+import pytest
+
+import app as app_module
+import patterncache
+
+
+@pytest.fixture
+def cold_worker(monkeypatch):
+    """A worker that has not warmed up yet; warm-up waits for `gate`"""
+    gate = threading.Event()
+    names = patterncache.dataset_names
+
+    monkeypatch.setattr(app_module, '_ready', threading.Event())
+    monkeypatch.setattr(app_module, '_warm_up_thread', None)
+    monkeypatch.setattr(app_module, '_warm_up_report', {"state": "pending"})
+    monkeypatch.setattr(patterncache, 'dataset_names', lambda: gate.wait(5) and names())
+    yield gate
+    gate.set()
+
+
+def test_health_is_503_until_warm_up_completes(cold_worker):
+    client = app_module.app.test_client()
+
+    response = client.get('/health')
+    assert response.status_code == 503
+    assert response.get_json()["status"] == "starting"
+    assert response.get_json()["ready"] is False
+    thread = app_module._warm_up_thread
+    assert thread is not None  # the first request started it
+
+    app_module.start_warm_up()  # already running: no second thread
+    assert app_module._warm_up_thread is thread
+    assert client.get('/health').status_code == 503
+
+    cold_worker.set()
+    thread.join(30)
+    response = client.get('/health')
+    body = response.get_json()
+    assert response.status_code == 200
+    assert body["status"] == "healthy" and body["ready"] is True
+    assert body["warm_up"]["state"] == "done"
+    assert set(patterncache.dataset_names()) <= set(body["warm_up"]["styles"])
+    assert body["warm_up"]["errors"] == {}
@@ -0,0 +1,124 @@
+import io
+import json
+import threading
+import time
+
+import pytest
+
+import app as app_module
+import jobs
+
+
+class Blocking:
+    """Stub job function: returns result once released"""
+
+    def __init__(self, result=None):
+        self.result = {"ok": True} if result is None else result
+        self.started = threading.Event()
+        self.release = threading.Event()
+        self.timeouts = []
+
+    def __call__(self, *args, timeout=None):
+        self.timeouts.append(timeout)
+        self.started.set()
+        assert self.release.wait(5)
+        if isinstance(self.result, Exception):
+            raise self.result
+        return dict(self.result, args=list(args))
+
+
+@pytest.fixture
+def job_queue(tmp_path):
+    return jobs.JobQueue(tmp_path, workers=1, max_pending=1, timeout=42)
+
+
+def test_job_moves_from_queued_to_running_to_succeeded(job_queue, tmp_path):
+    func = Blocking()
+    job = job_queue.submit(func, 'video.mp4', kind='video-analysis')
+    assert job["status"] == "queued"
+
+    running = job_queue.wait(job["id"], "queued", timeout=5)
+    assert running["status"] == "running" and running["started_at"] is not None
+    func.release.set()
+    done = job_queue.wait(job["id"], "running", timeout=5)
+
+    assert done["status"] == "succeeded"
+    assert done["result"] == {"ok": True, "args": ['video.mp4']}
+    assert done["error"] is None
+    assert func.timeouts == [42]
+    with open(tmp_path / f"{job['id']}.json", encoding='utf-8') as f:
+        assert json.load(f)["status"] == "succeeded"
+
+
+@pytest.mark.parametrize("result, error", [
+    ({"error": "Video analysis timed out"}, "Video analysis timed out"),
+    (RuntimeError("node crashed"), "RuntimeError: node crashed"),
+])
+def test_job_fails_on_error_result_or_exception(job_queue, result, error):
+    func = Blocking(result)
+    func.release.set()
+    job = job_queue.submit(func)
+    job = job_queue.wait(job["id"], "queued", timeout=5)
+    if job["status"] == "running":
+        job = job_queue.wait(job["id"], "running", timeout=5)
+    assert job["status"] == "failed"
+    assert job["error"] == error
+
+
+def test_queue_full_when_max_pending_are_waiting(job_queue):
+    running, queued = Blocking(), Blocking()
+    job_queue.submit(running)
+    assert running.started.wait(5)
+    job_queue.submit(queued)
+    with pytest.raises(jobs.QueueFull):
+        job_queue.submit(Blocking())
+    assert job_queue.stats()["pending"] == 1
+    running.release.set()
+    queued.release.set()
+    assert job_queue.drain(5)
+
+
+def test_upload_returns_503_when_the_analysis_queue_is_full(tmp_path, monkeypatch, job_queue):
+    monkeypatch.setitem(app_module.app.config, 'UPLOAD_FOLDER', str(tmp_path))
+    monkeypatch.setattr(app_module, 'analysis_jobs', job_queue)
+    running, queued = Blocking(), Blocking()
+    job_queue.submit(running)
+    assert running.started.wait(5)
+    job_queue.submit(queued)
+
+    response = app_module.app.test_client().post('/api/upload-video', data={
+        'video': (io.BytesIO(b'queued video bytes'), 'clip.mp4'),
+    }, content_type='multipart/form-data')
+
+    assert response.status_code == 503
+    assert response.headers['Retry-After'] == '30'
+    assert "full" in response.get_json()["error"]
+    running.release.set()
+    queued.release.set()
+    assert job_queue.drain(5)
+
+
+def test_wait_returns_the_unchanged_job_after_timeout(job_queue):
+    func = Blocking()
+    job = job_queue.submit(func)
+    assert func.started.wait(5)
+
+    started = time.monotonic()
+    job = job_queue.wait(job["id"], "running", timeout=0.2)
+    assert time.monotonic() - started >= 0.2
+    assert job["status"] == "running"
+    assert job_queue.wait("0" * 32, None, timeout=0.1) is None
+    func.release.set()
+
+
+def test_drain_waits_for_jobs_and_refuses_new_ones(job_queue):
+    func = Blocking()
+    job = job_queue.submit(func)
+    assert func.started.wait(5)
+
+    assert job_queue.drain(timeout=0.1) is False
+    with pytest.raises(jobs.QueueFull):
+        job_queue.submit(Blocking())
+    func.release.set()
+    assert job_queue.drain(timeout=5) is True
+    assert job_queue.get(job["id"])["status"] == "succeeded"
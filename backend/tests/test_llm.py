@@ -0,0 +1,37 @@
+import asyncio
+
+import pytest
+
+import llm
+
+pytest.importorskip('google.generativeai')
+
+
+@pytest.fixture
+def configured(monkeypatch):
+    """A Gemini client configured with a dummy key (no request is made)"""
+    monkeypatch.setenv('GEMINI_API_KEY', 'test-key')
+    monkeypatch.setattr(llm, 'GEMINI_BASE_URL', None)
+    monkeypatch.setattr(llm, 'MODEL_BACKEND', 'gemini')
+    llm.use_model(None)
+    llm.rotate_api_key()
+    yield
+    llm.rotate_api_key()
+
+
+async def _async_model():
+    return llm.get_async_model()
+
+
+def test_async_model_gets_its_own_grpc_client(configured):
+    model = asyncio.run(_async_model())
+    assert model._async_client is not None
+
+
+def test_async_model_falls_back_to_executor_without_sdk_internals(configured, monkeypatch):
+    from google.generativeai import client as genai_client
+
+    llm.get_model()
+    monkeypatch.delattr(genai_client, '_client_manager')
+    model = asyncio.run(_async_model())
+    assert isinstance(model, llm._RestAsyncModel)
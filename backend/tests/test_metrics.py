@@ -0,0 +1,65 @@
+import pytest
+
+import app as app_module
+import metrics
+
+
+@pytest.fixture
+def fresh_metrics(monkeypatch):
+    monkeypatch.setattr(metrics, 'NAMESPACE', 'test')
+    metrics.reset()
+    yield
+    metrics.reset()
+
+
+def test_render_is_prometheus_text(fresh_metrics):
+    metrics.observe('stage_seconds', 0.003, stage='pattern_load')
+    metrics.observe('stage_seconds', 0.2, stage='pattern_load')
+    metrics.observe('stage_seconds', 500, stage='pattern_load')
+    metrics.cache_result('patterns', True)
+    metrics.inc('errors_total', stage='say "hi"\n')
+
+    lines = metrics.render().splitlines()
+
+    assert lines[:4] == [
+        '# HELP test_cache_requests_total Cache lookups by cache and result',
+        '# TYPE test_cache_requests_total counter',
+        'test_cache_requests_total{cache="patterns",result="hit"} 1',
+        '# HELP test_errors_total Failed stages',
+    ]
+    assert 'test_errors_total{stage="say \\"hi\\"\\n"} 1' in lines
+    assert '# TYPE test_stage_seconds histogram' in lines
+    assert 'test_stage_seconds_bucket{stage="pattern_load",le="0.001"} 0' in lines
+    assert 'test_stage_seconds_bucket{stage="pattern_load",le="0.005"} 1' in lines
+    assert 'test_stage_seconds_bucket{stage="pattern_load",le="0.25"} 2' in lines
+    assert 'test_stage_seconds_bucket{stage="pattern_load",le="300.0"} 2' in lines
+    assert 'test_stage_seconds_bucket{stage="pattern_load",le="+Inf"} 3' in lines
+    assert 'test_stage_seconds_sum{stage="pattern_load"} 500.203' in lines
+    assert 'test_stage_seconds_count{stage="pattern_load"} 3' in lines
+    # Buckets are cumulative and in ascending le order
+    buckets = [int(line.rsplit(' ', 1)[1]) for line in lines if line.startswith('test_stage_seconds_bucket')]
+    assert len(buckets) == len(metrics.BUCKETS) + 1 and buckets == sorted(buckets)
+
+
+def test_summary_mode_has_no_buckets(fresh_metrics, monkeypatch):
+    monkeypatch.setattr(metrics, 'METRICS_MODE', 'summary')
+    with metrics.timer('generate'):
+        pass
+    text = metrics.render()
+    assert '# TYPE test_stage_seconds summary' in text
+    assert '_bucket' not in text
+    assert 'test_stage_seconds_count{stage="generate"} 1' in text
+
+
+def test_off_mode_records_no_samples(fresh_metrics, monkeypatch):
+    monkeypatch.setattr(metrics, 'METRICS_MODE', 'off')
+    with metrics.timer('generate'):
+        pass
+    metrics.observe('http_request_seconds', 0.1, endpoint='health')
+    metrics.inc('fallbacks_total', stage='generate')
+    assert metrics.render() == '\n'
+
+    response = app_module.app.test_client().get('/metrics')
+    assert response.mimetype == 'text/plain'
+    assert response.headers['Content-Type'].startswith('text/plain; version=0.0.4')
+    assert not [line for line in response.get_data(as_text=True).splitlines() if line and not line.startswith('#')]
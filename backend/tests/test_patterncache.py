@@ -0,0 +1,23 @@
+import generator
+import patterncache
+
+
+def test_unknown_styles_do_not_grow_the_caches():
+    patterncache.invalidate()
+    for i in range(100):
+        assert patterncache.get_patterns(f"made-up-style-{i}") is None
+        assert patterncache.get_example_posts(f"made-up-style-{i}") == []
+    assert patterncache.get_patterns("../raw/boardy") is None
+    assert not patterncache._entries
+
+    assert patterncache.get_patterns("serious") is patterncache.get_patterns("professional")
+    assert len(patterncache._entries) == 1
+
+
+def test_per_style_generator_caches_are_bounded():
+    patterns = patterncache.get_patterns("boardy")
+    for i in range(generator.MAX_CACHED_STYLES * 2):
+        generator.get_prompt_prefix(f"style-{i}", patterns)
+        generator.get_template_tables(f"style-{i}", patterns)
+    assert len(generator._prompt_prefixes) == generator.MAX_CACHED_STYLES
+    assert len(generator._template_tables) == generator.MAX_CACHED_STYLES
@@ -0,0 +1,16 @@
+import responsecache
+
+
+def test_make_key_hashes_each_patterns_object_once(monkeypatch):
+    patterns = {"opening_patterns": [f"Post {i}" for i in range(1000)]}
+    first = responsecache.make_key("Our  Seed round", "boardy", patterns)
+
+    dumped = []
+    original = responsecache.json.dumps
+    monkeypatch.setattr(responsecache.json, 'dumps', lambda value, **kwargs: dumped.append(value) or original(value, **kwargs))
+    assert responsecache.make_key("our seed round", "boardy", patterns) == first
+    assert patterns not in dumped
+
+    # A new patterns version (a new object) gets a new key
+    assert responsecache.make_key("our seed round", "boardy", dict(patterns, extra=1)) != first
+    assert responsecache.make_key("our seed round", "boardy", None) == responsecache.make_key("our seed round", "boardy", {})
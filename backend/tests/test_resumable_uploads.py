@@ -0,0 +1,115 @@
+import hashlib
+import io
+import threading
+
+import pytest
+
+import videostore
+
+
+def two_workers(tmp_path):
+    """Two ResumableUploads over one folder, as in two server worker processes"""
+    return videostore.ResumableUploads(tmp_path), videostore.ResumableUploads(tmp_path)
+
+
+def test_chunks_alternating_between_workers(tmp_path, monkeypatch):
+    first, second = two_workers(tmp_path)
+    data = bytes(range(256)) * 40
+    chunks = [data[i:i + 1000] for i in range(0, len(data), 1000)]
+    session = first.create('mp4', len(data), hashlib.sha256(data).hexdigest())
+
+    rehashes = []
+    original = videostore.ResumableUploads._file_sha
+    monkeypatch.setattr(videostore.ResumableUploads, '_file_sha',
+                        lambda self, upload_id: rehashes.append(upload_id) or original(self, upload_id))
+
+    offset = 0
+    for index, chunk in enumerate(chunks):
+        worker = (first, second)[index % 2]
+        offset = worker.append(session["id"], io.BytesIO(chunk), offset)["offset"]
+    meta, (filename, path, digest, deduplicated) = second.complete(session["id"])
+
+    assert digest == hashlib.sha256(data).hexdigest()
+    assert path.read_bytes() == data
+    # The file is hashed once on completion, not on every switch between workers
+    assert rehashes == [session["id"]]
+    assert not list((tmp_path / 'partial').iterdir())
+
+
+def test_running_hash_on_one_worker_skips_rehash(tmp_path, monkeypatch):
+    uploads = videostore.ResumableUploads(tmp_path)
+    data = b'x' * 5000
+    session = uploads.create('mp4', len(data))
+    monkeypatch.setattr(videostore.ResumableUploads, '_file_sha',
+                        lambda self, upload_id: pytest.fail("partial file was rehashed"))
+    uploads.append(session["id"], io.BytesIO(data[:3000]), 0)
+    uploads.append(session["id"], io.BytesIO(data[3000:]), 3000)
+    assert uploads.complete(session["id"])[1][2] == hashlib.sha256(data).hexdigest()
+
+
+def test_concurrent_appends_at_one_offset(tmp_path):
+    first, second = two_workers(tmp_path)
+    session = first.create('mp4', 2000)
+    results = []
+
+    class SlowStream(io.BytesIO):
+        def read(self, size=-1):
+            data = super().read(100)
+            threading.Event().wait(0.001)
+            return data
+
+    def append(worker):
+        try:
+            results.append(worker.append(session["id"], SlowStream(b'y' * 1000), 0)["offset"])
+        except videostore.UploadError as e:
+            results.append(e.status)
+
+    threads = [threading.Thread(target=append, args=(worker,)) for worker in (first, second)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sorted(results) == [409, 1000]
+    assert first.get(session["id"])["offset"] == 1000
+
+
+def test_sessions_tracked_per_worker_are_bounded(tmp_path, monkeypatch):
+    monkeypatch.setattr(videostore, 'MAX_TRACKED_SESSIONS', 3)
+    first, second = two_workers(tmp_path)
+    for _ in range(10):
+        session = first.create('mp4', 10)
+        second.append(session["id"], io.BytesIO(b'z' * 10), 0)
+        first.complete(session["id"])
+    assert len(second._sessions) == 3
+
+
+def test_discard_waits_for_a_chunk_in_progress(tmp_path):
+    first, second = two_workers(tmp_path)
+    session = first.create('mp4', 1000)
+    started = threading.Event()
+    release = threading.Event()
+
+    class BlockingStream(io.BytesIO):
+        def read(self, size=-1):
+            started.set()
+            release.wait(5)
+            return super().read(size)
+
+    appended = []
+    writer = threading.Thread(target=lambda: appended.append(
+        first.append(session["id"], BlockingStream(b'w' * 1000), 0)["offset"]))
+    writer.start()
+    started.wait(5)
+    discarder = threading.Thread(target=second.discard, args=(session["id"],))
+    discarder.start()
+    discarder.join(0.2)
+    assert discarder.is_alive()  # blocked on the upload's lock
+    release.set()
+    writer.join()
+    discarder.join()
+
+    assert appended == [1000]
+    with pytest.raises(videostore.UploadError):
+        first.get(session["id"])
+    assert not list((tmp_path / 'partial').iterdir())
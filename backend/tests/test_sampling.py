@@ -0,0 +1,8 @@
+from sampling import TemplateTables
+
+
+def test_fallback_opening_is_trimmed_like_openings():
+    tables = TemplateTables({'tone_indicators': {}})
+    context = "Hiring is hard. Retention is harder. " + "x" * 150
+    assert tables.opening(context) == "Let's talk about Hiring is hard.  Retention is harder."
+    assert tables.opening("AI") == "Let's talk about AI"
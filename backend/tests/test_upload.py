@@ -0,0 +1,37 @@
+import io
+
+import pytest
+from flask import jsonify
+
+import app as app_module
+import videostore
+
+
+def test_upload_accepts_non_ascii_filename(tmp_path, monkeypatch):
+    monkeypatch.setitem(app_module.app.config, 'UPLOAD_FOLDER', str(tmp_path))
+    monkeypatch.setattr(app_module, 'start_analysis',
+                        lambda filename, *args, **kwargs: jsonify({"filename": filename}))
+    client = app_module.app.test_client()
+
+    response = client.post('/api/upload-video', data={
+        'video': (io.BytesIO(b'not really a video'), 'видео.MOV'),
+    }, content_type='multipart/form-data')
+
+    assert response.status_code == 200
+    filename = response.get_json()["filename"]
+    assert filename.startswith('video-') and filename.endswith('.mov')
+    assert (tmp_path / filename).exists()
+
+
+def test_legacy_upload_etag_is_stat_based(tmp_path, monkeypatch):
+    monkeypatch.setitem(app_module.app.config, 'UPLOAD_FOLDER', str(tmp_path))
+    monkeypatch.setattr(videostore, 'file_digest', lambda path: pytest.fail("file was hashed"))
+    (tmp_path / 'legacy.mp4').write_bytes(b'0123456789')
+    client = app_module.app.test_client()
+
+    response = client.get('/uploads/legacy.mp4')
+    etag = response.headers['ETag']
+    assert response.status_code == 200
+    assert response.headers['Cache-Control'] == 'public, no-cache'
+    assert etag.startswith('"a-')
+    assert client.get('/uploads/legacy.mp4', headers={'If-None-Match': etag}).status_code == 304
@@ -0,0 +1,73 @@
+import shutil
+import subprocess
+import sys
+
+import pytest
+
+import videoprep
+
+
+@pytest.fixture
+def upload(tmp_path):
+    """A stored upload, named like the content-addressed videos"""
+    path = tmp_path / 'video-abc123.mp4'
+    path.write_bytes(b'\0' * 200_000)
+    return path
+
+
+@pytest.fixture
+def fake_ffmpeg(tmp_path, monkeypatch):
+    """An 'ffmpeg' that writes a small proxy and counts its runs"""
+    calls = tmp_path / 'ffmpeg-calls'
+    script = tmp_path / 'ffmpeg'
+    script.write_text(
+        f"#!{sys.executable}\n"
+        "import sys\n"
+        f"open({str(calls)!r}, 'a').write('run\\n')\n"
+        "open(sys.argv[-1], 'wb').write(b'proxy' * 100)\n"
+    )
+    script.chmod(0o755)
+    monkeypatch.setattr(videoprep, 'FFMPEG_PATH', str(script))
+    monkeypatch.setattr(videoprep, 'VIDEO_PREPROCESS', 'proxy')
+    return calls
+
+
+def test_proxy_is_created_then_cached(upload, fake_ffmpeg):
+    path, stats = videoprep.prepare_video(str(upload))
+    assert path == str(videoprep.proxy_path(upload))
+    assert stats["mode"] == "proxy" and stats["cached"] is False and stats["bytes"] == 500
+
+    path_again, stats = videoprep.prepare_video(str(upload))
+    assert path_again == path and stats["cached"] is True
+    assert fake_ffmpeg.read_text().count('run') == 1
+
+
+def test_falls_back_to_original_without_ffmpeg(upload, monkeypatch):
+    monkeypatch.setattr(videoprep, 'VIDEO_PREPROCESS', 'proxy')
+    monkeypatch.setattr(videoprep, 'FFMPEG_PATH', None)
+    path, stats = videoprep.prepare_video(str(upload))
+    assert path == str(upload) and stats["mode"] == "original"
+
+    # Configured but not installed
+    monkeypatch.setattr(videoprep, 'FFMPEG_PATH', str(upload.parent / 'missing-ffmpeg'))
+    path, stats = videoprep.prepare_video(str(upload))
+    assert path == str(upload) and stats["mode"] == "original"
+    assert not list(videoprep.proxy_path(upload).parent.glob('*'))
+
+
+@pytest.mark.skipif(not shutil.which('ffmpeg'), reason="ffmpeg is not installed")
+def test_real_ffmpeg_proxy_from_lavfi_clip(tmp_path, monkeypatch):
+    clip = tmp_path / 'video-lavfi.mp4'
+    subprocess.run([
+        'ffmpeg', '-nostdin', '-v', 'error', '-f', 'lavfi', '-i', 'testsrc=duration=2:size=1280x720:rate=30',
+        '-c:v', 'mpeg4', '-q:v', '1', str(clip),
+    ], check=True, timeout=60)
+    monkeypatch.setattr(videoprep, 'FFMPEG_PATH', shutil.which('ffmpeg'))
+    monkeypatch.setattr(videoprep, 'VIDEO_PREPROCESS', 'proxy')
+
+    path, stats = videoprep.prepare_video(str(clip), timeout=60)
+    assert stats["mode"] == "proxy" and stats["cached"] is False
+    assert 0 < stats["bytes"] < stats["original_bytes"]
+
+    path_again, stats = videoprep.prepare_video(str(clip), timeout=60)
+    assert path_again == path and stats["cached"] is True
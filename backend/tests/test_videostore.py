@@ -0,0 +1,21 @@
+import videostore
+
+PARSED = {
+    "outfit": {"description": "Navy blazer", "items": ["blazer"], "colors": ["navy"]},
+    "activity": {"description": "Talking", "actions": ["talking"], "intensity": "low"},
+    "background": {"description": "Home office", "location_type": "indoor"},
+    "summary": "A person talks to the camera.",
+}
+
+
+def test_parsed_analysis_is_stored(tmp_path):
+    assert videostore.store_analysis('a' * 64, '', PARSED, tmp_path)
+    assert videostore.get_analysis('a' * 64, '', tmp_path) == PARSED
+
+
+def test_unparsed_analyses_are_not_stored(tmp_path):
+    unparsed = dict(PARSED, raw_response="not json")
+    for analysis in (unparsed, {"error": "boom"}, {"raw_output": "text"}, {"summary": "text"}, {}, None):
+        assert not videostore.is_cacheable(analysis)
+        assert not videostore.store_analysis('b' * 64, '', analysis, tmp_path)
+    assert videostore.get_analysis('b' * 64, '', tmp_path) is None
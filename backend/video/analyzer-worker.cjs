@@ -0,0 +1,76 @@
+/**
+ * Long-lived video analyzer worker.
+ *
+ * Speaks newline-delimited JSON over stdin/stdout so the Flask app can keep a
+ * pool of these instead of spawning `node video-analyzer.cjs` per upload
+ * (which pays Node startup, module loading and client construction each time).
+ *
+ * Request:  {"id": "...", "op": "analyze", "video_path": "..."}
+ *           {"id": "...", "op": "ping"}
+ * Response: {"id": "...", "ok": true, "result": {...}, "timings": {...}}
+ *           {"id": "...", "ok": false, "error": "...", "timings": {...}}
+ *
+ * Only protocol messages are written to stdout; logs go to stderr.
+ */
+const readline = require('readline');
+
+const writeOut = process.stdout.write.bind(process.stdout);
+console.log = (...args) => console.error(...args);
+
+const bootStart = Date.now();
+const VideoAnalyzer = require('./video-analyzer.cjs');
+const requireMs = Date.now() - bootStart;
+
+let analyzer = null;
+let analyzerKey = null;
+
+function getAnalyzer() {
+    // Rebuilt if the key in the environment changes (it does not between restarts)
+    const apiKey = process.env.GEMINI_API_KEY;
+    if (!analyzer || analyzerKey !== apiKey) {
+        analyzer = new VideoAnalyzer(apiKey);
+        analyzerKey = apiKey;
+    }
+    return analyzer;
+}
+
+function send(message) {
+    writeOut(JSON.stringify(message) + '\n');
+}
+
+async function handle(request) {
+    const timings = {};
+    const started = Date.now();
+    try {
+        if (request.op === 'ping') {
+            return { id: request.id, ok: true, result: { pid: process.pid, uptime_s: process.uptime(), require_ms: requireMs } };
+        }
+        if (request.op !== 'analyze') {
+            throw new Error(`Unknown op: ${request.op}`);
+        }
+        const result = await getAnalyzer().analyzeVideo(request.video_path, timings);
+        timings.total_ms = Date.now() - started;
+        return { id: request.id, ok: true, result, timings };
+    } catch (error) {
+        timings.total_ms = Date.now() - started;
+        return { id: request.id, ok: false, error: error.message, timings };
+    }
+}
+
+// Requests are handled one at a time; the pool never sends a second before the first answer
+let chain = Promise.resolve();
+readline.createInterface({ input: process.stdin }).on('line', (line) => {
+    if (!line.trim()) return;
+    let request;
+    try {
+        request = JSON.parse(line);
+    } catch (error) {
+        send({ id: null, ok: false, error: 'Invalid JSON request' });
+        return;
+    }
+    chain = chain.then(() => handle(request)).then(send);
+}).on('close', () => {
+    chain.then(() => process.exit(0));
+});
+
+send({ id: null, ok: true, ready: true, require_ms: requireMs });
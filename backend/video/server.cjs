@@ -10,7 +10,7 @@ const PORT = process.env.PORT || 3000;
 
 // Initialize Gemini video analyzer
 let videoAnalyzer = null;
-if (process.env.GEMINI_API_KEY && process.env.GEMINI_API_KEY !== 'YOUR_API_KEY_HERE') {
+if ((process.env.GEMINI_API_KEY && process.env.GEMINI_API_KEY !== 'YOUR_API_KEY_HERE') || process.env.GEMINI_BASE_URL) {
     try {
         videoAnalyzer = new VideoAnalyzer(process.env.GEMINI_API_KEY);
         console.log('✅ Gemini AI enabled for video analysis');
@@ -3,12 +3,16 @@ const fs = require('fs');
 const path = require('path');
 
 class VideoAnalyzer {
-    constructor(apiKey) {
-        if (!apiKey) {
+    constructor(apiKey, baseUrl = process.env.GEMINI_BASE_URL) {
+        // A local endpoint (e.g. the modelstub stand-in server) needs no real key
+        if (!apiKey && !baseUrl) {
             throw new Error('Gemini API key is required');
         }
-        this.genAI = new GoogleGenerativeAI(apiKey);
-        this.model = this.genAI.getGenerativeModel({ model: 'gemini-2.5-flash' });
+        this.genAI = new GoogleGenerativeAI(apiKey || 'local');
+        this.model = this.genAI.getGenerativeModel(
+            { model: 'gemini-2.5-flash' },
+            baseUrl ? { baseUrl } : undefined
+        );
     }
 
     /**
@@ -25,8 +29,15 @@ class VideoAnalyzer {
 
     /**
      * Analyze video and extract outfit, activity, and background information
+     * Optional `timings` object receives per-stage durations in ms (read_ms, model_ms, parse_ms)
      */
-    async analyzeVideo(videoPath) {
+    async analyzeVideo(videoPath, timings = null) {
+        const stageStart = { t: Date.now() };
+        const mark = (stage) => {
+            const now = Date.now();
+            if (timings) timings[stage] = now - stageStart.t;
+            stageStart.t = now;
+        };
         try {
             console.log('📹 Analyzing video:', videoPath);
 
@@ -51,6 +62,7 @@ class VideoAnalyzer {
 
             // Prepare the video file
             const videoPart = this.fileToGenerativePart(videoPath, mimeType);
+            mark('read_ms');
 
             // Craft a detailed prompt for analysis
             const prompt = `Analyze this video and provide a detailed JSON response with the following information:
@@ -87,6 +99,7 @@ Be specific and detailed in your observations.`;
             const result = await this.model.generateContent([prompt, videoPart]);
             const response = await result.response;
             const text = response.text();
+            mark('model_ms');
 
             console.log('✅ Received response from Gemini');
 
@@ -113,6 +126,7 @@ Be specific and detailed in your observations.`;
             analysis.analyzed_at = new Date().toISOString();
             analysis.video_file = path.basename(videoPath);
             analysis.video_size_mb = fileSizeMB;
+            mark('parse_ms');
 
             return analysis;
 
@@ -176,3 +190,27 @@ Be specific and detailed in your observations.`;
 
 module.exports = VideoAnalyzer;
 
+// CLI: node video-analyzer.cjs <video path> [context]
+// Prints the analysis as JSON on stdout; logs go to stderr
+if (require.main === module) {
+    const writeOut = process.stdout.write.bind(process.stdout);
+    console.log = (...args) => console.error(...args);
+
+    const videoPath = process.argv[2];
+    if (!videoPath) {
+        console.error('Usage: node video-analyzer.cjs <video path> [context]');
+        process.exit(2);
+    }
+
+    (async () => {
+        try {
+            const analyzer = new VideoAnalyzer(process.env.GEMINI_API_KEY);
+            const analysis = await analyzer.analyzeVideo(videoPath);
+            writeOut(JSON.stringify(analysis) + '\n');
+        } catch (error) {
+            console.error(error.message);
+            process.exit(1);
+        }
+    })();
+}
+
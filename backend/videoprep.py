@@ -0,0 +1,109 @@
+"""
+Local pre-processing of uploads before they are sent for analysis.
+
+Phone captures are large and the analyzer inlines the whole file as base64,
+so a small proxy clip is made with ffmpeg: scaled down, a few frames per
+second, no audio (the analysis only looks at the picture), capped in length.
+Proxies are cached as uploads/proxies/<video name>-proxy.mp4; since upload
+names are content digests, each distinct upload is encoded once.
+
+If ffmpeg is not installed, fails, or produces something larger than the
+original, the original file is used unchanged.
+
+    VIDEO_PREPROCESS=off        # send originals
+    FFMPEG_PATH=/usr/bin/ffmpeg # default: ffmpeg on PATH
+"""
+import os
+import shutil
+import subprocess
+import threading
+import time
+import uuid
+from pathlib import Path
+
+VIDEO_PREPROCESS = os.getenv('VIDEO_PREPROCESS', 'proxy').lower()
+FFMPEG_PATH = os.getenv('FFMPEG_PATH') or shutil.which('ffmpeg')
+PROXY_MAX_HEIGHT = int(os.getenv('PROXY_MAX_HEIGHT', '480'))
+PROXY_FPS = float(os.getenv('PROXY_FPS', '5'))
+PROXY_CRF = int(os.getenv('PROXY_CRF', '30'))
+PROXY_MAX_SECONDS = float(os.getenv('PROXY_MAX_SECONDS', '120'))
+
+_lock = threading.Lock()
+_path_locks = {}
+
+
+def proxy_path(video_path):
+    """Cached proxy location for a video"""
+    video_path = Path(video_path)
+    return video_path.parent / 'proxies' / f"{video_path.stem}-proxy.mp4"
+
+
+def proxy_command(src, dst, ffmpeg=None):
+    """
+    ffmpeg arguments that turn src into a small H.264 proxy at dst.
+
+    Returns:
+        list[str]: Command line
+    """
+    return [
+        ffmpeg or FFMPEG_PATH or 'ffmpeg', '-nostdin', '-y', '-v', 'error',
+        '-i', str(src),
+        '-t', str(PROXY_MAX_SECONDS),
+        '-vf', f"fps={PROXY_FPS},scale=-2:'min({PROXY_MAX_HEIGHT},ih)'",
+        '-an',
+        '-c:v', 'libx264', '-preset', 'veryfast', '-crf', str(PROXY_CRF),
+        '-pix_fmt', 'yuv420p', '-movflags', '+faststart',
+        '-f', 'mp4', str(dst),
+    ]
+
+
+def _path_lock(path):
+    with _lock:
+        return _path_locks.setdefault(str(path), threading.Lock())
+
+
+def prepare_video(video_path, timeout=None):
+    """
+    Path of the file to send for analysis: a cached or freshly encoded
+    proxy when possible, otherwise the original.
+
+    Args:
+        video_path (str): Uploaded video
+        timeout (float): Seconds allowed for encoding
+
+    Returns:
+        tuple: (path to analyze, stats dict with "mode", "seconds" and sizes)
+    """
+    started = time.perf_counter()
+    original_size = os.path.getsize(video_path)
+    stats = {"mode": "original", "original_bytes": original_size, "bytes": original_size}
+
+    if VIDEO_PREPROCESS != 'proxy' or not FFMPEG_PATH:
+        stats["seconds"] = 0.0
+        return str(video_path), stats
+
+    dst = proxy_path(video_path)
+    with _path_lock(dst):
+        if not dst.exists():
+            dst.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = dst.with_name(f".{dst.stem}.{uuid.uuid4().hex}.mp4")
+            try:
+                subprocess.run(proxy_command(video_path, tmp_path), capture_output=True,
+                               timeout=timeout, check=True)
+                os.replace(tmp_path, dst)
+            except (OSError, subprocess.SubprocessError) as e:
+                print(f"⚠️ Video pre-processing failed, sending original: {e}")
+            finally:
+                if tmp_path.exists():
+                    tmp_path.unlink()
+            stats["cached"] = False
+        else:
+            stats["cached"] = True
+
+    stats["seconds"] = round(time.perf_counter() - started, 3)
+    if dst.exists():
+        proxy_size = dst.stat().st_size
+        if 0 < proxy_size < original_size:
+            stats.update(mode="proxy", bytes=proxy_size)
+            return str(dst), stats
+    return str(video_path), stats
@@ -0,0 +1,426 @@
+"""
+Content-addressed storage for uploaded videos and their analyses.
+
+Uploads are hashed (SHA-256) while they are copied to disk and stored as
+uploads/video-<digest>.<ext>, so the same clip uploaded twice is kept once.
+Analyses are cached next to the video, keyed by (digest, context):
+
+    video-<digest>-analysis.json               (no context)
+    video-<digest>-<context hash>-analysis.json
+
+A repeat upload with the same context returns the stored analysis instead of
+sending the video to the model again.
+
+Large uploads can also arrive in chunks through ResumableUploads, which keeps
+partial files under uploads/partial/ so an interrupted transfer resumes from
+the last complete chunk.
+"""
+import collections
+import contextlib
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+import uuid
+from pathlib import Path
+
+from proclock import file_lock
+from responsecache import normalize_context
+
+UPLOAD_FOLDER = Path(__file__).parent.parent / 'uploads'
+CHUNK_SIZE = 1 << 20
+# Resumable sessions a worker keeps a lock and running hash for (least recently used go first)
+MAX_TRACKED_SESSIONS = 64
+
+
+def video_filename(digest, extension):
+    """Stored name of a video with the given digest"""
+    return f"video-{digest}.{extension.lower().lstrip('.')}"
+
+
+def save_upload(stream, extension, upload_folder=UPLOAD_FOLDER):
+    """
+    Copy an upload to disk, hashing it on the way, and deduplicate by digest.
+
+    Args:
+        stream: Binary file object (e.g. FileStorage.stream)
+        extension (str): File extension of the upload
+        upload_folder (Path): Directory videos are stored in
+
+    Returns:
+        tuple: (filename, path, digest, deduplicated)
+    """
+    upload_folder = Path(upload_folder)
+    tmp_path = upload_folder / f".upload-{uuid.uuid4().hex}.tmp"
+    sha = hashlib.sha256()
+    try:
+        with open(tmp_path, 'wb') as out:
+            while True:
+                chunk = stream.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                sha.update(chunk)
+                out.write(chunk)
+        return _commit(tmp_path, sha.hexdigest(), extension, upload_folder)
+    finally:
+        if tmp_path.exists():
+            tmp_path.unlink()
+
+
+def _commit(tmp_path, digest, extension, upload_folder):
+    """Move a fully written upload to its content-addressed name (or drop it if known)"""
+    filename = video_filename(digest, extension)
+    path = Path(upload_folder) / filename
+    if path.exists():
+        return filename, path, digest, True
+    os.replace(tmp_path, path)
+    return filename, path, digest, False
+
+
+def file_digest(path):
+    """SHA-256 hex digest of a file"""
+    sha = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+            sha.update(chunk)
+    return sha.hexdigest()
+
+
+_CONTENT_ADDRESSED_RE = re.compile(r'^video-([0-9a-f]{64})\.[A-Za-z0-9]+$')
+
+
+def digest_from_filename(filename):
+    """Digest encoded in a content-addressed video name, or None for other files"""
+    match = _CONTENT_ADDRESSED_RE.match(filename)
+    return match.group(1) if match else None
+
+
+def file_etag(path):
+    """
+    ETag for an uploaded file without reading it: the digest in a
+    content-addressed name, otherwise the file's size and mtime (so legacy
+    uploads of up to MAX_FILE_SIZE are never hashed on a request thread).
+    """
+    digest = digest_from_filename(Path(path).name)
+    if digest is not None:
+        return digest
+    stat = os.stat(path)
+    return f"{stat.st_size:x}-{stat.st_mtime_ns:x}"
+
+
+def analysis_path(digest, context="", upload_folder=UPLOAD_FOLDER):
+    """Path of the cached analysis for (digest, context)"""
+    context = normalize_context(context or "")
+    if not context:
+        return Path(upload_folder) / f"video-{digest}-analysis.json"
+    context_hash = hashlib.sha256(context.encode('utf-8')).hexdigest()[:16]
+    return Path(upload_folder) / f"video-{digest}-{context_hash}-analysis.json"
+
+
+def get_analysis(digest, context="", upload_folder=UPLOAD_FOLDER):
+    """
+    Stored analysis for a video and context.
+
+    Returns:
+        dict: Analysis, or None if it has not been analyzed yet
+    """
+    try:
+        with open(analysis_path(digest, context, upload_folder), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+# Fields of a parsed analysis (see video/video-analyzer.cjs)
+ANALYSIS_SECTIONS = ('outfit', 'activity', 'background')
+# Markers of failed or unparsed analyses ('raw_response' is the analyzer's
+# fallback when the model output is not JSON)
+FAILURE_KEYS = ('error', 'raw_output', 'raw_response')
+
+
+def is_cacheable(analysis):
+    """Only structured, successful analyses are worth keeping"""
+    if not isinstance(analysis, dict) or any(key in analysis for key in FAILURE_KEYS):
+        return False
+    return all(isinstance(analysis.get(section), dict) for section in ANALYSIS_SECTIONS) and bool(
+        analysis.get('summary')
+    )
+
+
+def store_analysis(digest, context, analysis, upload_folder=UPLOAD_FOLDER):
+    """
+    Save an analysis for (digest, context); failed or unparsed results are skipped.
+
+    Returns:
+        bool: True if the analysis was stored
+    """
+    if not is_cacheable(analysis):
+        return False
+    path = analysis_path(digest, context, upload_folder)
+    tmp_path = path.with_name(f"{path.name}.{uuid.uuid4().hex}.tmp")
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(analysis, f, indent=2, ensure_ascii=False)
+    os.replace(tmp_path, path)
+    return True
+
+
+class UploadError(Exception):
+    """A chunked upload request that cannot be applied; status is the HTTP code"""
+
+    def __init__(self, message, status=400, offset=None):
+        super().__init__(message)
+        self.status = status
+        self.offset = offset
+
+
+class ResumableUploads:
+    """
+    Chunked uploads written straight to disk.
+
+    A session is created with the expected size (and optionally SHA-256),
+    chunks are appended at the current offset, and completing the session
+    verifies the digest and stores the file with save_upload's naming.
+    Each chunk is applied whole or not at all, so after a dropped connection
+    the client asks for the offset and resumes from there.
+
+    Chunks of one upload may land on different server worker processes, so
+    appends and completion hold a lock file next to the partial file. A
+    worker keeps a running SHA-256 only while it sees the chunks in order;
+    otherwise the digest is computed once, on completion.
+
+    Args:
+        upload_folder (Path): Directory completed videos are stored in
+        max_size (int): Largest upload accepted, in bytes
+        ttl (float): Seconds before an abandoned session is deleted
+    """
+
+    def __init__(self, upload_folder=UPLOAD_FOLDER, max_size=500 * 1024 * 1024, ttl=24 * 3600):
+        self.upload_folder = Path(upload_folder)
+        self.folder = self.upload_folder / 'partial'
+        self.folder.mkdir(parents=True, exist_ok=True)
+        self.max_size = max_size
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        # upload id -> (lock, [offset, running sha256 or None]) for recent
+        # sessions seen by this process; another worker may complete or expire
+        # them, so this is bounded rather than cleaned up on discard only
+        self._sessions = collections.OrderedDict()
+
+    def _meta_path(self, upload_id):
+        return self.folder / f"{upload_id}.json"
+
+    def _part_path(self, upload_id):
+        return self.folder / f"{upload_id}.part"
+
+    def _lock_path(self, upload_id):
+        return self.folder / f"{upload_id}.lock"
+
+    def create(self, extension, size, sha256=None, context=""):
+        """
+        Start an upload session.
+
+        Returns:
+            dict: Session metadata including "id" and "offset"
+        """
+        if not isinstance(size, int) or size <= 0:
+            raise UploadError("size must be a positive number of bytes")
+        if size > self.max_size:
+            raise UploadError(f"File too large (max {self.max_size} bytes)", 413)
+        self.expire()
+
+        meta = {
+            "id": uuid.uuid4().hex,
+            "extension": extension.lower().lstrip('.'),
+            "size": size,
+            "sha256": sha256.lower() if sha256 else None,
+            "context": context,
+            "created_at": time.time(),
+        }
+        self._part_path(meta["id"]).touch()
+        with open(self._meta_path(meta["id"]), 'w', encoding='utf-8') as f:
+            json.dump(meta, f, ensure_ascii=False)
+        return dict(meta, offset=0)
+
+    def get(self, upload_id):
+        """
+        Session metadata with the current offset.
+
+        Raises:
+            UploadError: 404 if the session does not exist
+        """
+        if not upload_id.isalnum():
+            raise UploadError("Upload not found", 404)
+        try:
+            with open(self._meta_path(upload_id), 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+            offset = self._part_path(upload_id).stat().st_size
+        except (OSError, ValueError):
+            raise UploadError("Upload not found", 404) from None
+        return dict(meta, offset=offset)
+
+    def _session(self, upload_id):
+        with self._lock:
+            session = self._sessions.get(upload_id)
+            if session is None:
+                session = self._sessions[upload_id] = (threading.Lock(), [None, None])
+                # Forgetting a session only costs its running hash (complete()
+                # reads the file instead); sessions in use are kept
+                for old_id in list(self._sessions)[:-1]:
+                    if len(self._sessions) <= MAX_TRACKED_SESSIONS:
+                        break
+                    if not self._sessions[old_id][0].locked():
+                        del self._sessions[old_id]
+            else:
+                self._sessions.move_to_end(upload_id)
+            return session
+
+    @contextlib.contextmanager
+    def _locked(self, upload_id):
+        """
+        Hold the session's lock in this process and in every other worker.
+
+        Yields:
+            tuple: (session metadata with the current offset, [offset, running sha256 or None])
+        """
+        self.get(upload_id)  # 404 (and a checked id) before any lock file is created
+        lock, state = self._session(upload_id)
+        with lock, file_lock(self._lock_path(upload_id)):
+            # Re-read under the lock: another worker may have appended or completed
+            try:
+                meta = self.get(upload_id)
+            except UploadError:
+                self._lock_path(upload_id).unlink(missing_ok=True)
+                raise
+            yield meta, state
+
+    def _file_sha(self, upload_id):
+        """SHA-256 of the partial file, read from disk"""
+        sha = hashlib.sha256()
+        with open(self._part_path(upload_id), 'rb') as f:
+            for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+                sha.update(chunk)
+        return sha
+
+    def append(self, upload_id, stream, offset, chunk_sha256=None):
+        """
+        Append a chunk read from stream at offset.
+
+        Args:
+            upload_id (str): Session id
+            stream: Binary file object with the chunk (e.g. request.stream)
+            offset (int): Byte offset the chunk starts at; must equal the current offset
+            chunk_sha256 (str): Optional SHA-256 of the chunk, checked before it is kept
+
+        Returns:
+            dict: Session metadata with the new offset
+
+        Raises:
+            UploadError: 409 with the current offset on an offset mismatch,
+                400 on a checksum mismatch, 413 if the chunk overruns the size
+        """
+        with self._locked(upload_id) as (meta, state):
+            current = meta["offset"]
+            if offset != current:
+                raise UploadError(f"Offset mismatch, expected {current}", 409, current)
+            # Bytes below an accepted offset never change, so a running hash at
+            # this offset is still valid; after another worker's chunk there is
+            # none, and complete() hashes the file instead
+            sha = state[1].copy() if state[0] == current and state[1] is not None else None
+            if current == 0:
+                sha = hashlib.sha256()
+            chunk_hash = hashlib.sha256()
+            written = 0
+            ok = False
+            try:
+                with open(self._part_path(upload_id), 'ab') as f:
+                    while True:
+                        data = stream.read(CHUNK_SIZE)
+                        if not data:
+                            break
+                        written += len(data)
+                        if current + written > meta["size"]:
+                            raise UploadError("Chunk exceeds the declared upload size", 413, current)
+                        if sha is not None:
+                            sha.update(data)
+                        chunk_hash.update(data)
+                        f.write(data)
+                if chunk_sha256 and chunk_hash.hexdigest() != chunk_sha256.lower():
+                    raise UploadError("Chunk checksum mismatch", 400, current)
+                ok = True
+            finally:
+                if ok:
+                    state[0], state[1] = current + written, sha
+                else:
+                    # Drop the partial chunk so the client can resend it whole
+                    os.truncate(self._part_path(upload_id), current)
+        return dict(meta, offset=current + written)
+
+    def complete(self, upload_id):
+        """
+        Verify and store a fully uploaded file.
+
+        Returns:
+            tuple: (session metadata, (filename, path, digest, deduplicated))
+
+        Raises:
+            UploadError: 409 if bytes are missing, 400 if the SHA-256 does not match
+        """
+        with self._locked(upload_id) as (meta, state):
+            offset = meta["offset"]
+            if offset != meta["size"]:
+                raise UploadError(f"Upload incomplete ({offset} of {meta['size']} bytes)", 409, offset)
+            sha = state[1] if state[0] == offset and state[1] is not None else self._file_sha(upload_id)
+            digest = sha.hexdigest()
+            if meta["sha256"] and digest != meta["sha256"]:
+                self._remove(upload_id)
+                raise UploadError("Checksum mismatch, upload discarded", 400)
+            stored = _commit(self._part_path(upload_id), digest, meta["extension"], self.upload_folder)
+            self._remove(upload_id)
+        return meta, stored
+
+    def _remove(self, upload_id):
+        """Delete a session's files (the caller holds its locks)"""
+        for path in (self._part_path(upload_id), self._meta_path(upload_id), self._lock_path(upload_id)):
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+        with self._lock:
+            self._sessions.pop(upload_id, None)
+
+    def discard(self, upload_id, older_than=None):
+        """
+        Delete a session and its partial file, waiting for a chunk being
+        appended by any worker to finish first.
+
+        Args:
+            upload_id (str): Session id
+            older_than (float): Only delete if not touched since this timestamp
+        """
+        if not upload_id.isalnum():
+            return
+        lock, _ = self._session(upload_id)
+        with lock, file_lock(self._lock_path(upload_id)):
+            if older_than is not None and self._touched(upload_id) >= older_than:
+                return
+            self._remove(upload_id)
+
+    def _touched(self, upload_id):
+        """Last modification of a session's files (0 if they are gone)"""
+        touched = 0
+        for path in (self._meta_path(upload_id), self._part_path(upload_id)):
+            try:
+                touched = max(touched, path.stat().st_mtime)
+            except OSError:
+                pass
+        return touched
+
+    def expire(self):
+        """Delete sessions not touched for ttl seconds"""
+        cutoff = time.time() - self.ttl
+        for meta_path in self.folder.glob('*.json'):
+            if self._touched(meta_path.stem) < cutoff:
+                # Checked again under the lock: a chunk may be arriving
+                self.discard(meta_path.stem, older_than=cutoff)
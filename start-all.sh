@@ -18,6 +18,17 @@ check_port() {
     return $?
 }
 
+mkdir -p logs
+
+# Stop a previous API server gracefully (in-flight requests drain)
+if [ -f logs/flask-api.pid ] && kill -TERM "$(cat logs/flask-api.pid)" 2>/dev/null; then
+    echo "🧹 Stopping previous Flask API..."
+    for _ in $(seq 1 30); do
+        check_port 5001 || break
+        sleep 1
+    done
+fi
+
 # Kill processes on ports if needed
 echo "🧹 Cleaning up existing processes..."
 for port in 3000 5001 8080; do
@@ -51,11 +62,12 @@ fi
 
 echo ""
 
-# Start Flask API (Python - Port 5001)
+# Start Flask API (Python - Port 5001): gunicorn, one worker process per core
+# (WEB_CONCURRENCY / WEB_THREADS override, see backend/gunicorn.conf.py)
 echo "🐍 Starting Flask API (Port 5001)..."
-python3 backend/app.py > logs/flask-api.log 2>&1 &
+(cd backend && PORT=5001 PIDFILE=../logs/flask-api.pid exec gunicorn -c gunicorn.conf.py app:app) > logs/flask-api.log 2>&1 &
 FLASK_PID=$!
-sleep 2
+sleep 3
 
 if check_port 5001; then
     echo "${GREEN}✓ Flask API running on http://localhost:5001${NC}"
@@ -94,10 +106,13 @@ echo ""
 echo "To stop all servers:"
 echo "  ./stop-all.sh"
 echo ""
-echo "Press Ctrl+C to stop this script"
+echo "Press Ctrl+C to stop all servers"
 echo "━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━"
 echo ""
 
+# Ctrl+C: TERM lets the API drain in-flight requests and analyses
+trap 'echo ""; echo "🛑 Stopping..."; kill -TERM $FLASK_PID $VIDEO_PID $FRONTEND_PID 2>/dev/null; wait' INT TERM
+
 # Keep script running
 wait
 
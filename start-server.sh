@@ -17,6 +17,8 @@ if [ ! -f .env ]; then
     echo ""
 fi
 
-# Start the server
-python backend/app.py
+# Start the server (gunicorn: WEB_CONCURRENCY workers x WEB_THREADS threads,
+# see backend/gunicorn.conf.py); `python backend/app.py` runs the dev server
+cd backend
+exec gunicorn -c gunicorn.conf.py app:app
 
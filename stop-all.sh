@@ -4,6 +4,17 @@
 
 echo "🛑 Stopping all servers..."
 
+cd "$(dirname "$0")"
+
+# Flask API: TERM lets gunicorn drain in-flight requests and analyses first
+if [ -f logs/flask-api.pid ] && kill -TERM "$(cat logs/flask-api.pid)" 2>/dev/null; then
+    echo "  Draining Flask API (up to ${GRACEFUL_TIMEOUT:-90}s)"
+    for _ in $(seq 1 "${GRACEFUL_TIMEOUT:-90}"); do
+        lsof -ti:5001 > /dev/null 2>&1 || break
+        sleep 1
+    done
+fi
+
 # Kill processes on specific ports
 for port in 3000 5001 8080; do
     if lsof -ti:$port > /dev/null 2>&1; then
@@ -15,6 +26,7 @@ done
 # Also kill by process name
 pkill -f "node backend/video/server.cjs" 2>/dev/null || true
 pkill -f "python.*backend/app.py" 2>/dev/null || true
+pkill -f "gunicorn -c gunicorn.conf.py app:app" 2>/dev/null || true
 pkill -f "vite" 2>/dev/null || true
 
 echo "✅ All servers stopped"